@@ -14,3 +14,10 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
 
 application = get_asgi_application()
+
+# Report charts are drawn by a pool of warm processes in each web process (see
+# `logic.charts`); start it with the server so the first report does not pay for it.
+from django.conf import settings  # noqa: E402
+from logic.charts import start_pool  # noqa: E402
+
+start_pool(settings.CHART_RENDER_WORKERS)
@@ -2,6 +2,7 @@ from __future__ import absolute_import, unicode_literals
 import os
 from celery import Celery
 from celery.schedules import crontab
+from celery.signals import worker_process_init
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
 app = Celery('backend')
@@ -16,10 +17,35 @@ app.conf.beat_schedule = {
         'task': 'logic.tasks.send_scheduled_emails',
         'schedule': crontab(hour=0, minute=0),  #todos los días a las doce en punto
     },
+
+    'prune-sync-tombstones-daily': {
+        'task': 'logic.tasks.prune_sync_tombstones',
+        'schedule': crontab(hour=3, minute=0),
+    },
+
+    'prune-report-jobs-daily': {
+        'task': 'logic.tasks.prune_old_report_jobs',
+        'schedule': crontab(hour=3, minute=30),
+    },
+
+    'prune-export-jobs-daily': {
+        'task': 'logic.tasks.prune_old_export_jobs',
+        'schedule': crontab(hour=3, minute=45),
+    },
 }
 
 app.autodiscover_tasks()
 
+@worker_process_init.connect
+def warm_chart_renderer(**kwargs):
+    # Prefork children cannot start the chart process pool and draw charts themselves. Workers
+    # dedicated to reports can load matplotlib and the font cache once per child instead of on
+    # the first report; every other worker keeps its fast start (see REPORT_WORKER_WARM_UP).
+    from django.conf import settings
+    if settings.REPORT_WORKER_WARM_UP:
+        from logic.charts import warm_up
+        warm_up()
+
 @app.task(bind=True)
 def debug_task(self):
     print(f'Request: {self.request!r}')
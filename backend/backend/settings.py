@@ -184,5 +184,81 @@ CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_BACKEND = 'redis://redis:6379/0'
 
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Shared by every web and Celery worker; point FILTER_CACHE_ALIAS (and the other
+    # *_CACHE_ALIAS settings) here in production.
+    'redis': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': 'redis://redis:6379/1',
+    },
+}
+
+# Hit and miss counters of the result caches (see `api/cache_stats/`); the alias must be shared
+# by every web and Celery worker, otherwise each process reports its own counts.
+CACHE_STATS_ALIAS = 'redis'
+
+# Cache of filter_transactions results: CACHES alias and time to live in seconds.
+FILTER_CACHE_ALIAS = 'default'
+FILTER_CACHE_TIMEOUT = 300
+
+# Cache of cash-flow forecasts: CACHES alias and time to live in seconds.
+FORECAST_CACHE_ALIAS = 'default'
+FORECAST_CACHE_TIMEOUT = 3600
+
+# Rendered chart images, keyed by a digest of the plotted data: shared CACHES alias, time to
+# live in seconds, and the size of the per-process LRU in front of it. A local memory alias turns
+# the shared layer off.
+CHART_CACHE_ALIAS = 'redis'
+CHART_CACHE_TIMEOUT = 7 * 24 * 3600
+CHART_CACHE_MAX_BYTES = 32 * 1024 * 1024
+
+# Finished report PDFs, keyed by user, data version and report options: shared CACHES alias,
+# time to live in seconds, and the size of the per-process LRU in front of it. A local memory
+# alias turns the shared layer off.
+REPORT_CACHE_ALIAS = 'redis'
+REPORT_CACHE_TIMEOUT = 24 * 3600
+REPORT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# Default report renderer: 'weasyprint' (HTML template) or 'reportlab' (drawn directly, faster).
+REPORT_RENDERER = 'weasyprint'
+
+# Reports with more table rows than this are rendered and merged in chunks of this many rows,
+# which bounds the memory used by WeasyPrint; 0 always renders the report as one document.
+REPORT_CHUNK_ROWS = 2000
+
+# Worker processes drawing report charts in parallel; 0 draws them in the calling process,
+# which is faster on a single core. Every web process starts its own pool when it boots
+# (backend/wsgi.py, backend/asgi.py), so a server runs web processes x CHART_RENDER_WORKERS
+# chart processes; keep the product below the number of cores. Only processes that call
+# `logic.charts.start_pool` use a pool: Celery workers of any pool type, management commands
+# and tests draw in-process.
+CHART_RENDER_WORKERS = min(2, os.cpu_count()) if (os.cpu_count() or 1) > 1 else 0
+
+# Whether each Celery prefork child loads matplotlib and the font cache when it starts. Only
+# worth it on workers dedicated to report tasks; elsewhere it slows down every child's start.
+REPORT_WORKER_WARM_UP = False
+
+# Most points drawn per line chart; longer series are downsampled (LTTB) before plotting.
+CHART_MAX_POINTS = 800
+
+# Statements larger than this (in bytes) are imported by a Celery task instead of in the request.
+TRANSACTION_IMPORT_ASYNC_BYTES = 2 * 1024 * 1024
+
+# Background PDF report jobs: seconds after which an unfinished job is considered lost, and
+# days finished reports are kept.
+REPORT_JOB_STALE_SECONDS = 600
+REPORT_JOB_RETENTION_DAYS = 7
+
+# Admin exports of more rows than this are written by a Celery task instead of in the request;
+# their files are kept this many days.
+ADMIN_EXPORT_ASYNC_ROWS = 5000
+EXPORT_JOB_RETENTION_DAYS = 7
+
+# Days deletions are remembered for the sync endpoint; clients whose checkpoint is older get a full sync.
+SYNC_TOMBSTONE_RETENTION_DAYS = 90
+
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 MEDIA_URL = '/media/'
@@ -22,6 +22,8 @@ from logic.views.category_views import *
 from logic.views.debt_views import *
 from logic.views.scheduledTransaction_views import *
 from logic.views.general_views import *
+from logic.views.sync_views import *
+from logic.views.report_views import *
 from django.conf.urls.static import static
 
 urlpatterns = [
@@ -32,6 +34,9 @@ urlpatterns = [
     path('verify-email/', verify_email, name='verify_email'),
     path('api/update_user/<int:id_user>/', UserUpdateView.as_view(), name="user-update"),
     path('api/transactions/', TransactionCreateView.as_view(), name="transactions-list"),
+    path('api/transactions/bulk/', bulk_create_transactions, name="transactions-bulk"),
+    path('api/import_transactions/<int:id_user>/', import_transactions, name="transactions-import"),
+    path('api/import_transactions/status/<str:task_id>/', import_transactions_status, name="transactions-import-status"),
     path('api/delete_transaction/<int:transaction_id>/', delete_transaction, name='delete_transaction'),
     path('api/get_transactions/<int:id_user>/', get_transactions_by_user, name="transactions-info"),
     path('api/update_transaction/<int:id_user>/<int:id_transaction>/', update_user_transaction, name="transaction-update"),
@@ -39,7 +44,14 @@ urlpatterns = [
     path('api/create_category/', create_or_associate_category, name="create-category"),
     path('api/update_category/<int:id_user>/<int:id_category>/', update_user_category, name="category-update"),
     path('api/filter_transactions/<int:id_user>/', filter_transactions, name="filter-transaction"),
+    path('api/export_transactions/<int:id_user>/', export_transactions, name="export-transactions"),
+    path('api/cache_stats/', cache_stats, name="cache-stats"),
+    path('api/transactions_by_period/<int:id_user>/', transactions_by_period, name="transactions-by-period"),
+    path('api/sync/<int:id_user>/', sync_changes, name="sync-changes"),
     path('api/generate_pdf/<int:id_user>/', generate_pdf, name='generate_pdf'),
+    path('api/reports/<int:id_user>/', create_report_job, name='report-job-create'),
+    path('api/reports/<int:id_user>/<uuid:job_id>/', report_job_status, name='report-job-status'),
+    path('api/reports/<int:id_user>/<uuid:job_id>/download/', download_report, name='report-job-download'),
     path('api/debts/', DebtsCreateView.as_view(), name="debts-list"),
     path('api/get_debts/<int:id_user>/', get_debts_by_user, name="debts-info"),
     path('api/update_debt/<int:id_user>/<int:id_debt>/', update_user_debt, name="debt-update"),
@@ -49,6 +61,7 @@ urlpatterns = [
     path('api/scheduled-transactions/', ScheduledTransactionListCreateView.as_view(), name='list-create-scheduled-transactions'),
     path('api/scheduled-transactions/<int:id_scheduled_transaction>/', ScheduledTransactionUpdateDeleteView.as_view(), name='update-delete-scheduled-transaction'),
     path('api/scheduled-transactions/user/<int:id_user>/', get_scheduled_transactions_by_user, name='get-scheduled-transactions-by-user'),
+    path('api/forecast/<int:id_user>/', forecast_cash_flow, name='forecast-cash-flow'),
     path('api/delete_scheduled_transaction/<int:transaction_id>/', delete_scheduled_transaction, name='delete_scheduled_transaction'),
     path('api/update_scheduled_transaction/<int:transaction_id>/', update_scheduled_transaction, name='update_scheduled_transaction'),
     path('api/update_email_schedule/<int:id_user>/', update_email_schedule, name='update_email_schedule'),
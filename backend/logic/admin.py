@@ -1,11 +1,13 @@
+from django.conf import settings
 from django.contrib import admin
-from .models import User, Transaction, Category, Debt, ScheduledTransaction
+from django.db import transaction
+from django.urls import reverse
+from django.utils.html import format_html
+from .models import User, Transaction, Category, Debt, ScheduledTransaction, ExportJob
 from import_export import resources
 from import_export.admin import ExportMixin
-import csv
-from django.http import HttpResponse
-from reportlab.pdfgen import canvas
-from openpyxl import Workbook
+from logic.exporters import create_export_job, export_response
+from logic.tasks import build_export
 
 def get_list_display(model):
     return [field.name for field in model._meta.get_fields() if not field.many_to_many and not field.one_to_many]
@@ -35,70 +37,35 @@ class ScheduledTransactionResource(resources.ModelResource):
         model = ScheduledTransaction
         fields = '__all__'
 
+def run_export(modeladmin, request, queryset, fmt):
+    """
+    Exports the selected rows in the request, or queues an `ExportJob` when there are more than
+    `ADMIN_EXPORT_ASYNC_ROWS` of them; see `logic.exporters`.
+    """
+    row_count = queryset.count()
+    if row_count <= settings.ADMIN_EXPORT_ASYNC_ROWS:
+        return export_response(queryset, fmt)
+    job = create_export_job(queryset, fmt, row_count)
+    transaction.on_commit(lambda: build_export.delay(str(job.pk)))
+    modeladmin.message_user(request, format_html(
+        'La exportación de {} filas se está generando en segundo plano: <a href="{}">ver estado y descargar</a>.',
+        job.row_count, reverse('admin:logic_exportjob_change', args=[job.pk]),
+    ))
+    return None
+
+
 def export_csv(modeladmin, request, queryset):
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = 'attachment; filename="export.csv"'
-    writer = csv.writer(response)
-    model = queryset.model
-    field_names = [field.name for field in model._meta.fields]
-    writer.writerow(field_names)
-    for obj in queryset:
-        row = [getattr(obj, field) for field in field_names]
-        writer.writerow(row)
-    return response
+    return run_export(modeladmin, request, queryset, 'csv')
 export_csv.short_description = "Exportar seleccionados a CSV"
 
 
 def export_pdf(modeladmin, request, queryset):
-    response = HttpResponse(content_type='application/pdf')
-    response['Content-Disposition'] = 'attachment; filename="export.pdf"'
-
-    p = canvas.Canvas(response)
-
-    model = queryset.model
-    p.setFont("Helvetica-Bold", 16)
-    p.drawString(100, 800, f"Exportación de {model._meta.verbose_name_plural.capitalize()}")
-
-    field_names = [field.name for field in model._meta.fields]
-    y_position = 750
-    p.setFont("Helvetica-Bold", 12)
-    for i, field_name in enumerate(field_names):
-        p.drawString(50 + (i * 100), y_position, field_name)
-
-    y_position -= 20
-    p.setFont("Helvetica", 10)
-    for obj in queryset:
-        for i, field in enumerate(field_names):
-            value = getattr(obj, field)
-            p.drawString(50 + (i * 100), y_position, str(value))
-        y_position -= 20
-
-        if y_position < 50:
-            p.showPage()
-            p.setFont("Helvetica-Bold", 12)
-            y_position = 750
-
-    p.save()
-    return response
+    return run_export(modeladmin, request, queryset, 'pdf')
 export_pdf.short_description = "Exportar seleccionados a PDF"
 
 
 def export_excel(modeladmin, request, queryset):
-    response = HttpResponse(content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-    response['Content-Disposition'] = 'attachment; filename="export.xlsx"'
-    workbook = Workbook()
-    sheet = workbook.active
-    sheet.title = "Exportación"
-    model = queryset.model
-    field_names = [field.name for field in model._meta.fields]
-    sheet.append(field_names)
-
-    for obj in queryset:
-        row = [getattr(obj, field) for field in field_names]
-        sheet.append(row)
-
-    workbook.save(response)
-    return response
+    return run_export(modeladmin, request, queryset, 'xlsx')
 export_excel.short_description = "Exportar seleccionados a Excel"
 
 
@@ -161,4 +128,21 @@ class ScheduledTransactionAdmin(ExportMixin, admin.ModelAdmin):
     list_filter = ('type', 'repeat', 'schedule_date')
     ordering = ('schedule_date',)
     filter_horizontal = ('categories',)
-    actions = [export_csv, export_pdf, export_excel]  
\ No newline at end of file
+    actions = [export_csv, export_pdf, export_excel]
+
+
+@admin.register(ExportJob)
+class ExportJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'model', 'format', 'row_count', 'status', 'created_at', 'finished_at', 'download')
+    list_filter = ('status', 'format', 'model')
+    exclude = ('query', 'file')
+    readonly_fields = ('model', 'format', 'row_count', 'status', 'download', 'error', 'created_at', 'finished_at')
+
+    def has_add_permission(self, request):
+        return False
+
+    def download(self, obj):
+        if obj.status != ExportJob.StatusEnum.DONE or not obj.file:
+            return '-'
+        return format_html('<a href="{}">Descargar</a>', obj.file.url)
+    download.short_description = "Archivo"
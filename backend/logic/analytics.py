@@ -0,0 +1,237 @@
+from datetime import datetime, timezone as dt_timezone
+import numpy as np
+from django.utils import timezone
+from logic.models import Category, Transaction
+
+ANALYTICS_PERIODS = ('daily', 'weekly', 'monthly', 'yearly')
+UNCATEGORIZED = 'Uncategorized'
+
+# 1970-01-01 was a Thursday; shifting day numbers by 3 makes Monday day 0 of the week.
+_EPOCH_WEEKDAY_SHIFT = 3
+
+
+class TransactionArrays:
+    """
+    A user's transactions as columnar NumPy arrays, loaded with two `values_list` queries.
+
+    Rows are sorted by date, then by ID. A transaction with several categories has one entry
+    per category in the membership arrays, so it counts once in every category split, as in the
+    monthly summary.
+
+    Attributes:
+        ids: Transaction IDs (int64).
+        epoch: Transaction dates as UTC epoch seconds (int64).
+        amounts: Transaction amounts (float64).
+        types: `Transaction.TransEnum` values (int8).
+        category_names: Names of the categories referenced by `member_categories`.
+        member_rows: Row index of each (transaction, category) pair (int64).
+        member_categories: Index into `category_names` of each pair (int64).
+    """
+    def __init__(self, ids, epoch, amounts, types, category_names, member_rows, member_categories):
+        self.ids = ids
+        self.epoch = epoch
+        self.amounts = amounts
+        self.types = types
+        self.category_names = category_names
+        self.member_rows = member_rows
+        self.member_categories = member_categories
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def load(cls, transactions):
+        """
+        Loads the transactions of a queryset, without creating model instances.
+
+        Parameters:
+            - transactions: Queryset of `Transaction`, possibly filtered.
+
+        Returns:
+            - TransactionArrays: The columnar copy of the rows.
+        """
+        rows = list(transactions.order_by('date', 'id_transaction')
+                    .values_list('id_transaction', 'date', 'mount', 'type'))
+        count = len(rows)
+        if count:
+            ids, dates, amounts, types = zip(*rows)
+        else:
+            ids = dates = amounts = types = ()
+        ids = np.fromiter(ids, dtype=np.int64, count=count)
+        epoch = np.fromiter((date.timestamp() for date in dates), dtype=np.float64, count=count).astype(np.int64)
+        amounts = np.fromiter(amounts, dtype=np.float64, count=count)
+        types = np.fromiter(types, dtype=np.int8, count=count)
+        del rows, dates
+
+        through = Transaction.categories.through.objects.filter(transaction__in=transactions.values('pk'))
+        pairs = np.array(list(through.values_list('transaction_id', 'category_id')), dtype=np.int64).reshape(-1, 2)
+        order = np.argsort(ids)
+        positions = np.searchsorted(ids, pairs[:, 0], sorter=order)
+        member_rows = order[positions] if count else np.empty(0, dtype=np.int64)
+        category_ids, member_categories = np.unique(pairs[:, 1], return_inverse=True)
+        names = dict(Category.objects.filter(pk__in=category_ids.tolist()).values_list('pk', 'category_name'))
+        category_names = [names[category_id] for category_id in category_ids.tolist()]
+        return cls(ids, epoch, amounts, types, category_names, member_rows, member_categories.reshape(-1))
+
+    @classmethod
+    def from_transactions(cls, transactions):
+        """
+        Builds the arrays from `Transaction` instances already in memory, without queries.
+
+        Parameters:
+            - transactions: Iterable of `Transaction` with their categories prefetched.
+
+        Returns:
+            - TransactionArrays: The columnar copy of the rows.
+        """
+        transactions = sorted(transactions, key=lambda t: (t.date, t.pk))
+        count = len(transactions)
+        ids = np.fromiter((t.pk for t in transactions), dtype=np.int64, count=count)
+        epoch = np.fromiter((t.date.timestamp() for t in transactions), dtype=np.float64, count=count).astype(np.int64)
+        amounts = np.fromiter((t.mount for t in transactions), dtype=np.float64, count=count)
+        types = np.fromiter((t.type for t in transactions), dtype=np.int8, count=count)
+
+        names, member_rows, member_categories = {}, [], []
+        for row, transaction in enumerate(transactions):
+            for category in transaction.categories.all():
+                member_rows.append(row)
+                member_categories.append(names.setdefault(category.pk, (len(names), category.category_name))[0])
+        category_names = [name for _, name in names.values()]
+        return cls(ids, epoch, amounts, types, category_names,
+                   np.array(member_rows, dtype=np.int64), np.array(member_categories, dtype=np.int64))
+
+    @classmethod
+    def for_user(cls, user):
+        """
+        Loads all the transactions of a user (a `User` or its ID).
+        """
+        return cls.load(Transaction.objects.filter(id_user=user))
+
+    def _type_mask(self, transaction_type):
+        if transaction_type is None:
+            return np.ones(len(self), dtype=bool)
+        return self.types == int(transaction_type)
+
+    def signed_amounts(self):
+        """
+        Returns the amounts with expenses negated.
+        """
+        return np.where(self.types == Transaction.TransEnum.EXPENSE, -self.amounts, self.amounts)
+
+    def totals(self):
+        """
+        Returns `(total income, total expenses)` rounded to 2 places.
+        """
+        sums = np.bincount(self.types, weights=self.amounts, minlength=2)
+        return (round(float(sums[Transaction.TransEnum.INCOME]), 2),
+                round(float(sums[Transaction.TransEnum.EXPENSE]), 2))
+
+    def category_totals(self, transaction_type=None):
+        """
+        Returns `(category names, totals)` sorted by name, like `summary_category_totals`.
+        Transactions without categories are reported as 'Uncategorized'.
+        """
+        mask = self._type_mask(transaction_type)
+        member_mask = mask[self.member_rows]
+        totals = np.bincount(self.member_categories[member_mask],
+                             weights=self.amounts[self.member_rows[member_mask]],
+                             minlength=len(self.category_names))
+        used = np.bincount(self.member_categories[member_mask], minlength=len(self.category_names)) > 0
+        result = {name: round(float(total), 2)
+                  for name, total, is_used in zip(self.category_names, totals, used) if is_used}
+
+        tagged = np.zeros(len(self), dtype=bool)
+        tagged[self.member_rows] = True
+        untagged = mask & ~tagged
+        if untagged.any():
+            result[UNCATEGORIZED] = round(float(self.amounts[untagged].sum()), 2)
+        names = sorted(result)
+        return names, [result[name] for name in names]
+
+    def local_datetimes(self):
+        """
+        Returns the dates as naive `datetime64[s]` values in the current time zone.
+
+        The UTC offset is looked up once per distinct hour rather than once per row.
+        """
+        hours = self.epoch // 3600
+        unique_hours, inverse = np.unique(hours, return_inverse=True)
+        zone = timezone.get_current_timezone()
+        offsets = np.fromiter(
+            (datetime.fromtimestamp(int(hour) * 3600, dt_timezone.utc).astimezone(zone).utcoffset().total_seconds()
+             for hour in unique_hours),
+            dtype=np.int64, count=len(unique_hours),
+        )
+        return (self.epoch + offsets[inverse.reshape(-1)]).astype('datetime64[s]')
+
+    def period_starts(self, period):
+        """
+        Returns the start date (`datetime64[D]`) of the `period` bucket of every row.
+        """
+        if period not in ANALYTICS_PERIODS:
+            raise ValueError(f"Invalid period '{period}'.")
+        days = self.local_datetimes().astype('datetime64[D]')
+        if period == 'daily':
+            return days
+        if period == 'weekly':
+            day_numbers = days.astype(np.int64)
+            return (day_numbers - (day_numbers + _EPOCH_WEEKDAY_SHIFT) % 7).astype('datetime64[D]')
+        unit = 'M' if period == 'monthly' else 'Y'
+        return days.astype(f'datetime64[{unit}]').astype('datetime64[D]')
+
+    def period_buckets(self, period):
+        """
+        Sums income and expenses per `period` bucket that has transactions.
+
+        Returns:
+            - list: One dict per bucket with `period`, `income`, `expense`, `balance`,
+              `income_count` and `expense_count`, in date order.
+        """
+        starts, inverse = np.unique(self.period_starts(period), return_inverse=True)
+        inverse = inverse.reshape(-1)
+        income = self.types == Transaction.TransEnum.INCOME
+        size = len(starts)
+        income_sums = np.bincount(inverse, weights=np.where(income, self.amounts, 0), minlength=size)
+        expense_sums = np.bincount(inverse, weights=np.where(income, 0, self.amounts), minlength=size)
+        income_counts = np.bincount(inverse[income], minlength=size)
+        expense_counts = np.bincount(inverse[~income], minlength=size)
+        return [
+            {
+                'period': start.item().isoformat(),
+                'income': round(float(income_sum), 2),
+                'expense': round(float(expense_sum), 2),
+                'balance': round(float(income_sum - expense_sum), 2),
+                'income_count': int(income_count),
+                'expense_count': int(expense_count),
+            }
+            for start, income_sum, expense_sum, income_count, expense_count
+            in zip(starts, income_sums, expense_sums, income_counts, expense_counts)
+        ]
+
+    def running_balance(self):
+        """
+        Returns the balance after each transaction, in date order.
+        """
+        return np.cumsum(self.signed_amounts())
+
+    def top(self, n=10, transaction_type=None):
+        """
+        Returns the `n` largest transactions, optionally of one type, largest first.
+
+        Returns:
+            - list: Dicts with `id_transaction`, `date` (aware UTC datetime) and `amount`.
+        """
+        rows = np.flatnonzero(self._type_mask(transaction_type))
+        if n <= 0 or not len(rows):
+            return []
+        if n < len(rows):
+            rows = rows[np.argpartition(-self.amounts[rows], n - 1)[:n]]
+        rows = rows[np.argsort(-self.amounts[rows], kind='stable')]
+        return [
+            {
+                'id_transaction': int(self.ids[row]),
+                'date': datetime.fromtimestamp(int(self.epoch[row]), dt_timezone.utc),
+                'amount': float(self.amounts[row]),
+            }
+            for row in rows
+        ]
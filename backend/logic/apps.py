@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class LogicConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'logic'
+
+    def ready(self):
+        from logic import signals  # noqa: F401
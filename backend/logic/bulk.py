@@ -0,0 +1,72 @@
+from django.db import connection, transaction as db_transaction
+from logic.models import User, Category, Transaction
+from logic.versioning import bump_data_version
+from logic.summaries import transaction_deltas, merge_deltas, apply_deltas
+
+
+def allowed_categories(user_ids, category_ids):
+    """
+    Returns the categories each user may tag transactions with: the user's own categories and
+    the universal ones, as listed by `get_categories_by_user`. Two queries in total.
+
+    Parameters:
+        - user_ids: IDs of the users owning the new transactions.
+        - category_ids: IDs of the categories requested for them.
+
+    Returns:
+        - dict: The set of allowed category IDs, among `category_ids`, of each user ID.
+    """
+    category_ids = set(category_ids)
+    universal = set(Category.objects.filter(id_category__in=category_ids, is_universal=True)
+                    .values_list('id_category', flat=True))
+    allowed = {user_id: set(universal) for user_id in user_ids}
+    owned = User.categories.through.objects.filter(user_id__in=allowed, category_id__in=category_ids - universal)
+    for user_id, category_id in owned.values_list('user_id', 'category_id'):
+        allowed[user_id].add(category_id)
+    return allowed
+
+
+def bulk_insert_transactions(transactions, category_ids, batch_size=1000):
+    """
+    Inserts unsaved transactions and their category associations with bulk INSERTs.
+
+    Parameters:
+        - transactions: List of unsaved `Transaction` instances.
+        - category_ids: List, parallel to `transactions`, with the category IDs of each row.
+          They are not checked here; callers taking IDs from a client validate them with
+          `allowed_categories` first.
+        - batch_size: Maximum number of rows per INSERT statement.
+
+    Returns:
+        - list: The saved transactions, with their primary keys set.
+    """
+    through = Transaction.categories.through
+    returns_keys = connection.features.can_return_rows_from_bulk_insert
+    with db_transaction.atomic():
+        if returns_keys:
+            created = Transaction.objects.bulk_create(transactions, batch_size=batch_size)
+        else:
+            # Without RETURNING the new primary keys are unknown, and the through rows need them.
+            for transaction in transactions:
+                transaction.save()
+            created = transactions
+        category_map = {
+            transaction.pk: list(dict.fromkeys(categories))
+            for transaction, categories in zip(created, category_ids)
+        }
+        through.objects.bulk_create([
+            through(transaction_id=pk, category_id=category_id)
+            for pk, categories in category_map.items()
+            for category_id in categories
+        ], batch_size=batch_size)
+        if returns_keys:
+            # bulk_create sends no signals, so the summaries and data versions are updated here.
+            apply_deltas(transaction_deltas(created, categories=category_map))
+            bump_data_version(*{transaction.id_user_id for transaction in created})
+        else:
+            # save() already summarized the rows as untagged; move them to their categories.
+            apply_deltas(merge_deltas(
+                transaction_deltas(created, sign=-1, include_total=False, categories={}),
+                transaction_deltas(created, include_total=False, categories=category_map),
+            ))
+    return created
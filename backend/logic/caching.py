@@ -0,0 +1,244 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.utils.dateparse import parse_date
+
+CACHE_STAT_NAMES = ('filter_transactions', 'forecast', 'charts', 'reports')
+STATS_KEY = 'cache-stats:{name}:{outcome}'
+
+
+def get_cache(alias_setting):
+    """
+    Returns the cache configured by the setting named `alias_setting` (a `CACHES` alias).
+    """
+    return caches[getattr(settings, alias_setting, 'default')]
+
+
+def record_cache_access(name, hit, cache=None):
+    """
+    Counts a hit or a miss of the cache `name`. The counters live in the cache named by
+    `CACHE_STATS_ALIAS`, which must be shared by every web and Celery worker for the totals
+    to cover them all.
+    """
+    cache = cache or get_cache('CACHE_STATS_ALIAS')
+    key = STATS_KEY.format(name=name, outcome='hits' if hit else 'misses')
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, timeout=None)
+        cache.incr(key)
+
+
+def get_cache_stats(cache=None):
+    """
+    Returns the hits, misses and hit rate of every cache listed in `CACHE_STAT_NAMES`.
+    """
+    cache = cache or get_cache('CACHE_STATS_ALIAS')
+    stats = {}
+    for name in CACHE_STAT_NAMES:
+        hits = cache.get(STATS_KEY.format(name=name, outcome='hits'), 0)
+        misses = cache.get(STATS_KEY.format(name=name, outcome='misses'), 0)
+        total = hits + misses
+        stats[name] = {'hits': hits, 'misses': misses, 'hit_rate': round(hits / total, 4) if total else None}
+    return stats
+
+
+def _as_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return value
+
+
+def canonical_filter_params(params):
+    """
+    Normalizes the query parameters of `filter_transactions` so that equivalent queries
+    (reordered categories, `2024-1-05` vs `2024-01-05`, `10` vs `10.0`, ...) share a cache entry.
+    """
+    canonical = {}
+    transaction_type = params.get('type')
+    if transaction_type in ('incomes', 'expenses'):
+        canonical['type'] = transaction_type
+    for name in ('start_date', 'end_date'):
+        value = params.get(name)
+        if value:
+            parsed = parse_date(value)
+            canonical[name] = parsed.isoformat() if parsed else value
+    for name in ('min_amount', 'max_amount'):
+        value = params.get(name)
+        if value:
+            canonical[name] = _as_float(value)
+    categories = params.getlist('categories')
+    if categories:
+        canonical['categories'] = sorted({str(c) for c in categories}, key=lambda c: (len(c), c))
+    for name in ('cursor', 'page_size'):
+        if params.get(name):
+            canonical[name] = params.get(name)
+    return canonical
+
+
+def filter_cache_key(id_user, version, params):
+    """
+    Builds the cache key of a `filter_transactions` result. The user's data version is part of
+    the key, so any write makes the old entries unreachable and they simply expire.
+    """
+    payload = json.dumps(canonical_filter_params(params), sort_keys=True)
+    digest = hashlib.sha1(payload.encode('utf-8')).hexdigest()
+    return f'filter-transactions:v2:{id_user}:{version}:{digest}'
+
+
+def forecast_cache_key(id_user, version, start, days):
+    """
+    Builds the cache key of a cash-flow forecast. Besides the data version, the first day is
+    part of the key because the forecast moves with the calendar.
+    """
+    return f'forecast:{id_user}:{version}:{start.isoformat()}:{days}'
+
+
+def chart_cache_key(kind, *series, **params):
+    """
+    Builds a content address for a chart: a digest of its kind, its parameters and the data
+    it plots. Two requests that would draw the same picture share the key, whoever asks.
+
+    Parameters:
+        - kind: Name and style version of the chart renderer.
+        - series: The plotted data; NumPy arrays are hashed by dtype, shape and raw bytes,
+          anything else by its JSON form.
+        - params: Chart parameters such as title, colors and size.
+    """
+    digest = hashlib.sha256(kind.encode('utf-8'))
+    for values in series:
+        if hasattr(values, 'tobytes'):
+            digest.update(f'{values.dtype}{values.shape}'.encode('utf-8'))
+            digest.update(values.tobytes())
+        else:
+            digest.update(json.dumps(values, default=str).encode('utf-8'))
+        digest.update(b'|')
+    digest.update(json.dumps(params, sort_keys=True, default=str).encode('utf-8'))
+    return f'chart:{digest.hexdigest()}'
+
+
+def report_cache_key(id_user, version, **params):
+    """
+    Builds the cache key of a finished report. The user's data version makes every write
+    invalidate the user's reports; `params` are the report options, such as the period.
+    """
+    payload = json.dumps(params, sort_keys=True, default=str)
+    digest = hashlib.sha1(payload.encode('utf-8')).hexdigest()
+    return f'report:{id_user}:{version}:{digest}'
+
+
+class BytesCache:
+    """
+    Two-level cache of rendered documents (bytes).
+
+    A per-process LRU bounded by the `max_bytes_setting` answers repeated requests without any
+    I/O. Misses fall through to the cache named by `alias_setting` (Redis or file based in
+    production), shared by every web and Celery worker, before rendering. A local memory alias
+    is skipped: it would only hold a second, unbounded copy of the LRU in each process. Subclasses
+    name the settings and the statistics counter.
+    """
+    stat_name = None
+    alias_setting = None
+    timeout_setting = None
+    max_bytes_setting = None
+
+    def __init__(self, max_bytes=None):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.lock = threading.Lock()
+
+    @property
+    def limit(self):
+        return self.max_bytes if self.max_bytes is not None else getattr(settings, self.max_bytes_setting)
+
+    @property
+    def shared(self):
+        """
+        The cache configured by `alias_setting`, or None when it is local to the process.
+        """
+        cache = get_cache(self.alias_setting)
+        return None if isinstance(cache, LocMemCache) else cache
+
+    def get(self, key):
+        """
+        Returns the document stored under `key`, or None, and counts the hit or miss.
+        """
+        with self.lock:
+            document = self.entries.get(key)
+            if document is not None:
+                self.entries.move_to_end(key)
+                record_cache_access(self.stat_name, True)
+                return document
+        shared = self.shared
+        document = shared.get(key) if shared is not None else None
+        record_cache_access(self.stat_name, document is not None)
+        if document is not None:
+            self._remember(key, document)
+        return document
+
+    def put(self, key, document):
+        """
+        Stores a freshly rendered document in both layers.
+        """
+        shared = self.shared
+        if shared is not None:
+            shared.set(key, document, getattr(settings, self.timeout_setting))
+        self._remember(key, document)
+
+    def get_or_render(self, key, render):
+        """
+        Returns the document stored under `key`, calling `render()` to produce it on a miss.
+        """
+        document = self.get(key)
+        if document is None:
+            document = render()
+            self.put(key, document)
+        return document
+
+    def _remember(self, key, document):
+        if len(document) > self.limit:
+            return
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                return
+            self.entries[key] = document
+            self.size += len(document)
+            while self.size > self.limit:
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+
+class ChartCache(BytesCache):
+    """
+    Cache of rendered chart images by content address.
+    """
+    stat_name = 'charts'
+    alias_setting = 'CHART_CACHE_ALIAS'
+    timeout_setting = 'CHART_CACHE_TIMEOUT'
+    max_bytes_setting = 'CHART_CACHE_MAX_BYTES'
+
+
+class ReportCache(BytesCache):
+    """
+    Cache of finished report PDFs by `report_cache_key`.
+    """
+    stat_name = 'reports'
+    alias_setting = 'REPORT_CACHE_ALIAS'
+    timeout_setting = 'REPORT_CACHE_TIMEOUT'
+    max_bytes_setting = 'REPORT_CACHE_MAX_BYTES'
+
+
+chart_cache = ChartCache()
+report_cache = ReportCache()
@@ -0,0 +1,221 @@
+import multiprocessing
+import os
+import random
+import numpy as np
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+
+# Charts are drawn on Agg canvases through the object-oriented API, never pyplot, so there is no
+# global figure state. The renderers only need matplotlib and NumPy: the pool workers import this
+# module on their own, so it must not import Django models. matplotlib is imported by the
+# functions that draw, so processes that never render a chart do not pay for loading it.
+_pool = None
+_pool_workers = None
+_pool_pid = None
+# Set by `start_pool` when a web process boots; forked server workers inherit it. Every other
+# process (Celery children, management commands, tests) draws charts in-process.
+_pool_enabled = False
+_pool_lock = threading.Lock()
+
+
+def figure_png(fig):
+    """
+    Renders a figure to PNG bytes on an Agg canvas.
+    """
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    buffer = BytesIO()
+    FigureCanvasAgg(fig).print_png(buffer)
+    return buffer.getvalue()
+
+
+def lttb(x, y, max_points):
+    """
+    Picks the points of a series that keep its visual shape (Largest-Triangle-Three-Buckets).
+
+    The first and last points are kept; the others are split into `max_points - 2` buckets, and
+    from each bucket the point forming the largest triangle with the previously kept point and
+    the average of the next bucket is kept. Peaks and dips therefore survive the reduction.
+
+    Parameters:
+        - x: Sorted x values (numbers or `datetime64`).
+        - y: The y values.
+        - max_points: Number of points to keep; shorter series, or values below 3, keep every point.
+
+    Returns:
+        - ndarray: Sorted indices of the kept points.
+    """
+    count = len(x)
+    if max_points < 3 or count <= max_points:
+        return np.arange(count)
+    xs = np.asarray(x)
+    xs = (xs.astype(np.int64) if xs.dtype.kind == 'M' else xs).astype(np.float64)
+    ys = np.asarray(y, dtype=np.float64)
+    bounds = (np.arange(max_points - 1) * ((count - 2) / (max_points - 2))).astype(np.int64) + 1
+    bounds[-1] = count - 1
+    kept = np.empty(max_points, dtype=np.int64)
+    kept[0], kept[-1] = 0, count - 1
+    previous = 0
+    for bucket in range(max_points - 2):
+        start, stop = bounds[bucket], bounds[bucket + 1]
+        following = slice(stop, bounds[bucket + 2]) if bucket + 2 < len(bounds) else slice(count - 1, count)
+        next_x, next_y = xs[following].mean(), ys[following].mean()
+        areas = np.abs((xs[previous] - next_x) * (ys[start:stop] - ys[previous])
+                       - (xs[previous] - xs[start:stop]) * (next_y - ys[previous]))
+        previous = start + int(np.argmax(areas))
+        kept[bucket + 1] = previous
+    return kept
+
+
+def downsample_series(x, y, max_points):
+    """
+    Returns the `x` and `y` arrays reduced to at most `max_points` points with `lttb`.
+    """
+    kept = lttb(x, y, max_points)
+    return np.asarray(x)[kept], np.asarray(y)[kept]
+
+
+def line_chart(dates, amounts, label, color, title):
+    """
+    Renders the amounts of one transaction type over time.
+    """
+    from matplotlib.dates import DateFormatter, AutoDateLocator
+    from matplotlib.figure import Figure
+    fig = Figure(figsize=(16, 9))
+    ax = fig.add_subplot()
+    ax.plot(dates, amounts, label=label, color=color, linewidth=2)
+    ax.scatter(dates, amounts, color='black', zorder=5, label='Entries')
+    ax.set_xlabel('Date')
+    ax.set_ylabel('Amount ($)')
+    ax.set_title(title)
+    ax.xaxis.set_major_locator(AutoDateLocator())
+    ax.xaxis.set_major_formatter(DateFormatter("%Y-%m-%d"))
+    ax.tick_params(axis='x', rotation=45)
+    ax.legend()
+    ax.grid(visible=True, linestyle='--', alpha=0.6)
+    return figure_png(fig)
+
+
+def pie_chart(names, totals, title):
+    """
+    Renders the split of one transaction type by category. A type without transactions gets
+    an empty chart instead of failing.
+    """
+    from matplotlib.colors import to_hex
+    from matplotlib.figure import Figure
+    colors = [to_hex((random.random(), random.random(), random.random())) for _ in names]
+    fig = Figure(figsize=(8, 8))
+    ax = fig.add_subplot()
+    if any(totals):
+        ax.pie(totals, labels=names, autopct='%1.1f%%', colors=colors)
+    else:
+        ax.text(0.5, 0.5, 'No data', ha='center', va='center')
+        ax.axis('off')
+    ax.set_title(title)
+    return figure_png(fig)
+
+
+CHART_RENDERERS = {
+    'line': line_chart,
+    'pie': pie_chart,
+}
+
+
+def render_chart(kind, args, kwargs):
+    """
+    Renders one chart described by a `(kind, args, kwargs)` spec; runs in the pool workers.
+    """
+    return CHART_RENDERERS[kind](*args, **kwargs)
+
+
+def warm_up():
+    """
+    Pays the one-off costs of a rendering process: loads the font cache and the Agg text
+    machinery by drawing a small figure.
+    """
+    from matplotlib.figure import Figure
+    fig = Figure(figsize=(1, 1))
+    fig.add_subplot().set_title('warm-up')
+    figure_png(fig)
+
+
+def can_use_pool():
+    """
+    Whether this process may start worker processes. Daemonic processes, such as the
+    children of a prefork Celery worker, cannot; they render in-process instead.
+    """
+    return not multiprocessing.current_process().daemon
+
+
+def get_pool(workers):
+    """
+    Returns the process pool with `workers` processes, starting it on first use. A pool
+    inherited from a parent process (e.g. a server that forks its workers after loading the
+    application) cannot be used, so each process starts its own.
+    """
+    global _pool, _pool_workers, _pool_pid
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers or _pool_pid != os.getpid():
+            if _pool is not None and _pool_pid == os.getpid():
+                _pool.shutdown(wait=False)
+            _pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('forkserver'),
+                initializer=warm_up,
+            )
+            _pool_workers = workers
+            _pool_pid = os.getpid()
+        return _pool
+
+
+def start_pool(workers):
+    """
+    Starts the pool and its `workers` processes without waiting for them, so that they load
+    matplotlib and the font cache (see `warm_up`) before the first report instead of during it.
+    Called when a web process boots, and only processes that called it use a pool; those that
+    cannot have children are skipped.
+    """
+    global _pool_enabled
+    if not workers or not can_use_pool():
+        return
+    _pool_enabled = True
+    pool = get_pool(workers)
+    # The executor starts a process per task that finds no idle one.
+    for _ in range(workers):
+        pool.submit(os.getpid)
+
+
+def shutdown_pool():
+    """
+    Stops the worker processes; the next render of a process that called `start_pool` starts
+    a new pool.
+    """
+    global _pool, _pool_workers, _pool_pid
+    with _pool_lock:
+        if _pool is not None and _pool_pid == os.getpid():
+            _pool.shutdown(wait=True)
+        _pool, _pool_workers, _pool_pid = None, None, None
+
+
+def render_charts(specs, workers=0):
+    """
+    Renders several charts concurrently.
+
+    Parameters:
+        - specs: Mapping of chart name to `(kind, args, kwargs)`, with `kind` a key of
+          `CHART_RENDERERS`.
+        - workers: Size of the process pool; 0, a single chart, or a process that did not
+          call `start_pool` renders in-process.
+
+    Returns:
+        - dict: PNG bytes of each chart, by name.
+    """
+    if workers and len(specs) > 1 and _pool_enabled and can_use_pool():
+        try:
+            pool = get_pool(workers)
+            futures = {name: pool.submit(render_chart, *spec) for name, spec in specs.items()}
+            return {name: future.result() for name, future in futures.items()}
+        except BrokenProcessPool:
+            shutdown_pool()
+    return {name: render_chart(*spec) for name, spec in specs.items()}
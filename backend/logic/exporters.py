@@ -0,0 +1,278 @@
+import csv
+import json
+import pickle
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from django.conf import settings
+from django.db.models import Prefetch
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils import timezone
+from logic.models import Transaction, Category, ExportJob
+from logic.pagination import iter_keyset_chunks
+
+# Rows fetched from the database per query.
+EXPORT_CHUNK_SIZE = 2000
+# Content type of each format; the transaction export endpoint streams CSV and NDJSON, the
+# admin actions write CSV, XLSX and PDF.
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'pdf': 'application/pdf',
+}
+TRANSACTION_EXPORT_COLUMNS = ['id', 'date', 'type', 'amount', 'description', 'category']
+TYPE_LABELS = {
+    Transaction.TransEnum.INCOME: 'income',
+    Transaction.TransEnum.EXPENSE: 'expense',
+}
+
+
+class Echo:
+    """
+    File-like object whose `write` returns the value instead of storing it, so `csv.writer`
+    can produce one line at a time for a streaming response.
+    """
+    def write(self, value):
+        return value
+
+
+def iter_export_transactions(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yields the transactions of `queryset` with their category names, one chunk per query.
+
+    Category names are loaded with a single prefetch query per chunk.
+    """
+    queryset = queryset.prefetch_related(
+        Prefetch('categories', queryset=Category.objects.only('id_category', 'category_name')))
+    for chunk in iter_keyset_chunks(queryset, ('date', 'id_transaction'), chunk_size):
+        yield from chunk
+
+
+def stream_transactions_csv(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yields CSV lines for `queryset`. The columns match the defaults of the statement importer,
+    so an exported file can be imported back.
+    """
+    writer = csv.writer(Echo())
+    yield writer.writerow(TRANSACTION_EXPORT_COLUMNS)
+    for transaction in iter_export_transactions(queryset, chunk_size):
+        yield writer.writerow([
+            transaction.id_transaction,
+            transaction.date.isoformat(),
+            TYPE_LABELS.get(transaction.type, transaction.type),
+            transaction.mount,
+            transaction.description or '',
+            ';'.join(category.category_name for category in transaction.categories.all()),
+        ])
+
+
+def stream_transactions_ndjson(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yields one JSON document per line for `queryset`.
+    """
+    for transaction in iter_export_transactions(queryset, chunk_size):
+        yield json.dumps({
+            'id_transaction': transaction.id_transaction,
+            'date': transaction.date.isoformat(),
+            'type': transaction.type,
+            'mount': transaction.mount,
+            'description': transaction.description,
+            'categories': [category.category_name for category in transaction.categories.all()],
+        }) + '\n'
+
+
+EXPORT_STREAMS = {
+    'csv': stream_transactions_csv,
+    'ndjson': stream_transactions_ndjson,
+}
+
+
+# Admin exports of any model, row by row. A foreign key is exported as its primary key, read
+# from the row itself. openpyxl and ReportLab are imported by the writers that use them, like
+# matplotlib in `logic.charts`.
+
+# Text cells of the PDF longer than this are wrapped in a Paragraph; shorter ones are drawn as
+# plain strings, which is much cheaper.
+PDF_WRAP_CHARACTERS = 30
+
+# Values openpyxl writes as they are; anything else (e.g. a UUID) is written as text.
+EXCEL_TYPES = (str, int, float, Decimal, date, time, timedelta)
+
+
+def export_fields(model):
+    """
+    Returns the names of the concrete fields of a model, in declaration order.
+    """
+    return [field.name for field in model._meta.fields]
+
+
+def export_title(model):
+    return f"Exportación de {model._meta.verbose_name_plural.capitalize()}"
+
+
+def iter_export_rows(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yields the values of the concrete fields of every row of `queryset`, in primary key order.
+
+    The rows are read with `iter_keyset_chunks`, so only one chunk is held in memory even on
+    drivers that buffer a whole result on the client.
+    """
+    fields = queryset.model._meta.fields
+    for chunk in iter_keyset_chunks(queryset, ('pk',), chunk_size):
+        for instance in chunk:
+            yield [getattr(instance, field.attname) for field in fields]
+
+
+def iter_csv(field_names, rows):
+    """
+    Yields the CSV lines of the header and the rows.
+    """
+    writer = csv.writer(Echo())
+    yield writer.writerow(field_names)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def write_csv(file, field_names, rows, title=None):
+    """
+    Writes the rows as UTF-8 CSV to a binary file.
+    """
+    for line in iter_csv(field_names, rows):
+        file.write(line.encode('utf-8'))
+
+
+def excel_value(value):
+    # Excel has no time zones: aware datetimes are written in the current time zone.
+    if isinstance(value, datetime) and timezone.is_aware(value):
+        return timezone.localtime(value).replace(tzinfo=None)
+    if value is None or isinstance(value, EXCEL_TYPES):
+        return value
+    return str(value)
+
+
+def write_xlsx(file, field_names, rows, title=None):
+    """
+    Writes the rows to an XLSX workbook in openpyxl's write-only mode, which streams them to a
+    temporary file instead of keeping a cell object per value.
+    """
+    from openpyxl import Workbook
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Exportación")
+    sheet.append(field_names)
+    for row in rows:
+        sheet.append([excel_value(value) for value in row])
+    workbook.save(file)
+
+
+def write_pdf(file, field_names, rows, title=None):
+    """
+    Draws the rows as landscape A4 tables with ReportLab platypus, one `Table` flowable per
+    `EXPORT_CHUNK_SIZE` rows; platypus splits them across pages and repeats the header.
+    """
+    from xml.sax.saxutils import escape
+    from reportlab.lib.pagesizes import A4, landscape
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import Paragraph, SimpleDocTemplate, Table
+    from logic.reportlab_report import MARGIN, TABLE_STYLE, number_page
+
+    styles = getSampleStyleSheet()
+    cell = styles['BodyText'].clone('cell', fontSize=8, leading=9)
+    page_size = landscape(A4)
+    widths = [(page_size[0] - 2 * MARGIN) / len(field_names)] * len(field_names)
+
+    def text(value):
+        value = '' if value is None else str(value)
+        return Paragraph(escape(value), cell) if len(value) > PDF_WRAP_CHARACTERS else value
+
+    story = [Paragraph(title or '', styles['Title'])]
+    chunk = []
+    for row in rows:
+        chunk.append([text(value) for value in row])
+        if len(chunk) == EXPORT_CHUNK_SIZE:
+            story.append(Table([field_names] + chunk, colWidths=widths, repeatRows=1, style=TABLE_STYLE))
+            chunk = []
+    if chunk or len(story) == 1:
+        story.append(Table([field_names] + chunk, colWidths=widths, repeatRows=1, style=TABLE_STYLE))
+    document = SimpleDocTemplate(file, pagesize=page_size, leftMargin=MARGIN, rightMargin=MARGIN,
+                                 topMargin=MARGIN, bottomMargin=MARGIN, title=title or '')
+    document.build(story, onFirstPage=number_page, onLaterPages=number_page)
+
+
+ADMIN_EXPORT_WRITERS = {
+    'csv': write_csv,
+    'xlsx': write_xlsx,
+    'pdf': write_pdf,
+}
+
+
+def export_response(queryset, fmt):
+    """
+    Exports a queryset as a download.
+
+    CSV is streamed line by line while the rows are read. XLSX and PDF need the whole document
+    before it can be sent: the XLSX rows go to openpyxl's temporary file, and the PDF only holds
+    their text cells until platypus lays them out.
+
+    Parameters:
+        - queryset: The rows to export.
+        - fmt: One of `ADMIN_EXPORT_WRITERS`.
+
+    Returns:
+        - HttpResponse: The file as an attachment.
+    """
+    field_names = export_fields(queryset.model)
+    rows = iter_export_rows(queryset)
+    if fmt == 'csv':
+        response = StreamingHttpResponse(iter_csv(field_names, rows), content_type=EXPORT_FORMATS[fmt])
+    else:
+        response = HttpResponse(content_type=EXPORT_FORMATS[fmt])
+        ADMIN_EXPORT_WRITERS[fmt](response, field_names, rows, title=export_title(queryset.model))
+    response['Content-Disposition'] = f'attachment; filename="export.{fmt}"'
+    return response
+
+
+def create_export_job(queryset, fmt, row_count):
+    """
+    Records the query of the selected rows in a new `ExportJob`, to be written by the
+    `build_export` task.
+
+    The query is pickled (see "Pickling QuerySets" in the Django documentation) rather than
+    evaluated, so the request never reads the selection, however large.
+
+    Parameters:
+        - queryset: The rows to export.
+        - fmt: One of `ADMIN_EXPORT_WRITERS`.
+        - row_count: Number of selected rows, as counted by the caller.
+
+    Returns:
+        - ExportJob: The pending job.
+    """
+    return ExportJob.objects.create(model=queryset.model._meta.label_lower, format=fmt,
+                                    query=pickle.dumps(queryset.query), row_count=row_count)
+
+
+def write_export_job(job, file):
+    """
+    Writes the rows of an export job to a binary file in the job's format.
+    """
+    model = job.get_model()
+    queryset = model._default_manager.all()
+    queryset.query = pickle.loads(job.query)
+    ADMIN_EXPORT_WRITERS[job.format](file, export_fields(model), iter_export_rows(queryset), title=export_title(model))
+
+
+def prune_export_jobs():
+    """
+    Deletes the export jobs older than `EXPORT_JOB_RETENTION_DAYS` together with their files.
+
+    Returns:
+        - int: Number of deleted jobs.
+    """
+    old_jobs = ExportJob.objects.filter(created_at__lt=timezone.now() - timedelta(days=settings.EXPORT_JOB_RETENTION_DAYS))
+    count = 0
+    for job in old_jobs.iterator():
+        if job.file:
+            job.file.delete(save=False)
+        job.delete()
+        count += 1
+    return count
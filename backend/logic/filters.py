@@ -0,0 +1,42 @@
+from datetime import datetime
+from django.utils.dateparse import parse_date
+from logic.models import Transaction
+
+
+def filter_transactions_queryset(id_user, params):
+    """
+    Builds the queryset used by `filter_transactions` from its query parameters.
+
+    Parameters:
+        - id_user: The ID of the user whose transactions are filtered.
+        - params: A `QueryDict` (or any mapping with `get` and `getlist`) that may contain
+          `start_date`, `end_date`, `categories`, `min_amount`, `max_amount` and `type`.
+
+    Returns:
+        - QuerySet: The filtered transactions of the user.
+    """
+    start_date = params.get('start_date')
+    end_date = params.get('end_date')
+    categories = params.getlist('categories')
+    min_amount = params.get('min_amount')
+    max_amount = params.get('max_amount')
+    transaction_type = params.get('type')
+
+    transactions = Transaction.objects.filter(id_user=id_user)
+
+    if transaction_type == 'expenses':
+        transactions = transactions.filter(type=Transaction.TransEnum.EXPENSE)
+    elif transaction_type == 'incomes':
+        transactions = transactions.filter(type=Transaction.TransEnum.INCOME)
+    if start_date:
+        transactions = transactions.filter(date__gte=parse_date(start_date))
+    if end_date:
+        end_date = datetime.combine(parse_date(end_date), datetime.max.time())
+        transactions = transactions.filter(date__lte=end_date)
+    if min_amount:
+        transactions = transactions.filter(mount__gte=float(min_amount))
+    if max_amount:
+        transactions = transactions.filter(mount__lte=float(max_amount))
+    if categories:
+        transactions = transactions.filter(categories__in=categories).distinct()
+    return transactions
@@ -0,0 +1,143 @@
+from datetime import timedelta
+import numpy as np
+from django.utils import timezone
+from logic.models import ScheduledTransaction, Transaction
+from logic.summaries import summary_totals
+
+DEFAULT_FORECAST_DAYS = 90
+MAX_FORECAST_DAYS = 5 * 366
+
+# Larger than any day of the month; used to restart a cumulative minimum at each schedule.
+_SEGMENT_SPAN = 64
+
+
+def _days_in_month(months):
+    """
+    Returns the number of days of each `datetime64[M]` month.
+    """
+    return ((months + 1).astype('datetime64[D]') - months.astype('datetime64[D]')).astype(np.int64)
+
+
+def _segment_offsets(counts):
+    """
+    Returns, for schedules with `counts` occurrences each, the schedule index and the
+    occurrence number (0, 1, ...) of every occurrence.
+    """
+    segments = np.repeat(np.arange(len(counts)), counts)
+    starts = np.cumsum(counts) - counts
+    return segments, np.arange(counts.sum()) - np.repeat(starts, counts)
+
+
+def _expand_fixed(first_days, end, step_days):
+    """
+    Expands schedules repeating every `step_days` days, starting on `first_days`.
+    """
+    counts = np.where(first_days <= end, (end - first_days).astype(np.int64) // step_days + 1, 0)
+    segments, occurrence = _segment_offsets(counts)
+    return segments, first_days[segments] + occurrence * step_days
+
+
+def _expand_calendar(first_days, end, step_months):
+    """
+    Expands schedules repeating every `step_months` months (12 for yearly).
+
+    `process_scheduled_transactions` adds a `relativedelta` to the stored date each time, so
+    a day clamped to a shorter month stays clamped afterwards (Jan 31, Feb 28, Mar 28, ...).
+    That is reproduced with a cumulative minimum of the day over each schedule's occurrences.
+    """
+    first_months = first_days.astype('datetime64[M]')
+    end_month = np.datetime64(end, 'M')
+    counts = np.where(
+        first_days <= end,
+        (end_month - first_months).astype(np.int64) // step_months + 1,
+        0,
+    )
+    segments, occurrence = _segment_offsets(counts)
+    months = first_months[segments] + occurrence * step_months
+    first_day_numbers = (first_days - first_months.astype('datetime64[D]')).astype(np.int64) + 1
+    days = np.minimum(first_day_numbers[segments], _days_in_month(months))
+    days = np.minimum.accumulate(days - segments * _SEGMENT_SPAN) + segments * _SEGMENT_SPAN
+    dates = months.astype('datetime64[D]') + (days - 1)
+    keep = dates <= end
+    return segments[keep], dates[keep]
+
+
+EXPANDERS = {
+    'daily': lambda first_days, end: _expand_fixed(first_days, end, 1),
+    'weekly': lambda first_days, end: _expand_fixed(first_days, end, 7),
+    'monthly': lambda first_days, end: _expand_calendar(first_days, end, 1),
+    'yearly': lambda first_days, end: _expand_calendar(first_days, end, 12),
+    'none': lambda first_days, end: (np.flatnonzero(first_days <= end), first_days[first_days <= end]),
+}
+
+
+def expand_schedules(schedules, start, end):
+    """
+    Expands scheduled transactions into their dated occurrences up to `end`.
+
+    Occurrences due before `start` have not been posted yet, so they are moved to `start`.
+
+    Parameters:
+        - schedules: Iterable of `(schedule_date, repeat, signed amount)` tuples.
+        - start, end: First and last `date` of the forecast.
+
+    Returns:
+        - tuple: `datetime64[D]` occurrence dates and their signed amounts.
+    """
+    schedules = list(schedules)
+    start, end = np.datetime64(start, 'D'), np.datetime64(end, 'D')
+    dates, amounts = [np.empty(0, dtype='datetime64[D]')], [np.empty(0)]
+    for repeat, expand in EXPANDERS.items():
+        group = [(schedule_date, amount) for schedule_date, rule, amount in schedules if rule == repeat]
+        if not group:
+            continue
+        first_days = np.array([schedule_date for schedule_date, _ in group], dtype='datetime64[D]')
+        group_amounts = np.array([amount for _, amount in group], dtype=np.float64)
+        segments, occurrences = expand(first_days, end)
+        dates.append(np.maximum(occurrences, start))
+        amounts.append(group_amounts[segments])
+    return np.concatenate(dates), np.concatenate(amounts)
+
+
+def forecast_balance(user, days=DEFAULT_FORECAST_DAYS, start=None):
+    """
+    Projects a user's daily balance by applying their scheduled transactions to the current balance.
+
+    Parameters:
+        - user: The `User` to forecast.
+        - days: Number of days in the forecast, starting today.
+        - start: Optional first day, today in the current time zone by default.
+
+    Returns:
+        - dict: `start`, `end`, `current_balance`, the daily `balances`, the `negative_days`
+          and the `lowest` point of the curve.
+    """
+    start = start or timezone.localdate()
+    end = start + timedelta(days=days - 1)
+    total_income, total_expenses = summary_totals(user)
+    current_balance = round(total_income - total_expenses, 2)
+
+    schedules = (
+        (schedule_date, repeat, -amount if type_ == Transaction.TransEnum.EXPENSE else amount)
+        for schedule_date, repeat, amount, type_ in ScheduledTransaction.objects.filter(user=user)
+        .values_list('schedule_date', 'repeat', 'amount', 'type')
+    )
+    dates, amounts = expand_schedules(schedules, start, end)
+    day_index = (dates - np.datetime64(start, 'D')).astype(np.int64)
+    curve = current_balance + np.cumsum(np.bincount(day_index, weights=amounts, minlength=days))
+    curve = np.round(curve, 2)
+
+    day_dates = np.arange(np.datetime64(start, 'D'), np.datetime64(end, 'D') + 1)
+    balances = [
+        {'date': day.item().isoformat(), 'balance': float(balance)}
+        for day, balance in zip(day_dates, curve)
+    ]
+    lowest = int(np.argmin(curve))
+    return {
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'current_balance': current_balance,
+        'balances': balances,
+        'negative_days': [balances[i] for i in np.flatnonzero(curve < 0)],
+        'lowest': balances[lowest],
+    }
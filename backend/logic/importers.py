@@ -0,0 +1,304 @@
+import csv
+import io
+import json
+import re
+from datetime import datetime, time
+from dateutil import parser as date_parser
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from logic.bulk import bulk_insert_transactions
+from logic.models import Transaction
+from logic.views.category_views import create_or_associate_category_logic
+
+IMPORT_FORMATS = ('csv', 'ofx', 'qif')
+IMPORT_CHUNK_SIZE = 1000
+MAX_REPORTED_ERRORS = 100
+
+DEFAULT_CSV_COLUMNS = {
+    'date': 'date',
+    'mount': 'amount',
+    'description': 'description',
+    'type': 'type',
+    'categories': 'category',
+}
+
+TYPE_NAMES = {
+    'income': Transaction.TransEnum.INCOME,
+    'incomes': Transaction.TransEnum.INCOME,
+    '0': Transaction.TransEnum.INCOME,
+    'expense': Transaction.TransEnum.EXPENSE,
+    'expenses': Transaction.TransEnum.EXPENSE,
+    '1': Transaction.TransEnum.EXPENSE,
+}
+
+
+class ImportRowError(ValueError):
+    """Raised when a statement row cannot be mapped to a transaction."""
+
+
+def detect_format(filename, requested=None):
+    """
+    Returns the statement format from the explicit `requested` value or the file extension.
+    """
+    fmt = (requested or filename.rsplit('.', 1)[-1]).lower()
+    if fmt not in IMPORT_FORMATS:
+        raise ValueError(f"Unsupported format '{fmt}'. Use one of: {', '.join(IMPORT_FORMATS)}.")
+    return fmt
+
+
+def parse_columns(value):
+    """
+    Reads the CSV column mapping of a request: a JSON object mapping some of the keys of
+    `DEFAULT_CSV_COLUMNS` to CSV headers.
+
+    Returns:
+        - dict: The mapping, or None when `value` is empty.
+
+    Raises:
+        - ValueError: If `value` is not such an object.
+    """
+    if not value:
+        return None
+    columns = json.loads(value)
+    if not isinstance(columns, dict) or not all(isinstance(header, str) for header in columns.values()):
+        raise ValueError("columns must be a JSON object mapping field names to CSV headers.")
+    unknown = [field for field in columns if field not in DEFAULT_CSV_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown columns: {', '.join(unknown)}. Use: {', '.join(DEFAULT_CSV_COLUMNS)}.")
+    return columns
+
+
+def iter_csv_rows(stream, columns=None):
+    """
+    Yields one raw row per CSV line, mapped to `Transaction` field names.
+
+    Parameters:
+        - stream: Text stream positioned at the header line.
+        - columns: Mapping of `Transaction` field name to CSV header; see `DEFAULT_CSV_COLUMNS`.
+    """
+    columns = {**DEFAULT_CSV_COLUMNS, **(columns or {})}
+    for line in csv.DictReader(stream):
+        yield {field: line.get(header) for field, header in columns.items()}
+
+
+def iter_ofx_rows(stream):
+    """
+    Yields one raw row per `<STMTTRN>` block of an OFX (SGML or XML) statement.
+    """
+    current = None
+    for line in stream:
+        for tag, value in re.findall(r'<(/?\w+)>([^<\r\n]*)', line):
+            tag = tag.upper()
+            if tag == 'STMTTRN':
+                current = {}
+            elif tag == '/STMTTRN' and current is not None:
+                description = ' '.join(filter(None, [current.get('NAME'), current.get('MEMO')]))
+                yield {
+                    'date': current.get('DTPOSTED'),
+                    'mount': current.get('TRNAMT'),
+                    'description': description or None,
+                    'type': None,
+                    'categories': None,
+                }
+                current = None
+            elif current is not None and not tag.startswith('/'):
+                current[tag] = value.strip()
+
+
+def iter_qif_rows(stream):
+    """
+    Yields one raw row per `^`-terminated record of a QIF statement.
+    """
+    current = {}
+    for line in stream:
+        line = line.rstrip('\r\n')
+        if not line or line.startswith('!'):
+            continue
+        code, value = line[0], line[1:].strip()
+        if code == '^':
+            if current:
+                description = ' '.join(filter(None, [current.get('P'), current.get('M')]))
+                yield {
+                    'date': current.get('D'),
+                    'mount': current.get('T') or current.get('U'),
+                    'description': description or None,
+                    'type': None,
+                    'categories': current.get('L'),
+                }
+            current = {}
+        else:
+            current[code] = value
+
+
+ROW_READERS = {
+    'csv': iter_csv_rows,
+    'ofx': iter_ofx_rows,
+    'qif': iter_qif_rows,
+}
+
+
+def parse_statement_date(value):
+    """
+    Parses the date formats found in CSV, OFX (`YYYYMMDDHHMMSS[.xxx][TZ]`) and QIF files.
+
+    Raises:
+        - ImportRowError: If the value is not a date, or names a day that does not exist
+          (e.g. `2024-02-30`).
+    """
+    if not value:
+        return timezone.now()
+    value = value.strip()
+    try:
+        ofx = re.fullmatch(r'(\d{8})(\d{6})?(\.\d+)?(\[.*\])?', value)
+        if ofx:
+            parsed = datetime.strptime(ofx.group(1) + (ofx.group(2) or '000000'), '%Y%m%d%H%M%S')
+        else:
+            parsed = parse_datetime(value)
+            if parsed is None:
+                day = parse_date(value)
+                if day is not None:
+                    parsed = datetime.combine(day, time.min)
+                else:
+                    parsed = date_parser.parse(value.replace("'", '/'))
+    except (ValueError, OverflowError):
+        raise ImportRowError(f"Invalid date '{value}'.")
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def parse_statement_amount(value):
+    """
+    Parses an amount such as `-1,234.50`, `1.234,50`, `$99` or the accounting negative `(12.00)`.
+
+    When both `.` and `,` appear, the last one is the decimal separator. A lone `,` is a
+    thousands separator only when it is followed by groups of exactly three digits.
+
+    Raises:
+        - ImportRowError: If the value is missing or is not an amount.
+    """
+    if value is None or not str(value).strip():
+        raise ImportRowError("Missing amount.")
+    text = str(value).strip()
+    negative = text.startswith('(') and text.endswith(')')
+    number = re.sub(r'[^\d.,\-+]', '', text)
+    if ',' in number and '.' in number:
+        thousands = '.' if number.rindex(',') > number.rindex('.') else ','
+        number = number.replace(thousands, '').replace(',', '.')
+    elif ',' in number:
+        grouped = re.fullmatch(r'[-+]?\d{1,3}(,\d{3})+', number)
+        number = number.replace(',', '') if grouped else number.replace(',', '.')
+    try:
+        amount = float(number)
+    except ValueError:
+        raise ImportRowError(f"Invalid amount '{value}'.")
+    if negative:
+        if amount < 0:
+            raise ImportRowError(f"Invalid amount '{value}'.")
+        amount = -amount
+    return amount
+
+
+def split_category_names(value):
+    """
+    Splits a category cell such as `Food;Groceries` or a QIF `Food:Groceries` into names.
+    """
+    if not value:
+        return []
+    return [name.strip()[:35] for name in re.split(r'[;|:]', value) if name.strip()]
+
+
+class CategoryResolver:
+    """
+    Resolves category names to IDs for one user, creating or associating them once per name.
+    """
+    def __init__(self, user):
+        self.user = user
+        self.cache = {}
+
+    def __call__(self, name):
+        key = name.lower()
+        if key not in self.cache:
+            result = create_or_associate_category_logic(name, self.user)
+            self.cache[key] = result["category"].id_category
+        return self.cache[key]
+
+
+def build_transaction(user, raw, resolve_category):
+    """
+    Maps one raw statement row to an unsaved `Transaction` and its category IDs.
+    """
+    amount = parse_statement_amount(raw.get('mount'))
+    raw_type = (raw.get('type') or '').strip().lower()
+    if raw_type:
+        if raw_type not in TYPE_NAMES:
+            raise ImportRowError(f"Invalid type '{raw['type']}'.")
+        transaction_type = TYPE_NAMES[raw_type]
+    else:
+        transaction_type = Transaction.TransEnum.EXPENSE if amount < 0 else Transaction.TransEnum.INCOME
+    description = raw.get('description') or None
+    transaction = Transaction(
+        id_user=user,
+        mount=abs(amount),
+        description=description[:128] if description else None,
+        type=transaction_type,
+        date=parse_statement_date(raw.get('date')),
+    )
+    categories = [resolve_category(name) for name in split_category_names(raw.get('categories'))]
+    return transaction, categories
+
+
+def import_statement(user, stream, fmt, columns=None, chunk_size=IMPORT_CHUNK_SIZE, progress=None):
+    """
+    Streams a statement into the user's transactions in fixed-size bulk INSERT chunks.
+
+    Only one chunk of rows is held in memory at a time, so the memory used does not
+    depend on the size of the file.
+
+    Parameters:
+        - user: The `User` that owns the imported transactions.
+        - stream: Text stream with the statement contents.
+        - fmt: One of `IMPORT_FORMATS`.
+        - columns: Optional CSV column mapping (see `DEFAULT_CSV_COLUMNS`).
+        - chunk_size: Number of rows per bulk INSERT.
+        - progress: Optional callable receiving the running summary after each chunk.
+
+    Returns:
+        - dict: Number of rows read and created, number of failed rows and the first errors.
+    """
+    reader = ROW_READERS[fmt]
+    rows = reader(stream, columns) if fmt == 'csv' else reader(stream)
+    resolve_category = CategoryResolver(user)
+    summary = {'processed': 0, 'created': 0, 'failed': 0, 'errors': []}
+    transactions, categories = [], []
+
+    def flush():
+        if transactions:
+            summary['created'] += len(bulk_insert_transactions(transactions, categories))
+            transactions.clear()
+            categories.clear()
+        if progress:
+            progress(summary)
+
+    for line_number, raw in enumerate(rows, start=1):
+        summary['processed'] += 1
+        try:
+            transaction, category_ids = build_transaction(user, raw, resolve_category)
+        except ImportRowError as e:
+            summary['failed'] += 1
+            if len(summary['errors']) < MAX_REPORTED_ERRORS:
+                summary['errors'].append({'row': line_number, 'error': str(e)})
+            continue
+        transactions.append(transaction)
+        categories.append(category_ids)
+        if len(transactions) >= chunk_size:
+            flush()
+    flush()
+    return summary
+
+
+def open_text(binary_file):
+    """
+    Wraps an uploaded or stored binary file as a text stream without reading it into memory.
+    """
+    return io.TextIOWrapper(binary_file, encoding='utf-8-sig', errors='replace', newline='')
@@ -0,0 +1,139 @@
+import random
+import statistics
+import time
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+from django.utils.timezone import localtime
+from logic.analytics import TransactionArrays
+from logic.bulk import bulk_insert_transactions
+from logic.models import User, Transaction, Category
+
+SEED_CHUNK_SIZE = 10000
+
+
+def seed_categories():
+    """
+    Creates eight benchmark categories with unique names.
+    """
+    stamp = timezone.now().strftime('%Y%m%d%H%M%S%f')
+    return [
+        Category.objects.get_or_create(category_name=f'bench-{stamp[-12:]}-{i}')[0]
+        for i in range(8)
+    ]
+
+
+def seed_user(rng, size, categories):
+    """
+    Inserts a user with `size` transactions spread over three years, in bulk chunks.
+    """
+    stamp = timezone.now().strftime('%Y%m%d%H%M%S%f')
+    user = User.objects.create(email=f'bench-analytics-{stamp}@example.com', password='bench')
+    start = timezone.now() - timedelta(days=3 * 365)
+    for offset in range(0, size, SEED_CHUNK_SIZE):
+        transactions = [
+            Transaction(
+                id_user=user,
+                mount=round(rng.uniform(1, 1000), 2),
+                type=rng.choice(Transaction.TransEnum.values),
+                date=start + timedelta(minutes=rng.randrange(3 * 365 * 24 * 60)),
+            )
+            for _ in range(min(SEED_CHUNK_SIZE, size - offset))
+        ]
+        bulk_insert_transactions(transactions, [[rng.choice(categories).pk] for _ in transactions])
+    return user
+
+
+class Rollback(Exception):
+    """Raised to discard the seeded data at the end of the command."""
+
+
+def legacy_aggregation(user):
+    """
+    The aggregation `generate_pdf` did on model instances before `TransactionArrays`:
+    per-type querysets, generator sums, Python lists of dates and amounts, and a per-type
+    category GROUP BY.
+    """
+    transactions = Transaction.objects.filter(id_user=user).select_related('id_user').prefetch_related('categories')
+    for t in transactions:
+        t.date = localtime(t.date)
+    income_data = transactions.filter(type=Transaction.TransEnum.INCOME)
+    expense_data = transactions.filter(type=Transaction.TransEnum.EXPENSE)
+    total_income = sum(t.mount for t in income_data)
+    total_expenses = sum(t.mount for t in expense_data)
+    income_dates = [t.date for t in income_data]
+    income_amounts = [t.mount for t in income_data]
+    expense_dates = [t.date for t in expense_data]
+    expense_amounts = [t.mount for t in expense_data]
+    income_categories = income_data.values('categories__category_name').annotate(total=Sum('mount'))
+    expense_categories = expense_data.values('categories__category_name').annotate(total=Sum('mount'))
+    return (
+        total_income, total_expenses, income_dates, income_amounts, expense_dates, expense_amounts,
+        [(c['categories__category_name'], c['total']) for c in income_categories],
+        [(c['categories__category_name'], c['total']) for c in expense_categories],
+    )
+
+
+def vectorized_aggregation(user):
+    """
+    The same figures computed with `TransactionArrays`, plus the monthly buckets, the running
+    balance and the top 10 expenses.
+    """
+    arrays = TransactionArrays.for_user(user)
+    local_dates = arrays.local_datetimes()
+    income_rows = arrays.types == Transaction.TransEnum.INCOME
+    return (
+        arrays.totals(),
+        local_dates[income_rows], arrays.amounts[income_rows],
+        local_dates[~income_rows], arrays.amounts[~income_rows],
+        arrays.category_totals(Transaction.TransEnum.INCOME),
+        arrays.category_totals(Transaction.TransEnum.EXPENSE),
+        arrays.period_buckets('monthly'),
+        arrays.running_balance(),
+        arrays.top(10, Transaction.TransEnum.EXPENSE),
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        'Seeds one user per size and compares the time of the legacy generate_pdf aggregation '
+        'with the NumPy analytics module.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000],
+                            help='Transactions of each benchmark user.')
+        parser.add_argument('--repeat', type=int, default=3, help='Timed runs per size and implementation.')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed for the generated data.')
+        parser.add_argument('--keep', action='store_true', help='Keep the seeded data instead of rolling it back.')
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                rng = random.Random(options['seed'])
+                categories = seed_categories()
+                for size in options['sizes']:
+                    user = seed_user(rng, size, categories)
+                    self.report(user, size, options['repeat'])
+                if not options['keep']:
+                    raise Rollback()
+        except Rollback:
+            self.stdout.write('Seeded data rolled back.')
+
+    def report(self, user, size, repeat):
+        """
+        Prints the best and median time of each implementation for one user.
+        """
+        self.stdout.write(self.style.MIGRATE_HEADING(f'== {size} transactions =='))
+        results = {}
+        for label, aggregate in (('legacy', legacy_aggregation), ('numpy', vectorized_aggregation)):
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                aggregate(user)
+                timings.append((time.perf_counter() - started) * 1000)
+            results[label] = min(timings)
+            self.stdout.write(f'{label}: best={min(timings):.1f}ms median={statistics.median(timings):.1f}ms')
+        self.stdout.write(f'speedup: {results["legacy"] / results["numpy"]:.1f}x')
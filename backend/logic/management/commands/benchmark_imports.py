@@ -0,0 +1,79 @@
+import os
+import statistics
+import subprocess
+import sys
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Boots a Celery worker child up to the point where it starts consuming: Django setup, the task
+# modules found by `autodiscover_tasks` and the `worker_process_init` handlers that a prefork
+# child runs when it starts, without connecting to the broker.
+CELERY_BOOT = (
+    'from backend.celery import app; app.loader.import_default_modules(); '
+    'from celery.signals import worker_process_init; worker_process_init.send(sender=None)'
+)
+
+SCENARIOS = {
+    'check': ['manage.py', 'check'],
+    'celery': ['-c', CELERY_BOOT],
+}
+
+# Heavy dependencies of the reports and exports; matplotlib and WeasyPrint must not load at startup.
+WATCHED_PACKAGES = ('matplotlib', 'weasyprint', 'numpy', 'openpyxl', 'reportlab')
+
+
+def parse_importtime(output):
+    """
+    Parses the `-X importtime` report printed on stderr.
+
+    Returns:
+        - tuple: The total import time in microseconds and a dict with the time spent in each
+          top-level package, i.e. the self time of all its modules.
+    """
+    total, packages = 0, {}
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        own, _, name = line[len('import time:'):].split('|')
+        package = name.strip().split('.')[0]
+        packages[package] = packages.get(package, 0) + int(own)
+        total += int(own)
+    return total, packages
+
+
+class Command(BaseCommand):
+    help = (
+        'Measures the module import time of `manage.py check` and of a Celery worker boot with '
+        '`python -X importtime`, and lists the heavy report dependencies each one loads.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scenarios', nargs='+', choices=list(SCENARIOS), default=list(SCENARIOS),
+                            help='Startups to measure.')
+        parser.add_argument('--repeat', type=int, default=3, help='Runs per scenario.')
+        parser.add_argument('--top', type=int, default=10, help='Slowest packages to list.')
+
+    def handle(self, *args, **options):
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=settings.SETTINGS_MODULE)
+        for scenario in options['scenarios']:
+            runs = [self.run(SCENARIOS[scenario], env) for _ in range(options['repeat'])]
+            totals = [total for total, _ in runs]
+            packages = runs[-1][1]
+            self.stdout.write(self.style.MIGRATE_HEADING(f'== {scenario} =='))
+            self.stdout.write(f'imports: best={min(totals) / 1000:.1f}ms median={statistics.median(totals) / 1000:.1f}ms')
+            for package in WATCHED_PACKAGES:
+                loaded = f'{packages[package] / 1000:.1f}ms' if package in packages else 'not loaded'
+                self.stdout.write(f'  {package}: {loaded}')
+            slowest = sorted(((spent, name) for name, spent in packages.items()), reverse=True)[:options['top']]
+            self.stdout.write('  slowest packages: ' + ', '.join(f'{name} {spent / 1000:.0f}ms'
+                                                                for spent, name in slowest))
+
+    def run(self, arguments, env):
+        """
+        Runs one startup in a fresh interpreter and returns its parsed import times.
+        """
+        result = subprocess.run([sys.executable, '-X', 'importtime', *arguments], cwd=settings.BASE_DIR,
+                                env=env, capture_output=True, text=True)
+        if result.returncode:
+            raise CommandError(f'{" ".join(arguments)} failed:\n{result.stderr[-2000:]}')
+        return parse_importtime(result.stderr)
@@ -0,0 +1,106 @@
+import argparse
+import json
+import os
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from logic.management.commands.benchmark_analytics import seed_categories, seed_user
+from logic.models import User, Category
+from logic.reports import REPORT_RENDERERS, build_report_pdf
+
+
+def peak_rss_mb():
+    """
+    Returns the peak resident set size of this process in MiB (`ru_maxrss` is in KiB on Linux).
+    """
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class Command(BaseCommand):
+    help = (
+        'Seeds one user per size and compares the render time and peak RSS of the WeasyPrint '
+        'and ReportLab report renderers. Each renderer runs in a fresh process so that their '
+        'memory peaks do not mix.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000],
+                            help='Transactions of each benchmark user.')
+        parser.add_argument('--renderers', nargs='+', choices=REPORT_RENDERERS, default=list(REPORT_RENDERERS),
+                            help='Renderers to compare.')
+        parser.add_argument('--repeat', type=int, default=3, help='Timed renders per size and renderer.')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed for the generated data.')
+        parser.add_argument('--keep', action='store_true', help='Keep the seeded users instead of deleting them.')
+        parser.add_argument('--render', choices=REPORT_RENDERERS, help=argparse.SUPPRESS)
+        parser.add_argument('--user', type=int, help=argparse.SUPPRESS)
+
+    def handle(self, *args, **options):
+        if options['render']:
+            self.render(options['user'], options['render'], options['repeat'])
+            return
+        # The renders run in other processes, so the seeded data is committed and deleted afterwards.
+        rng = random.Random(options['seed'])
+        categories = seed_categories()
+        users = []
+        try:
+            for size in options['sizes']:
+                user = seed_user(rng, size, categories)
+                users.append(user)
+                self.report(user, size, options['renderers'], options['repeat'])
+        finally:
+            if not options['keep']:
+                User.objects.filter(pk__in=[user.pk for user in users]).delete()
+                Category.objects.filter(pk__in=[category.pk for category in categories]).delete()
+                self.stdout.write('Seeded data deleted.')
+
+    def report(self, user, size, renderers, repeat):
+        """
+        Prints the render time and memory of each renderer for one user.
+        """
+        self.stdout.write(self.style.MIGRATE_HEADING(f'== {size} transactions =='))
+        results = {}
+        for renderer in renderers:
+            result = self.run_renderer(user, renderer, repeat)
+            results[renderer] = min(result['seconds'])
+            self.stdout.write(
+                f"{renderer}: first={result['seconds'][0] * 1000:.0f}ms best={min(result['seconds']) * 1000:.0f}ms "
+                f"median={statistics.median(result['seconds']) * 1000:.0f}ms "
+                f"peak_rss={result['peak_rss_mb']:.0f}MiB (+{result['peak_rss_mb'] - result['start_rss_mb']:.0f}MiB) "
+                f"pdf={result['bytes'] / 1024:.0f}KiB"
+            )
+        if len(results) == 2:
+            self.stdout.write(f"speedup: {results['weasyprint'] / results['reportlab']:.1f}x")
+
+    def run_renderer(self, user, renderer, repeat):
+        """
+        Renders the report of `user` in a fresh `manage.py` process and returns its measurements.
+        """
+        command = [sys.executable, 'manage.py', 'benchmark_report_renderers', '--render', renderer,
+                   '--user', str(user.pk), '--repeat', str(repeat)]
+        result = subprocess.run(command, cwd=settings.BASE_DIR, capture_output=True, text=True,
+                                env=dict(os.environ, DJANGO_SETTINGS_MODULE=settings.SETTINGS_MODULE))
+        if result.returncode:
+            raise CommandError(f'{renderer} render failed:\n{result.stderr[-2000:]}')
+        return json.loads(result.stdout.strip().splitlines()[-1])
+
+    def render(self, user_id, renderer, repeat):
+        """
+        Child process: renders the report `repeat` times and prints the measurements as JSON.
+        Charts are served by the chart cache after the first run in both renderers, so the
+        best time compares the page layout alone and the first time includes the charts.
+        """
+        user = User.objects.get(pk=user_id)
+        start_rss = peak_rss_mb()
+        seconds, size = [], 0
+        for _ in range(repeat):
+            started = time.perf_counter()
+            size = len(build_report_pdf(user, renderer=renderer))
+            seconds.append(time.perf_counter() - started)
+        self.stdout.write(json.dumps({
+            'seconds': seconds, 'bytes': size, 'start_rss_mb': start_rss, 'peak_rss_mb': peak_rss_mb(),
+        }))
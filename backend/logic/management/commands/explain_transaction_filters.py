@@ -0,0 +1,118 @@
+import itertools
+import random
+import statistics
+import time
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.http import QueryDict
+from django.utils import timezone
+from logic.bulk import bulk_insert_transactions
+from logic.filters import filter_transactions_queryset
+from logic.models import User, Transaction, Category
+
+
+class Rollback(Exception):
+    """Raised to discard the seeded data at the end of the command."""
+
+
+class Command(BaseCommand):
+    help = (
+        'Seeds transactions and prints the EXPLAIN plan and timings of every '
+        'filter_transactions filter combination.'
+    )
+
+    FILTERS = {
+        'type': lambda ctx: {'type': 'expenses'},
+        'date_range': lambda ctx: {
+            'start_date': ctx['start'].date().isoformat(),
+            'end_date': (ctx['start'] + timedelta(days=90)).date().isoformat(),
+        },
+        'amount': lambda ctx: {'min_amount': '100', 'max_amount': '500'},
+        'categories': lambda ctx: {'categories': ctx['categories'][:2]},
+    }
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=20, help='Number of users to seed.')
+        parser.add_argument('--transactions', type=int, default=5000, help='Transactions per user.')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per combination.')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed for the generated data.')
+        parser.add_argument('--keep', action='store_true', help='Keep the seeded data instead of rolling it back.')
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                ctx = self.seed(options)
+                self.report(ctx, options['repeat'])
+                if not options['keep']:
+                    raise Rollback()
+        except Rollback:
+            self.stdout.write('Seeded data rolled back.')
+
+    def seed(self, options):
+        """
+        Inserts the benchmark users, categories and transactions in bulk.
+        """
+        rng = random.Random(options['seed'])
+        stamp = timezone.now().strftime('%Y%m%d%H%M%S%f')
+        start = timezone.now() - timedelta(days=3 * 365)
+
+        categories = [
+            Category.objects.get_or_create(category_name=f'bench-{stamp[-12:]}-{i}')[0]
+            for i in range(8)
+        ]
+        User.objects.bulk_create([
+            User(email=f'bench-{stamp}-{i}@example.com', password='bench')
+            for i in range(options['users'])
+        ])
+        users = list(User.objects.filter(email__startswith=f'bench-{stamp}-'))
+
+        for user in users:
+            transactions = [
+                Transaction(
+                    id_user=user,
+                    mount=round(rng.uniform(1, 1000), 2),
+                    type=rng.choice(Transaction.TransEnum.values),
+                    date=start + timedelta(minutes=rng.randrange(3 * 365 * 24 * 60)),
+                )
+                for _ in range(options['transactions'])
+            ]
+            bulk_insert_transactions(transactions, [[rng.choice(categories).pk] for _ in transactions])
+
+        self.stdout.write(
+            f'Seeded {len(users)} users x {options["transactions"]} transactions.'
+        )
+        return {
+            'user': users[len(users) // 2],
+            'start': start,
+            'categories': [str(c.pk) for c in categories],
+        }
+
+    def report(self, ctx, repeat):
+        """
+        Prints the plan and timings of each combination of filters.
+        """
+        names = list(self.FILTERS)
+        for size in range(len(names) + 1):
+            for combination in itertools.combinations(names, size):
+                params = QueryDict(mutable=True)
+                for name in combination:
+                    for key, value in self.FILTERS[name](ctx).items():
+                        if isinstance(value, list):
+                            params.setlist(key, value)
+                        else:
+                            params[key] = value
+                queryset = filter_transactions_queryset(ctx['user'].id_user, params)
+
+                timings = []
+                for _ in range(repeat):
+                    started = time.perf_counter()
+                    rows = len(list(queryset.values_list('id_transaction', flat=True)))
+                    timings.append((time.perf_counter() - started) * 1000)
+
+                label = ' + '.join(combination) or 'user only'
+                self.stdout.write(self.style.MIGRATE_HEADING(f'== {label} =='))
+                self.stdout.write(
+                    f'rows={rows} best={min(timings):.2f}ms median={statistics.median(timings):.2f}ms'
+                )
+                self.stdout.write(queryset.explain())
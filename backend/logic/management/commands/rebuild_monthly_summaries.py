@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from logic.summaries import rebuild_monthly_summaries
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the monthly summary rollup from the transactions table.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', dest='users',
+                            help='Only rebuild this user ID. Can be repeated.')
+
+    def handle(self, *args, **options):
+        rows = rebuild_monthly_summaries(options['users'])
+        scope = f"{len(options['users'])} user(s)" if options['users'] else 'all users'
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {rows} summary rows for {scope}.'))
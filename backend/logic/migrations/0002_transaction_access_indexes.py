@@ -0,0 +1,51 @@
+# Generated by Django 4.2.30 on 2026-10-18 19:11
+
+from django.db import migrations, models
+
+
+CATEGORY_TRANSACTION_INDEX = models.Index(fields=['category', 'transaction'], name='trans_cat_category_idx')
+
+
+def _categories_through(apps):
+    Transaction = apps.get_model('logic', 'Transaction')
+    return Transaction._meta.get_field('categories').remote_field.through
+
+
+def add_category_transaction_index(apps, schema_editor):
+    schema_editor.add_index(_categories_through(apps), CATEGORY_TRANSACTION_INDEX)
+
+
+def remove_category_transaction_index(apps, schema_editor):
+    schema_editor.remove_index(_categories_through(apps), CATEGORY_TRANSACTION_INDEX)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('logic', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='debt',
+            index=models.Index(fields=['id_user', 'init_date', 'id_debt'], name='debt_user_init_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='scheduledtransaction',
+            index=models.Index(fields=['user', 'schedule_date', 'id_transaction'], name='sched_user_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['id_user', 'date', 'id_transaction'], name='trans_user_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['id_user', 'type', 'date'], name='trans_user_type_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['id_user', 'mount'], name='trans_user_mount_idx'),
+        ),
+        # The categories through table is auto-created, so its index is added directly.
+        migrations.RunPython(add_category_transaction_index, remove_category_transaction_index),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 4.2.30 on 2026-10-18 19:17
+
+from django.db import migrations, models
+from django.db.models import Count, DateField, Sum
+from django.db.models.functions import TruncMonth
+import django.db.models.deletion
+
+
+def backfill_monthly_summaries(apps, schema_editor):
+    # Kept here rather than calling logic.summaries, so that later changes to that module do
+    # not change what this migration writes.
+    Transaction = apps.get_model('logic', 'Transaction')
+    UserMonthlySummary = apps.get_model('logic', 'UserMonthlySummary')
+    grouped = Transaction.objects.annotate(month=TruncMonth('date', output_field=DateField()))
+    aggregates = {'total': Sum('mount'), 'count': Count('id_transaction')}
+    rows = [
+        UserMonthlySummary(user_id=row['id_user'], month=row['month'], type=row['type'],
+                           is_total=True, total=row['total'], count=row['count'])
+        for row in grouped.values('id_user', 'month', 'type').annotate(**aggregates).order_by()
+    ] + [
+        UserMonthlySummary(user_id=row['id_user'], month=row['month'], type=row['type'],
+                           category_id=row['categories'], total=row['total'], count=row['count'])
+        for row in grouped.values('id_user', 'month', 'type', 'categories').annotate(**aggregates).order_by()
+    ]
+    UserMonthlySummary.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('logic', '0003_user_data_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserMonthlySummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField()),
+                ('type', models.IntegerField(choices=[(0, 'Income'), (1, 'Expense')])),
+                ('is_total', models.BooleanField(default=False)),
+                ('total', models.FloatField(default=0)),
+                ('count', models.IntegerField(default=0)),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='logic.category')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_summaries', to='logic.user')),
+            ],
+            options={
+                'db_table': 'user_monthly_summaries',
+                'indexes': [models.Index(fields=['user', 'type', 'month'], name='summary_user_type_month_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_monthly_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 4.2.30 on 2026-10-18 21:40
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('logic', '0004_user_monthly_summary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transaction',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='debt',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='scheduledtransaction',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['id_user', 'updated_at'], name='trans_user_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='debt',
+            index=models.Index(fields=['id_user', 'updated_at'], name='debt_user_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='scheduledtransaction',
+            index=models.Index(fields=['user', 'updated_at'], name='sched_user_updated_idx'),
+        ),
+        migrations.CreateModel(
+            name='SyncTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user_id', models.IntegerField(blank=True, null=True)),
+                ('kind', models.CharField(choices=[('transaction', 'Transaction'), ('debt', 'Debt'), ('scheduled_transaction', 'Scheduled transaction'), ('category', 'Category')], max_length=25)),
+                ('object_id', models.IntegerField()),
+                ('deleted_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'db_table': 'sync_tombstones',
+                'indexes': [models.Index(fields=['user_id', 'deleted_at'], name='tombstone_user_deleted_idx'), models.Index(fields=['deleted_at'], name='tombstone_deleted_idx')],
+            },
+        ),
+    ]
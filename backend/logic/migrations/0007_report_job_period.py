@@ -0,0 +1,23 @@
+# Generated by Django 4.2.30 on 2026-10-18 19:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('logic', '0006_report_jobs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reportjob',
+            name='period_end',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='reportjob',
+            name='period_start',
+            field=models.DateField(blank=True, null=True),
+        ),
+    ]
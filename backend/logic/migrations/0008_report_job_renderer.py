@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-18 19:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('logic', '0007_report_job_period'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reportjob',
+            name='renderer',
+            field=models.CharField(default='weasyprint', max_length=20),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.30 on 2026-10-18 19:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('logic', '0008_report_job_renderer'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reportjob',
+            name='profile',
+            field=models.CharField(default='full', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='report_profile',
+            field=models.CharField(choices=[('full', 'Full'), ('summary', 'Summary'), ('charts-only', 'Charts only'), ('tables-only', 'Tables only')], default='full', max_length=20),
+        ),
+    ]
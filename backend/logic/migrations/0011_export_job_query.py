@@ -0,0 +1,23 @@
+# Generated by Django 4.2.30 on 2026-10-18 21:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('logic', '0010_export_jobs'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='exportjob',
+            name='object_ids',
+        ),
+        migrations.AddField(
+            model_name='exportjob',
+            name='query',
+            field=models.BinaryField(default=b''),
+            preserve_default=False,
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 4.2.30 on 2026-10-18 22:10
+
+from django.db import migrations, models
+from django.db.models import Count, DateField, Sum
+from django.db.models.functions import TruncMonth
+
+
+def rebuild_monthly_summaries(apps, schema_editor):
+    # Rows may have been duplicated by concurrent writers before the unique key existed, so
+    # they are recomputed from the transactions, with their category_key, before it is added.
+    Transaction = apps.get_model('logic', 'Transaction')
+    UserMonthlySummary = apps.get_model('logic', 'UserMonthlySummary')
+    grouped = Transaction.objects.annotate(month=TruncMonth('date', output_field=DateField()))
+    aggregates = {'total': Sum('mount'), 'count': Count('id_transaction')}
+    rows = [
+        UserMonthlySummary(user_id=row['id_user'], month=row['month'], type=row['type'],
+                           is_total=True, total=row['total'], count=row['count'])
+        for row in grouped.values('id_user', 'month', 'type').annotate(**aggregates).order_by()
+    ] + [
+        UserMonthlySummary(user_id=row['id_user'], month=row['month'], type=row['type'],
+                           category_id=row['categories'], category_key=row['categories'] or 0,
+                           total=row['total'], count=row['count'])
+        for row in grouped.values('id_user', 'month', 'type', 'categories').annotate(**aggregates).order_by()
+    ]
+    UserMonthlySummary.objects.all().delete()
+    UserMonthlySummary.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('logic', '0011_export_job_query'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='usermonthlysummary',
+            name='category_key',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(rebuild_monthly_summaries, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='usermonthlysummary',
+            constraint=models.UniqueConstraint(fields=('user', 'month', 'type', 'category_key', 'is_total'), name='summary_unique_row'),
+        ),
+    ]
@@ -1,3 +1,4 @@
+import uuid
 from django.db import models
 from django.utils import timezone
 from django.utils.timezone import now
@@ -24,6 +25,10 @@ class User(models.Model):
         categories: Many-to-many relationship with Category model.
         email_schedule_frequency: Frequency at which the user receives email notifications ('daily', 'weekly', 'monthly', 'yearly').
         email_schedule_start_date: The date and time when email notifications start.
+        report_profile: Parts of the report the user gets by default ('full', 'summary',
+            'charts-only' or 'tables-only'), in the scheduled emails and when none is requested.
+        data_version: Counter increased on every change to the user's transactions, debts,
+            scheduled transactions or categories. Used to validate cached responses.
     """
     id_user = models.AutoField(primary_key=True)
     email = models.EmailField(unique=True)
@@ -67,10 +72,30 @@ class User(models.Model):
         default='monthly',
     )
     email_schedule_start_date = models.DateTimeField(default=now) # ojooo
+    report_profile = models.CharField(
+        max_length=20,
+        choices=[
+            ('full', 'Full'),
+            ('summary', 'Summary'),
+            ('charts-only', 'Charts only'),
+            ('tables-only', 'Tables only'),
+        ],
+        default='full',
+    )
     is_verified = models.BooleanField(default=False)
+    data_version = models.PositiveBigIntegerField(default=0, editable=False)
     class Meta:
         db_table = 'users'
 
+    def save(self, *args, **kwargs):
+        # data_version is only changed by atomic UPDATEs; saving a stale instance must not rewind it.
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'data_version'
+            ]
+        super().save(*args, **kwargs)
+
 class Transaction(models.Model):
     """
     Represents a financial transaction, including income and expenses.
@@ -83,6 +108,7 @@ class Transaction(models.Model):
         type: Specifies whether the transaction is an income or expense.
         date: The date and time of the transaction.
         categories: Many-to-many relationship with Category model for categorizing transactions.
+        updated_at: When the transaction or its categories last changed; used by the sync endpoint.
     """
     id_transaction = models.AutoField(primary_key=True)
     id_user = models.ForeignKey('User', on_delete=models.CASCADE)
@@ -101,8 +127,15 @@ class Transaction(models.Model):
 
     date = models.DateTimeField(default=timezone.now)
     categories = models.ManyToManyField('Category', related_name='transactions')
+    updated_at = models.DateTimeField(auto_now=True)
     class Meta:
         db_table = 'transactions'
+        indexes = [
+            models.Index(fields=['id_user', 'date', 'id_transaction'], name='trans_user_date_idx'),
+            models.Index(fields=['id_user', 'type', 'date'], name='trans_user_type_date_idx'),
+            models.Index(fields=['id_user', 'mount'], name='trans_user_mount_idx'),
+            models.Index(fields=['id_user', 'updated_at'], name='trans_user_updated_idx'),
+        ]
 
 class Category(models.Model):
     """
@@ -112,10 +145,12 @@ class Category(models.Model):
         id_category: Auto-incrementing primary key for each category.
         category_name: The name of the category (unique).
         is_universal: A flag indicating whether the category is universal (default: False).
+        updated_at: When the category was last renamed or associated with a user.
     """
     id_category = models.AutoField(primary_key=True)
     category_name = models.CharField(max_length=35, unique=True)
     is_universal = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
     class Meta:
         db_table = 'categories'
 
@@ -136,6 +171,7 @@ class Debt(models.Model):
         due_date: The date and time when the debt is due.
         status: The current status of the debt ('pending', 'overdue', or 'paid').
         transaction: A one-to-one relationship with the Transaction model, linking the debt to a transaction.
+        updated_at: When the debt last changed; used by the sync endpoint.
     """
     id_debt = models.AutoField(primary_key=True)
     id_user = models.ForeignKey('User', on_delete=models.CASCADE)
@@ -155,9 +191,14 @@ class Debt(models.Model):
 
     status = models.CharField(max_length=10, choices=StatusEnum.choices, default=StatusEnum.PENDING)
     transaction = models.OneToOneField('Transaction', on_delete=models.SET_NULL, null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         db_table = 'debts'
+        indexes = [
+            models.Index(fields=['id_user', 'init_date', 'id_debt'], name='debt_user_init_date_idx'),
+            models.Index(fields=['id_user', 'updated_at'], name='debt_user_updated_idx'),
+        ]
 
 
 class ScheduledTransaction(models.Model):
@@ -173,6 +214,7 @@ class ScheduledTransaction(models.Model):
         categories: Many-to-many relationship with Category model for categorizing scheduled transactions.
         schedule_date: The date on which the scheduled transaction is to occur.
         repeat: Specifies the frequency of repetition for the scheduled transaction (e.g., daily, weekly, etc.).
+        updated_at: When the scheduled transaction or its categories last changed; used by the sync endpoint.
     """
     id_transaction = models.AutoField(primary_key=True)
     user = models.ForeignKey('User', on_delete=models.CASCADE)
@@ -189,9 +231,179 @@ class ScheduledTransaction(models.Model):
         choices=[('none', 'None'), ('daily', 'Daily'), ('weekly', 'Weekly'), ('monthly', 'Monthly'),  ('yearly', 'Yearly')],
         default='none'
     )
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         db_table = 'scheduled_transactions'
+        indexes = [
+            models.Index(fields=['user', 'schedule_date', 'id_transaction'], name='sched_user_date_idx'),
+            models.Index(fields=['user', 'updated_at'], name='sched_user_updated_idx'),
+        ]
 
     def __str__(self):
         return f"{self.description} ({self.type}) on {self.schedule_date}"
+
+
+class UserMonthlySummary(models.Model):
+    """
+    Rollup of a user's transactions per month, type and category, kept up to date by signals.
+
+    For every (user, month, type) there is one total row (`is_total=True`, no category), one row
+    per category with the amounts of the transactions tagged with it, and one row without a
+    category for the untagged transactions. A transaction with several categories counts once
+    in the total row and once in each of its category rows.
+
+    Attributes:
+        user: The owner of the summarized transactions.
+        month: First day of the summarized month.
+        type: Income or expense, as in `Transaction.type`.
+        category: The category of the row, or null for the total and untagged rows.
+        category_key: `category_id`, or 0 for the total and untagged rows. It stands in for the
+            category in the unique key, since NULLs never collide in a unique index.
+        is_total: Whether the row holds the month's total for the type.
+        total: Sum of the amounts.
+        count: Number of transactions.
+    """
+    user = models.ForeignKey('User', on_delete=models.CASCADE, related_name='monthly_summaries')
+    month = models.DateField()
+    type = models.IntegerField(choices=Transaction.TransEnum.choices)
+    category = models.ForeignKey('Category', on_delete=models.CASCADE, null=True, blank=True)
+    category_key = models.PositiveIntegerField(default=0)
+    is_total = models.BooleanField(default=False)
+    total = models.FloatField(default=0)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = 'user_monthly_summaries'
+        indexes = [
+            models.Index(fields=['user', 'type', 'month'], name='summary_user_type_month_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'month', 'type', 'category_key', 'is_total'],
+                                    name='summary_unique_row'),
+        ]
+
+
+class SyncTombstone(models.Model):
+    """
+    Records a deleted row, or a category no longer associated with a user, so that the sync
+    endpoint can tell clients to drop it.
+
+    The owner is kept as a plain integer instead of a foreign key: tombstones are written while
+    a user's rows are being deleted, including when the user itself is deleted.
+
+    Attributes:
+        user_id: ID of the user that must be told, or null for every user (a deleted universal category).
+        kind: The kind of the removed object.
+        object_id: Primary key of the removed object.
+        deleted_at: When the object was removed.
+    """
+    class KindEnum(models.TextChoices):
+        TRANSACTION = 'transaction', 'Transaction'
+        DEBT = 'debt', 'Debt'
+        SCHEDULED_TRANSACTION = 'scheduled_transaction', 'Scheduled transaction'
+        CATEGORY = 'category', 'Category'
+
+    user_id = models.IntegerField(null=True, blank=True)
+    kind = models.CharField(max_length=25, choices=KindEnum.choices)
+    object_id = models.IntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = 'sync_tombstones'
+        indexes = [
+            models.Index(fields=['user_id', 'deleted_at'], name='tombstone_user_deleted_idx'),
+            models.Index(fields=['deleted_at'], name='tombstone_deleted_idx'),
+        ]
+
+
+class ReportJob(models.Model):
+    """
+    A PDF report built in the background by the `build_report` Celery task.
+
+    Jobs are keyed by the user's data version: a request for a report of data that did not
+    change reuses the pending, running or finished job instead of building the same PDF again.
+
+    Attributes:
+        id: Random identifier, also used in the status and download URLs.
+        user: The user the report is about.
+        data_version: The user's data version when the job was requested.
+        period_start, period_end: The days covered by the report, or None for the whole history.
+        renderer: The renderer drawing the PDF ('weasyprint' or 'reportlab').
+        profile: The parts of the report that are drawn; see `User.report_profile`.
+        status: 'pending', 'running', 'done' or 'failed'.
+        file: The finished PDF, in the default storage.
+        error: The error message of a failed job.
+        created_at: When the job was requested.
+        finished_at: When the job finished or failed.
+    """
+    class StatusEnum(models.TextChoices):
+        PENDING = 'pending', 'Pending'
+        RUNNING = 'running', 'Running'
+        DONE = 'done', 'Done'
+        FAILED = 'failed', 'Failed'
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey('User', on_delete=models.CASCADE, related_name='report_jobs')
+    data_version = models.PositiveBigIntegerField()
+    period_start = models.DateField(null=True, blank=True)
+    period_end = models.DateField(null=True, blank=True)
+    renderer = models.CharField(max_length=20, default='weasyprint')
+    profile = models.CharField(max_length=20, default='full')
+    status = models.CharField(max_length=10, choices=StatusEnum.choices, default=StatusEnum.PENDING)
+    file = models.FileField(upload_to='reports/', null=True, blank=True)
+    error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'report_jobs'
+        indexes = [
+            models.Index(fields=['user', 'data_version', 'status'], name='report_job_user_version_idx'),
+        ]
+
+
+class ExportJob(models.Model):
+    """
+    An admin export too large to build in the request, written by the `build_export` Celery task.
+
+    Attributes:
+        id: Random identifier.
+        model: Label of the exported model, e.g. 'logic.transaction'.
+        format: 'csv', 'xlsx' or 'pdf'.
+        query: The pickled query of the selected rows.
+        row_count: Number of selected rows.
+        status: 'pending', 'running', 'done' or 'failed'.
+        file: The finished export, in the default storage.
+        error: The error message of a failed job.
+        created_at: When the export was requested.
+        finished_at: When the job finished or failed.
+    """
+    StatusEnum = ReportJob.StatusEnum
+
+    class FormatEnum(models.TextChoices):
+        CSV = 'csv', 'CSV'
+        XLSX = 'xlsx', 'Excel'
+        PDF = 'pdf', 'PDF'
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    model = models.CharField(max_length=100)
+    format = models.CharField(max_length=4, choices=FormatEnum.choices)
+    query = models.BinaryField()
+    row_count = models.PositiveIntegerField(default=0)
+    status = models.CharField(max_length=10, choices=StatusEnum.choices, default=StatusEnum.PENDING)
+    file = models.FileField(upload_to='exports/', null=True, blank=True)
+    error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'export_jobs'
+        ordering = ['-created_at']
+
+    def get_model(self):
+        """
+        Returns the model class of the exported rows.
+        """
+        from django.apps import apps
+        return apps.get_model(self.model)
@@ -0,0 +1,269 @@
+import base64
+import json
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def keyset_after(ordering, position):
+    """
+    Builds the row-value comparison `(f1, f2, ...) > (v1, v2, ...)` for the given ordering
+    as an OR of prefix equalities, which every backend can evaluate through the index.
+
+    Parameters:
+        - ordering: Field names of the ordering; a leading '-' means descending.
+        - position: Values of those fields for the row to start after.
+
+    Returns:
+        - Q: The filter selecting the rows that come after `position`.
+    """
+    condition = Q()
+    equal_prefix = Q()
+    for field, value in zip(ordering, position):
+        name = field.lstrip('-')
+        lookup = 'lt' if field.startswith('-') else 'gt'
+        condition |= equal_prefix & Q(**{f'{name}__{lookup}': value})
+        equal_prefix &= Q(**{name: value})
+    return condition
+
+
+def iter_keyset_chunks(queryset, ordering, chunk_size):
+    """
+    Yields the rows of `queryset` as lists of at most `chunk_size` instances.
+
+    Each chunk is a separate keyset query, so only one chunk is ever held in memory, even on
+    database drivers that buffer the whole result of a query on the client.
+
+    Parameters:
+        - queryset: The queryset to walk; its prefetches are applied to each chunk.
+        - ordering: Unique ordering of the rows, ending with the primary key.
+        - chunk_size: Number of rows per query.
+    """
+    names = [field.lstrip('-') for field in ordering]
+    queryset = queryset.order_by(*ordering)
+    position = None
+    while True:
+        page = queryset if position is None else queryset.filter(keyset_after(ordering, position))
+        chunk = list(page[:chunk_size])
+        if not chunk:
+            return
+        yield chunk
+        if len(chunk) < chunk_size:
+            return
+        position = [getattr(chunk[-1], name) for name in names]
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (cursor) pagination over a fixed, unique ordering.
+
+    Instead of an OFFSET, each page is fetched with a `WHERE (key) > (last key seen)`
+    condition on the ordering columns, so the cost of a page does not depend on how deep
+    into the history it is. Cursors are opaque base64 tokens that encode the key of the
+    first or last row of the page and the direction of travel.
+
+    Pagination is only applied when the client sends `cursor` or `page_size`; requests
+    without them keep receiving the plain list so existing clients are not affected.
+
+    Attributes:
+        ordering: Tuple of field names that uniquely orders the queryset. The last field must
+            be the primary key. A leading '-' sorts that field in descending order.
+        page_size: Default number of items per page.
+        max_page_size: Upper bound for the `page_size` query parameter.
+        cursor_query_param: Name of the query parameter carrying the cursor.
+        page_size_query_param: Name of the query parameter carrying the page size.
+    """
+    ordering = ('id',)
+    page_size = 50
+    max_page_size = 500
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """
+        Returns the rows of the requested page, or None when pagination was not requested.
+
+        Parameters:
+            - queryset: The filtered queryset to paginate.
+            - request: The HTTP request carrying the `cursor` and `page_size` parameters.
+
+        Returns:
+            - list | None: The model instances of the page in the configured order.
+        """
+        if (self.cursor_query_param not in request.query_params
+                and self.page_size_query_param not in request.query_params):
+            return None
+
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.model = queryset.model
+        position, reverse = self.decode_cursor(request)
+
+        ordering = self._reverse_ordering() if reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(keyset_after(ordering, position))
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if reverse:
+            results.reverse()
+            self.has_next = position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+        self.page = results
+        return results
+
+    def get_paginated_response(self, data):
+        """
+        Wraps the serialized page together with the links to the neighbouring pages.
+        """
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_page_cursors(self):
+        """
+        Returns the cursors of the neighbouring pages without the request URL, so that a page
+        can be cached and its links rebuilt for each request with `build_links`.
+
+        Returns:
+            - dict: The `next` and `previous` cursors; None when there is no such page and
+              an empty string for the first page.
+        """
+        cursors = {'next': None, 'previous': None}
+        if self.has_next and self.page:
+            cursors['next'] = self.encode_cursor(self.page[-1], reverse=False)
+        if self.has_previous:
+            cursors['previous'] = self.encode_cursor(self.page[0], reverse=True) if self.page else ''
+        return cursors
+
+    def build_links(self, request, cursors):
+        """
+        Returns the `next` and `previous` links of a page for the URL of `request`.
+
+        Parameters:
+            - request: The request the links are built for.
+            - cursors: The cursors returned by `get_page_cursors`.
+        """
+        base_url = request.build_absolute_uri()
+        links = {}
+        for name, cursor in cursors.items():
+            if cursor is None:
+                links[name] = None
+            elif cursor == '':
+                links[name] = remove_query_param(base_url, self.cursor_query_param)
+            else:
+                links[name] = replace_query_param(base_url, self.cursor_query_param, cursor)
+        return links
+
+    def get_page_size(self, request):
+        """
+        Reads `page_size` from the query string, clamped to `max_page_size`.
+        """
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self._link(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self._link(self.page[0], reverse=True)
+
+    def encode_cursor(self, instance, reverse):
+        """
+        Builds the opaque cursor pointing just past `instance` in the given direction.
+        """
+        position = [self._field_value(instance, field) for field in self._field_names()]
+        payload = json.dumps({'p': position, 'r': int(reverse)}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+    def decode_cursor(self, request):
+        """
+        Parses the cursor sent by the client.
+
+        Returns:
+            - tuple: The decoded key values (or None for the first page) and the direction flag.
+
+        Raises:
+            - NotFound: If the cursor is malformed.
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')).decode('utf-8'))
+            raw_position = payload['p']
+            reverse = bool(payload['r'])
+            names = self._field_names()
+            if len(raw_position) != len(names):
+                raise ValueError
+            position = [self.model._meta.get_field(name).to_python(value)
+                        for name, value in zip(names, raw_position)]
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def _link(self, instance, reverse):
+        return replace_query_param(self.base_url, self.cursor_query_param, self.encode_cursor(instance, reverse))
+
+    def _field_names(self):
+        return [field.lstrip('-') for field in self.ordering]
+
+    def _reverse_ordering(self):
+        return tuple(field[1:] if field.startswith('-') else '-' + field for field in self.ordering)
+
+    @staticmethod
+    def _field_value(instance, field):
+        value = getattr(instance, field)
+        if hasattr(value, 'isoformat'):
+            return value.isoformat()
+        return value
+
+
+class TransactionPagination(KeysetPagination):
+    """
+    Pages transactions by `(date, id_transaction)`.
+    """
+    ordering = ('date', 'id_transaction')
+
+
+class DebtPagination(KeysetPagination):
+    """
+    Pages debts by `(init_date, id_debt)`.
+    """
+    ordering = ('init_date', 'id_debt')
+
+
+class ScheduledTransactionPagination(KeysetPagination):
+    """
+    Pages scheduled transactions by `(schedule_date, id_transaction)`.
+    """
+    ordering = ('schedule_date', 'id_transaction')
+
+
+class UserPagination(KeysetPagination):
+    """
+    Pages users by `id_user`.
+    """
+    ordering = ('id_user',)
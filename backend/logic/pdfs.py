@@ -0,0 +1,52 @@
+from io import BytesIO
+from pypdf import PdfReader, PdfWriter
+from reportlab.pdfgen import canvas
+
+PAGE_NUMBER_FONT = ('Helvetica', 9)
+# Distance in points of the page number from the right and bottom edges of the page.
+PAGE_NUMBER_MARGIN = (36, 24)
+
+
+def page_number_overlay(sizes):
+    """
+    Draws "Page i of n" on blank pages of the given `(width, height)` sizes.
+
+    Returns:
+        - PdfReader: One overlay page per entry of `sizes`.
+    """
+    buffer = BytesIO()
+    overlay = canvas.Canvas(buffer)
+    for number, (width, height) in enumerate(sizes, start=1):
+        overlay.setPageSize((width, height))
+        overlay.setFont(*PAGE_NUMBER_FONT)
+        overlay.drawRightString(width - PAGE_NUMBER_MARGIN[0], PAGE_NUMBER_MARGIN[1], f'Page {number} of {len(sizes)}')
+        overlay.showPage()
+    overlay.save()
+    buffer.seek(0)
+    return PdfReader(buffer)
+
+
+def merge_pdfs(documents, number_pages=True):
+    """
+    Concatenates PDF documents and, optionally, numbers the pages of the result.
+
+    Documents are read one at a time, so only the merged pages and the current document are
+    held in memory.
+
+    Parameters:
+        - documents: Iterable of PDF documents (bytes), in order.
+        - number_pages: Whether to stamp "Page i of n" on every page, numbered across documents.
+
+    Returns:
+        - bytes: The merged PDF.
+    """
+    writer = PdfWriter()
+    for document in documents:
+        writer.append(PdfReader(BytesIO(document)))
+    if number_pages:
+        sizes = [(float(page.mediabox.width), float(page.mediabox.height)) for page in writer.pages]
+        for page, overlay in zip(writer.pages, page_number_overlay(sizes).pages):
+            page.merge_page(overlay)
+    output = BytesIO()
+    writer.write(output)
+    return output.getvalue()
@@ -0,0 +1,108 @@
+from datetime import timedelta
+from dateutil.relativedelta import relativedelta
+from django.db.models import Count, DateField, Q, Sum
+from django.db.models.functions import TruncDay, TruncMonth, TruncWeek, TruncYear
+from logic.models import Transaction
+
+PERIODS = {
+    'daily': (TruncDay, relativedelta(days=1)),
+    'weekly': (TruncWeek, relativedelta(weeks=1)),
+    'monthly': (TruncMonth, relativedelta(months=1)),
+    'yearly': (TruncYear, relativedelta(years=1)),
+}
+MAX_BUCKETS = 5000
+
+
+def bucket_start(day, period):
+    """
+    Returns the first day of the `period` bucket that contains `day`.
+    """
+    if period == 'weekly':
+        return day - timedelta(days=day.weekday())
+    if period == 'monthly':
+        return day.replace(day=1)
+    if period == 'yearly':
+        return day.replace(month=1, day=1)
+    return day
+
+
+def iter_buckets(first, last, period):
+    """
+    Yields the start date of every `period` bucket between the dates `first` and `last`.
+    """
+    step = PERIODS[period][1]
+    current = bucket_start(first, period)
+    while current <= last:
+        yield current
+        current += step
+
+
+def count_buckets(first, last, period):
+    """
+    Returns how many `period` buckets lie between `first` and `last` without generating them.
+    """
+    first = bucket_start(first, period)
+    if period == 'daily':
+        return (last - first).days + 1
+    if period == 'weekly':
+        return (last - first).days // 7 + 1
+    months = (last.year - first.year) * 12 + last.month - first.month
+    return (months if period == 'monthly' else last.year - first.year) + 1
+
+
+def aggregate_by_period(transactions, period, first=None, last=None):
+    """
+    Sums income and expenses of `transactions` per period bucket in the database.
+
+    Parameters:
+        - transactions: Queryset of transactions, possibly filtered.
+        - period: One of `PERIODS`.
+        - first, last: Optional dates of the range to report. When omitted, the range of the
+          transactions is used. Buckets without transactions are returned with zeros.
+
+    Returns:
+        - list: One dict per bucket with `period`, `income`, `expense`, `income_count`,
+          `expense_count` and `balance`.
+
+    Raises:
+        - ValueError: If the range holds more than `MAX_BUCKETS` buckets.
+    """
+    trunc = PERIODS[period][0]
+    # Aggregating over a DISTINCT join would count a transaction once per matching category.
+    transactions = Transaction.objects.filter(pk__in=transactions.values('pk'))
+    income = Q(type=Transaction.TransEnum.INCOME)
+    expense = Q(type=Transaction.TransEnum.EXPENSE)
+    rows = (
+        transactions.annotate(bucket=trunc('date', output_field=DateField()))
+        .values('bucket')
+        .annotate(
+            income=Sum('mount', filter=income),
+            expense=Sum('mount', filter=expense),
+            income_count=Count('id_transaction', filter=income),
+            expense_count=Count('id_transaction', filter=expense),
+        )
+        .order_by('bucket')
+    )
+    totals = {row['bucket']: row for row in rows}
+    if totals:
+        first = first or min(totals)
+        last = last or max(totals)
+    if first is None or last is None:
+        return []
+    if count_buckets(first, last, period) > MAX_BUCKETS:
+        raise ValueError(f"The range has more than {MAX_BUCKETS} {period} buckets.")
+
+    buckets = []
+    for start in iter_buckets(first, last, period):
+        row = totals.get(start, {})
+        income_total = round(row.get('income') or 0, 2)
+        expense_total = round(row.get('expense') or 0, 2)
+        buckets.append({
+            'period': start.isoformat(),
+            'income': income_total,
+            'expense': expense_total,
+            'income_count': row.get('income_count', 0),
+            'expense_count': row.get('expense_count', 0),
+            'balance': round(income_total - expense_total, 2),
+        })
+    return buckets
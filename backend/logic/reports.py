@@ -0,0 +1,671 @@
+from datetime import datetime, time, timedelta
+from django.conf import settings
+from django.core.mail import EmailMessage
+from django.db import transaction as db_transaction
+from django.db.models import Prefetch, Q, Sum
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from django.utils.functional import cached_property
+from django.utils.timezone import localtime
+from logic.analytics import TransactionArrays
+from logic.models import User, Category, Transaction, Debt, ScheduledTransaction, ReportJob
+from logic.pagination import iter_keyset_chunks
+from logic.periods import PERIODS
+from logic.summaries import summary_balance_before, summary_totals
+from logic.caching import chart_cache, chart_cache_key, report_cache, report_cache_key
+from logic.charts import downsample_series, render_charts
+
+# Charts are referenced from the template as `chart:<name>` and served from memory by
+# `chart_url_fetcher`, so WeasyPrint never touches the disk or the network for them.
+# WeasyPrint, like matplotlib in `logic.charts`, is imported on first use: most processes
+# import this module through the views and tasks without ever building a PDF.
+CHART_SCHEME = 'chart:'
+
+# Part of every chart cache key; increase it when the look of the charts changes.
+CHART_STYLE_VERSION = 1
+
+# Table sections of the report, in order, with the unique ordering of their rows.
+REPORT_SECTIONS = {
+    'transactions': ('date', 'id_transaction'),
+    'debts': ('init_date', 'id_debt'),
+    'scheduled_transactions': ('schedule_date', 'id_transaction'),
+}
+
+# Ways of drawing the PDF: WeasyPrint lays out `pdf_template.html`, ReportLab draws the same
+# report directly with platypus (see `logic.reportlab_report`).
+REPORT_RENDERERS = ('weasyprint', 'reportlab')
+
+# Parts of the report drawn by each profile. Only the queries and charts of the parts a profile
+# draws are run: `summary` reads three aggregates, `tables-only` never draws a chart.
+REPORT_PROFILES = {
+    'full': ('tables', 'charts', 'balances'),
+    'summary': ('balances',),
+    'charts-only': ('charts',),
+    'tables-only': ('tables',),
+}
+
+# Part of every report cache key; increase it when the template or the report contents change.
+REPORT_FORMAT_VERSION = 1
+
+
+def render_cached_charts(specs):
+    """
+    Returns the images of several charts, taking unchanged ones from the chart cache and
+    rendering the others concurrently in the chart process pool.
+
+    Parameters:
+        - specs: Mapping of chart name to `(kind, args, kwargs)`; see `logic.charts.render_charts`.
+
+    Returns:
+        - dict: PNG bytes of each chart, by name.
+    """
+    keys = {
+        name: chart_cache_key(f'{kind}-v{CHART_STYLE_VERSION}', *args, **kwargs)
+        for name, (kind, args, kwargs) in specs.items()
+    }
+    images = {name: chart_cache.get(key) for name, key in keys.items()}
+    missing = {name: specs[name] for name, image in images.items() if image is None}
+    for name, image in render_charts(missing, settings.CHART_RENDER_WORKERS).items():
+        chart_cache.put(keys[name], image)
+        images[name] = image
+    return images
+
+
+def report_period(frequency, end=None):
+    """
+    Returns the report period of a delivery frequency: the `frequency` ending on `end`.
+
+    Parameters:
+        - frequency: One of `PERIODS`, such as the user's `email_schedule_frequency`.
+        - end: Last day of the period, today in the current time zone by default.
+
+    Returns:
+        - tuple: The first and last `date` of the period.
+
+    Raises:
+        - ValueError: If `frequency` is not one of `PERIODS`.
+    """
+    if frequency not in PERIODS:
+        raise ValueError(f"Invalid period '{frequency}'.")
+    end = end or timezone.localdate()
+    return end - PERIODS[frequency][1] + timedelta(days=1), end
+
+
+def parse_report_period(params):
+    """
+    Reads the report period of a request.
+
+    The period is either `period` (one of `PERIODS`, ending on `end_date` or today) or an
+    explicit `start_date` with an optional `end_date` (today by default). Without any of them
+    the report covers the whole history.
+
+    Parameters:
+        - params: The query parameters.
+
+    Returns:
+        - tuple: The first and last `date` of the period, or `(None, None)`.
+
+    Raises:
+        - ValueError: If a date or the period is invalid, or the range is reversed.
+    """
+    dates = {}
+    for name in ('start_date', 'end_date'):
+        value = params.get(name)
+        if value:
+            dates[name] = parse_date(value)
+            if dates[name] is None:
+                raise ValueError(f"Invalid {name} '{value}'.")
+    if params.get('period'):
+        return report_period(params['period'], dates.get('end_date'))
+    if 'start_date' not in dates:
+        if 'end_date' in dates:
+            raise ValueError("end_date requires a start_date or a period.")
+        return None, None
+    start, end = dates['start_date'], dates.get('end_date') or timezone.localdate()
+    if start > end:
+        raise ValueError("start_date must not be after end_date.")
+    return start, end
+
+
+def resolve_renderer(renderer=None):
+    """
+    Returns `renderer`, or the `REPORT_RENDERER` setting when it is empty.
+
+    Raises:
+        - ValueError: If the renderer is not one of `REPORT_RENDERERS`.
+    """
+    renderer = renderer or settings.REPORT_RENDERER
+    if renderer not in REPORT_RENDERERS:
+        raise ValueError(f"Invalid renderer '{renderer}'.")
+    return renderer
+
+
+def resolve_profile(user, profile=None):
+    """
+    Returns `profile`, or the user's preferred `report_profile` when it is empty.
+
+    Raises:
+        - ValueError: If the profile is not one of `REPORT_PROFILES`.
+    """
+    profile = profile or user.report_profile
+    if profile not in REPORT_PROFILES:
+        raise ValueError(f"Invalid profile '{profile}'.")
+    return profile
+
+
+def parse_report_options(params):
+    """
+    Reads the report options of a request: the period (see `parse_report_period`), the
+    `renderer` (one of `REPORT_RENDERERS`, `REPORT_RENDERER` by default) and the `profile`
+    (one of `REPORT_PROFILES`, the user's preferred profile when missing).
+
+    Returns:
+        - dict: `start`, `end`, `renderer` and `profile`, ready to be passed to `get_report_pdf`.
+
+    Raises:
+        - ValueError: If an option is invalid.
+    """
+    start, end = parse_report_period(params)
+    profile = params.get('profile') or None
+    if profile is not None and profile not in REPORT_PROFILES:
+        raise ValueError(f"Invalid profile '{profile}'.")
+    return {'start': start, 'end': end, 'renderer': resolve_renderer(params.get('renderer')), 'profile': profile}
+
+
+def period_bounds(start, end):
+    """
+    Returns the aware datetimes `[first, after)` covering the days `start` to `end` in the
+    current time zone.
+    """
+    return (timezone.make_aware(datetime.combine(start, time.min)),
+            timezone.make_aware(datetime.combine(end + timedelta(days=1), time.min)))
+
+
+def localize_dates(transactions):
+    """
+    Converts the dates of `Transaction` instances to the current time zone, in place.
+    """
+    for transaction in transactions:
+        transaction.date = localtime(transaction.date)
+    return transactions
+
+
+def render_report_charts(user, start=None, end=None):
+    """
+    Renders the four report charts of a user in memory; see `ReportContext.render_charts`.
+    """
+    return ReportContext(user, start, end).render_charts()
+
+
+def chart_url_fetcher(charts):
+    """
+    Returns a WeasyPrint `url_fetcher` that serves `chart:<name>` URLs from `charts` and
+    delegates every other URL to the default fetcher.
+    """
+    from weasyprint import default_url_fetcher
+
+    def fetch(url, *args, **kwargs):
+        if url.startswith(CHART_SCHEME):
+            return {'string': charts[url[len(CHART_SCHEME):]], 'mime_type': 'image/png'}
+        return default_url_fetcher(url, *args, **kwargs)
+    return fetch
+
+
+class ReportContext:
+    """
+    Everything a user's report shows, loaded with a fixed number of queries.
+
+    The report profile (see `REPORT_PROFILES`) picks the parts that are drawn. The totals, rows
+    and charts are all computed on first use, so the parts a profile leaves out cost nothing.
+
+    The rows of each section are fetched once, with their categories prefetched. Totals come
+    from one conditional aggregate per model: the income and expenses from the monthly summary
+    (or from the period's transactions), the debts by status from the debts table. The charts
+    are derived from the rows already in memory, so rendering the template and the charts adds
+    no queries.
+
+    A report of a period only reads the period's transactions, the debts open during the period
+    and the user's scheduled transactions; everything before the period is carried over as one
+    `prior_balance`. Its cost therefore follows the activity of the period, not the age of the
+    account.
+
+    The rows are loaded on first access. Large reports are instead walked in chunks with
+    `iter_row_chunks`, and their charts are computed from `values_list` rows.
+
+    Attributes:
+        user: The `User` the report is about.
+        period_start, period_end: The days covered by the report, or None for the whole history.
+        profile: One of `REPORT_PROFILES`.
+        parts: The parts of the report the profile draws.
+        querysets: The queryset of each section in `REPORT_SECTIONS`, ordered and prefetched.
+        transactions, debts, scheduled_transactions: The rows of the report sections.
+        prior_balance: Income minus expenses before the period (0 for the whole history).
+        total_income, total_expenses: Totals of the transactions of the period.
+        total_paid_debt, total_pending_debt, total_overdue_debt: Debt totals by status.
+    """
+    def __init__(self, user, start=None, end=None, profile='full'):
+        self.user = user
+        self.period_start, self.period_end = start, end
+        self.profile = profile
+        self.parts = REPORT_PROFILES[profile]
+        transactions = Transaction.objects.filter(id_user=user)
+        debts = Debt.objects.filter(id_user=user)
+        if start is not None:
+            first, after = period_bounds(start, end)
+            transactions = transactions.filter(date__gte=first, date__lt=after)
+            debts = debts.filter(Q(due_date__gte=first) | ~Q(status=Debt.StatusEnum.PAID), init_date__lt=after)
+
+        categories = Prefetch('categories', queryset=Category.objects.only('id_category', 'category_name'))
+        self.querysets = {
+            'transactions': transactions.prefetch_related(categories),
+            'debts': debts,
+            'scheduled_transactions': ScheduledTransaction.objects.filter(user=user).prefetch_related(categories),
+        }
+        for section, ordering in REPORT_SECTIONS.items():
+            self.querysets[section] = self.querysets[section].order_by(*ordering)
+
+    @cached_property
+    def prior_balance(self):
+        if self.period_start is None:
+            return 0
+        return summary_balance_before(self.user, period_bounds(self.period_start, self.period_end)[0])
+
+    @cached_property
+    def income_totals(self):
+        """
+        The total income and expenses of the report, from the monthly summary for the whole
+        history or from one conditional aggregate over the period's transactions.
+        """
+        if self.period_start is None:
+            return summary_totals(self.user)
+        totals = self.querysets['transactions'].order_by().aggregate(
+            income=Sum('mount', filter=Q(type=Transaction.TransEnum.INCOME)),
+            expense=Sum('mount', filter=Q(type=Transaction.TransEnum.EXPENSE)),
+        )
+        return round(totals['income'] or 0, 2), round(totals['expense'] or 0, 2)
+
+    @cached_property
+    def debt_totals(self):
+        """
+        The paid, pending and overdue debt totals, from one conditional aggregate.
+        """
+        totals = self.querysets['debts'].order_by().aggregate(
+            paid=Sum('totalAmount', filter=Q(status=Debt.StatusEnum.PAID)),
+            pending=Sum('totalAmount', filter=Q(status=Debt.StatusEnum.PENDING)),
+            overdue=Sum('totalAmount', filter=Q(status=Debt.StatusEnum.OVERDUE)),
+        )
+        return totals['paid'] or 0, totals['pending'] or 0, totals['overdue'] or 0
+
+    @property
+    def total_income(self):
+        return self.income_totals[0]
+
+    @property
+    def total_expenses(self):
+        return self.income_totals[1]
+
+    @property
+    def total_paid_debt(self):
+        return self.debt_totals[0]
+
+    @property
+    def total_pending_debt(self):
+        return self.debt_totals[1]
+
+    @property
+    def total_overdue_debt(self):
+        return self.debt_totals[2]
+
+    @cached_property
+    def transactions(self):
+        return localize_dates(list(self.querysets['transactions']))
+
+    @cached_property
+    def debts(self):
+        return list(self.querysets['debts'])
+
+    @cached_property
+    def scheduled_transactions(self):
+        return list(self.querysets['scheduled_transactions'])
+
+    def row_count(self):
+        """
+        Returns the number of table rows of the report, all sections together; 0 when the
+        profile draws no tables.
+        """
+        if 'tables' not in self.parts:
+            return 0
+        return sum(queryset.count() for queryset in self.querysets.values())
+
+    def iter_row_chunks(self, chunk_rows):
+        """
+        Walks the table rows of every section in order, without loading them all.
+
+        Parameters:
+            - chunk_rows: Number of rows per chunk.
+
+        Yields:
+            - dict: The rows of at most `chunk_rows` rows, by section; a chunk may end one
+              section and start the next.
+        """
+        chunk, size = {}, 0
+        for section, ordering in REPORT_SECTIONS.items():
+            for rows in iter_keyset_chunks(self.querysets[section], ordering, chunk_rows):
+                if section == 'transactions':
+                    localize_dates(rows)
+                while rows:
+                    taken, rows = rows[:chunk_rows - size], rows[chunk_rows - size:]
+                    chunk.setdefault(section, []).extend(taken)
+                    size += len(taken)
+                    if size == chunk_rows:
+                        yield chunk
+                        chunk, size = {}, 0
+        if chunk:
+            yield chunk
+
+    def template_context(self):
+        """
+        Returns the context of `pdf_template.html` for the whole report, with the chart URLs
+        pointing to the `chart:` scheme.
+        """
+        context = self.summary_context()
+        rows = {section: getattr(self, section) for section in REPORT_SECTIONS} if 'tables' in self.parts else {}
+        context.update(self.section_context(rows, title=True))
+        return context
+
+    def section_context(self, rows, title=False, started=()):
+        """
+        Returns the context showing some table rows of the report.
+
+        Parameters:
+            - rows: The rows to show, by section; sections missing from it are hidden.
+            - title: Whether to show the report title.
+            - started: Sections already shown by previous chunks; they are marked continued.
+        """
+        context = {'show_title': title}
+        for section in REPORT_SECTIONS:
+            context[section] = rows.get(section, [])
+            context[f'show_{section}'] = section in rows
+            context[f'{section}_continued'] = section in started
+        return context
+
+    def summary_context(self):
+        """
+        Returns the period and, for the parts the profile draws, the chart URLs and the totals
+        and balances of the report.
+        """
+        context = {
+            'period_start': self.period_start,
+            'period_end': self.period_end,
+            'show_charts': 'charts' in self.parts,
+            'show_balances': 'balances' in self.parts,
+        }
+        if 'tables' in self.parts:
+            context['prior_balance'] = self.prior_balance
+        if 'charts' in self.parts:
+            context.update({
+                'income_chart_url': CHART_SCHEME + 'income',
+                'expense_chart_url': CHART_SCHEME + 'expense',
+                'inpie_chart_url': CHART_SCHEME + 'inpie',
+                'expie_chart_url': CHART_SCHEME + 'expie',
+            })
+        if 'balances' in self.parts:
+            context.update(self.balance_context())
+        return context
+
+    def balance_context(self):
+        """
+        Returns the totals and balances of the report.
+        """
+        main_balance = self.prior_balance + self.total_income - self.total_expenses
+        debt_balance = self.total_pending_debt + self.total_overdue_debt
+        suggested_balance = main_balance - debt_balance
+        return {
+            'prior_balance': self.prior_balance,
+            'main_balance_message': f"${main_balance:.2f}",
+            'debt_balance_message': f"${debt_balance:.2f}",
+            'suggested_balance_message': f"${suggested_balance:.2f}",
+            'total_income': self.total_income,
+            'total_expenses': self.total_expenses,
+            'total_paid_debt': self.total_paid_debt,
+            'total_pending_debt': self.total_pending_debt,
+            'total_overdue_debt': self.total_overdue_debt,
+        }
+
+    def chart_specs(self):
+        """
+        Returns the specs of the `income`, `expense`, `inpie` and `expie` charts; see
+        `logic.charts.render_charts`. The line series are downsampled to `CHART_MAX_POINTS`.
+        The rows already loaded are reused; otherwise only their columns are read.
+        """
+        if 'transactions' in self.__dict__:
+            analytics = TransactionArrays.from_transactions(self.transactions)
+        else:
+            analytics = TransactionArrays.load(self.querysets['transactions'])
+        local_dates = analytics.local_datetimes()
+        income_rows = analytics.types == Transaction.TransEnum.INCOME
+        income_series = downsample_series(local_dates[income_rows], analytics.amounts[income_rows],
+                                          settings.CHART_MAX_POINTS)
+        expense_series = downsample_series(local_dates[~income_rows], analytics.amounts[~income_rows],
+                                           settings.CHART_MAX_POINTS)
+        income_names, income_totals = analytics.category_totals(Transaction.TransEnum.INCOME)
+        expense_names, expense_totals = analytics.category_totals(Transaction.TransEnum.EXPENSE)
+        return {
+            'income': ('line', income_series,
+                       {'label': 'Ingresos', 'color': 'green', 'title': 'Income over Time'}),
+            'expense': ('line', expense_series,
+                        {'label': 'Egresos', 'color': 'red', 'title': 'Expenses over Time'}),
+            'inpie': ('pie', (income_names, income_totals), {'title': 'Income Distribution by Category'}),
+            'expie': ('pie', (expense_names, expense_totals), {'title': 'Expenses Distribution by Category'}),
+        }
+
+    def render_charts(self):
+        """
+        Renders the report charts in memory, reusing cached images of unchanged data.
+
+        Returns:
+            - dict: PNG bytes of each chart, by name; empty when the profile draws no charts.
+        """
+        if 'charts' not in self.parts:
+            return {}
+        return render_cached_charts(self.chart_specs())
+
+
+def build_report_context(user, start=None, end=None, profile='full'):
+    """
+    Collects the template context of a user's report; see `ReportContext.template_context`.
+    """
+    return ReportContext(user, start, end, profile).template_context()
+
+
+def build_report_pdf(user, start=None, end=None, renderer=None, chunk_rows=None, profile='full'):
+    """
+    Builds the PDF financial report of a user: transactions, debts, scheduled transactions,
+    balances and the income and expense charts, for the whole history or for a period. The
+    profile picks which of these parts are drawn.
+
+    The charts are rendered in memory and handed to WeasyPrint through `chart_url_fetcher`,
+    so no temporary files are written and no HTTP request is made back to the server.
+
+    Reports with more than `chunk_rows` table rows are rendered in chunks; see
+    `build_chunked_report_pdf`. The `reportlab` renderer always reads the rows in chunks.
+
+    Parameters:
+        - user: The `User` the report is about.
+        - start, end: Optional first and last day of the report period; see `ReportContext`.
+        - renderer: One of `REPORT_RENDERERS`, `REPORT_RENDERER` by default.
+        - chunk_rows: Rows per chunk, `REPORT_CHUNK_ROWS` by default; 0 never chunks.
+        - profile: One of `REPORT_PROFILES`.
+
+    Returns:
+        - bytes: The PDF document.
+    """
+    report = ReportContext(user, start, end, profile)
+    if resolve_renderer(renderer) == 'reportlab':
+        from logic.reportlab_report import build_reportlab_pdf
+        return build_reportlab_pdf(report, report.render_charts())
+
+    from weasyprint import HTML
+    chunk_rows = settings.REPORT_CHUNK_ROWS if chunk_rows is None else chunk_rows
+    if chunk_rows and report.row_count() > chunk_rows:
+        return build_chunked_report_pdf(report, chunk_rows)
+    html_content = render_to_string('pdf_template.html', report.template_context())
+    charts = report.render_charts()
+    return HTML(string=html_content, url_fetcher=chart_url_fetcher(charts)).write_pdf()
+
+
+def build_chunked_report_pdf(report, chunk_rows):
+    """
+    Renders a report whose tables are too large to lay out at once.
+
+    The table rows are read and rendered `chunk_rows` at a time, each chunk as a separate
+    WeasyPrint document, followed by a last document with the charts and balances. The
+    documents are then merged and their pages numbered across the whole report. Only one
+    chunk of rows and its layout are held in memory at a time. The totals come from
+    `ReportContext` aggregates, not from the rows of a chunk, so they stay correct.
+
+    Parameters:
+        - report: The `ReportContext` to render.
+        - chunk_rows: Number of table rows per document.
+
+    Returns:
+        - bytes: The PDF document.
+    """
+    from weasyprint import HTML
+    from logic.pdfs import merge_pdfs
+
+    summary = report.summary_context()
+
+    def documents():
+        started = set()
+        for index, rows in enumerate(report.iter_row_chunks(chunk_rows)):
+            context = dict(summary, chunked=True, show_charts=False, show_balances=False)
+            context.update(report.section_context(rows, title=index == 0, started=started))
+            started.update(rows)
+            yield HTML(string=render_to_string('pdf_template.html', context)).write_pdf()
+        if not (summary['show_charts'] or summary['show_balances']):
+            return
+        charts = report.render_charts()
+        context = dict(summary, chunked=True)
+        context.update(report.section_context({}))
+        yield HTML(string=render_to_string('pdf_template.html', context),
+                   url_fetcher=chart_url_fetcher(charts)).write_pdf()
+
+    return merge_pdfs(documents())
+
+
+def get_report_pdf(user, start=None, end=None, renderer=None, profile=None):
+    """
+    Returns the PDF report of a user, from the report cache when the user's data did not change
+    since it was built.
+
+    The key holds the user's data version, so a repeated request costs one cache lookup and any
+    write to the user's data makes the old PDFs unreachable.
+
+    Parameters:
+        - user: The `User` the report is about.
+        - start, end: Optional first and last day of the report period.
+        - renderer: One of `REPORT_RENDERERS`, `REPORT_RENDERER` by default.
+        - profile: One of `REPORT_PROFILES`, the user's `report_profile` by default.
+
+    Returns:
+        - bytes: The PDF document.
+    """
+    renderer = resolve_renderer(renderer)
+    profile = resolve_profile(user, profile)
+    key = report_cache_key(user.id_user, user.data_version, format=REPORT_FORMAT_VERSION,
+                           start=start, end=end, renderer=renderer, profile=profile)
+    return report_cache.get_or_render(key, lambda: build_report_pdf(user, start, end, renderer, profile=profile))
+
+
+def send_email_to_user(user_id, start=None, end=None, renderer=None, profile=None):
+    """
+    Sends a financial report email to the user with the specified user ID.
+
+    This function generates a financial report in PDF format, attaches it to an email,
+    and sends the email to the user. The report includes visual charts for income and
+    expense trends, as well as category distribution.
+
+    Parameters:
+        - user_id: The ID of the user to whom the email should be sent.
+        - start, end: Optional first and last day of the report period.
+        - renderer: One of `REPORT_RENDERERS`, `REPORT_RENDERER` by default.
+        - profile: One of `REPORT_PROFILES`, the user's `report_profile` by default.
+
+    Returns:
+        - None: The function does not return a value. It sends an email to the user.
+    """
+    user = User.objects.get(id_user=user_id)
+    pdf = get_report_pdf(user, start, end, renderer, profile)
+
+    subject = "Your Financial Report"
+    message = "Hi, attached is your financial report. Thank you for using our service!"
+    email = EmailMessage(
+        subject,
+        message,
+        to=[user.email],
+        from_email='budgetmatesys@gmail.com'
+    )
+    email.attach(f'report_{user.id_user}.pdf', pdf, 'application/pdf')
+
+    try:
+        email.send()
+        print("Email sent successfully!")
+    except Exception as e:
+        print(f"Failed to send email: {e}")
+
+
+def find_or_create_report_job(user_id, start=None, end=None, renderer=None, profile=None):
+    """
+    Returns the report job for the user's current data and the given options, creating it if
+    there is none.
+
+    The user row is locked while looking for a job, so concurrent requests for the same data
+    version share one job. Pending or running jobs older than `REPORT_JOB_STALE_SECONDS` are
+    assumed lost (e.g. the worker died) and are not reused.
+
+    Parameters:
+        - user_id: The ID of the user the report is about.
+        - start, end: Optional first and last day of the report period.
+        - renderer: One of `REPORT_RENDERERS`, `REPORT_RENDERER` by default.
+        - profile: One of `REPORT_PROFILES`, the user's `report_profile` by default.
+
+    Returns:
+        - tuple: The `ReportJob` and whether it was created.
+
+    Raises:
+        - User.DoesNotExist: If the user does not exist.
+    """
+    options = {'period_start': start, 'period_end': end, 'renderer': resolve_renderer(renderer)}
+    with db_transaction.atomic():
+        user = User.objects.select_for_update().get(id_user=user_id)
+        options['profile'] = resolve_profile(user, profile)
+        stale = timezone.now() - timedelta(seconds=settings.REPORT_JOB_STALE_SECONDS)
+        job = (
+            ReportJob.objects.filter(user=user, data_version=user.data_version, **options)
+            .filter(Q(status=ReportJob.StatusEnum.DONE)
+                    | Q(status__in=[ReportJob.StatusEnum.PENDING, ReportJob.StatusEnum.RUNNING],
+                        created_at__gte=stale))
+            .order_by('-created_at').first()
+        )
+        if job is not None:
+            return job, False
+        return ReportJob.objects.create(user=user, data_version=user.data_version, **options), True
+
+
+def prune_report_jobs():
+    """
+    Deletes the report jobs older than `REPORT_JOB_RETENTION_DAYS` together with their files.
+
+    Returns:
+        - int: Number of deleted jobs.
+    """
+    old_jobs = ReportJob.objects.filter(created_at__lt=timezone.now() - timedelta(days=settings.REPORT_JOB_RETENTION_DAYS))
+    count = 0
+    for job in old_jobs.iterator():
+        if job.file:
+            job.file.delete(save=False)
+        job.delete()
+        count += 1
+    return count
@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from .models import *
 from datetime import datetime, date
+from django.urls import reverse
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -97,6 +98,24 @@ class TransactionSerializer(serializers.ModelSerializer):
         transaction.categories.set(categories)
         return transaction
 
+class TransactionBulkItemSerializer(serializers.Serializer):
+    """
+    Serializer for one row of a bulk transaction upload.
+
+    Unlike `TransactionSerializer`, the user and the categories are validated as plain IDs
+    so a whole batch can be checked against the database with one query per model.
+
+    Attributes:
+        id_user: ID of the user that owns the transaction.
+        categories: List of category IDs to associate with the transaction.
+    """
+    id_user = serializers.IntegerField()
+    mount = serializers.FloatField()
+    description = serializers.CharField(max_length=128, required=False, allow_null=True, allow_blank=True)
+    type = serializers.ChoiceField(choices=Transaction.TransEnum.choices, default=Transaction.TransEnum.INCOME)
+    date = serializers.DateTimeField(required=False)
+    categories = serializers.ListField(child=serializers.IntegerField(), required=False, default=list)
+
 class CategorySerializer(serializers.ModelSerializer):
     """
     Serializer for the Category model.
@@ -186,3 +205,23 @@ class ScheduledTransactionSerializer(serializers.ModelSerializer):
         model = ScheduledTransaction
         fields = '__all__'
         extra_fields = ['categories_details']
+
+class ReportJobSerializer(serializers.ModelSerializer):
+    """
+    Serializer for the ReportJob model.
+
+    Attributes:
+        download_url: Absolute URL of the finished PDF, or None while the job is not done.
+            Requires the request in the serializer context.
+    """
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ReportJob
+        fields = ['id', 'status', 'data_version', 'period_start', 'period_end', 'renderer', 'profile', 'error', 'created_at', 'finished_at', 'download_url']
+
+    def get_download_url(self, job):
+        if job.status != ReportJob.StatusEnum.DONE:
+            return None
+        url = reverse('report-job-download', kwargs={'id_user': job.user_id, 'job_id': job.pk})
+        return self.context['request'].build_absolute_uri(url)
@@ -0,0 +1,212 @@
+from django.db.models.signals import pre_save, post_save, post_delete, pre_delete, m2m_changed
+from django.db.models import F
+from django.dispatch import receiver
+from logic.models import User, Transaction, Category, Debt, ScheduledTransaction, SyncTombstone
+from logic.versioning import bump_data_version
+from logic.sync import record_tombstones, touch
+from logic.summaries import transaction_deltas, merge_deltas, apply_deltas, rebuild_monthly_summaries
+
+
+@receiver([post_save, post_delete], sender=Transaction)
+@receiver([post_save, post_delete], sender=Debt)
+def bump_owner_version(sender, instance, **kwargs):
+    """Bumps the data version of the owner of a saved or deleted transaction or debt."""
+    bump_data_version(instance.id_user_id)
+
+
+@receiver([post_save, post_delete], sender=ScheduledTransaction)
+def bump_scheduled_owner_version(sender, instance, **kwargs):
+    """Bumps the data version of the owner of a saved or deleted scheduled transaction."""
+    bump_data_version(instance.user_id)
+
+
+def _bump_m2m(model, owner_field, instance, action, reverse, pk_set):
+    """
+    Bumps the owners affected by a change to a `categories` relation of `model`.
+
+    In the forward direction `instance` is the owner-side row; in the reverse direction it is
+    a `Category` and `pk_set` holds the IDs of the `model` rows.
+    """
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            bump_data_version(instance.pk if model is User else getattr(instance, owner_field))
+        return
+    if action == 'pre_clear':
+        pk_set = model.objects.filter(categories=instance).values_list('pk', flat=True)
+    elif action not in ('post_add', 'post_remove'):
+        return
+    if model is User:
+        bump_data_version(*pk_set)
+    else:
+        bump_data_version(*model.objects.filter(pk__in=pk_set).values_list(owner_field, flat=True))
+
+
+@receiver(m2m_changed, sender=Transaction.categories.through)
+def bump_transaction_categories(sender, instance, action, reverse, pk_set, **kwargs):
+    _bump_m2m(Transaction, 'id_user_id', instance, action, reverse, pk_set)
+
+
+@receiver(m2m_changed, sender=ScheduledTransaction.categories.through)
+def bump_scheduled_categories(sender, instance, action, reverse, pk_set, **kwargs):
+    _bump_m2m(ScheduledTransaction, 'user_id', instance, action, reverse, pk_set)
+
+
+@receiver(m2m_changed, sender=User.categories.through)
+def bump_user_categories(sender, instance, action, reverse, pk_set, **kwargs):
+    _bump_m2m(User, 'pk', instance, action, reverse, pk_set)
+
+
+@receiver(post_save, sender=Category)
+@receiver(pre_delete, sender=Category)
+def bump_category_users(sender, instance, **kwargs):
+    """
+    Bumps every user that sees a new universal category, or a renamed or deleted category. A new
+    non-universal category has no users yet; `bump_user_categories` bumps them as it is added.
+    """
+    if instance.pk is None or (kwargs.get('created') and not instance.is_universal):
+        return
+    if instance.is_universal:
+        User.objects.update(data_version=F('data_version') + 1)
+    else:
+        bump_data_version(*instance.users.values_list('id_user', flat=True))
+
+
+@receiver(pre_save, sender=Transaction)
+def remember_summarized_transaction(sender, instance, **kwargs):
+    """Keeps the stored version of an updated transaction to take it out of the monthly summary."""
+    instance._summary_previous = None
+    if instance.pk is not None and not kwargs.get('raw'):
+        instance._summary_previous = Transaction.objects.filter(pk=instance.pk).first()
+
+
+@receiver(post_save, sender=Transaction)
+def summarize_saved_transaction(sender, instance, created, **kwargs):
+    """Moves a created or updated transaction into the right monthly summary rows."""
+    previous = getattr(instance, '_summary_previous', None)
+    if created:
+        # A new transaction has no categories yet; it starts in the untagged row.
+        deltas = transaction_deltas([instance], categories={})
+    else:
+        deltas = transaction_deltas([instance])
+    if previous is not None:
+        deltas = merge_deltas(deltas, transaction_deltas([previous], sign=-1))
+    apply_deltas(deltas)
+
+
+@receiver(pre_delete, sender=Transaction)
+def unsummarize_deleted_transaction(sender, instance, **kwargs):
+    """Removes a transaction from the monthly summary while its categories still exist."""
+    apply_deltas(transaction_deltas([instance], sign=-1))
+
+
+@receiver(m2m_changed, sender=Transaction.categories.through)
+def resummarize_transaction_categories(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Moves transactions between category rows when their categories change: their category
+    part is taken out before the change and added back with the new categories after it.
+    """
+    if action not in ('pre_add', 'post_add', 'pre_remove', 'post_remove', 'pre_clear', 'post_clear'):
+        return
+    if not reverse:
+        transactions = [instance]
+    elif action == 'pre_clear':
+        transactions = list(Transaction.objects.filter(categories=instance))
+        instance._summary_cleared = transactions
+    elif action == 'post_clear':
+        transactions = getattr(instance, '_summary_cleared', [])
+    else:
+        transactions = list(Transaction.objects.filter(pk__in=pk_set))
+    sign = -1 if action.startswith('pre_') else 1
+    apply_deltas(transaction_deltas(transactions, sign=sign, include_total=False))
+
+
+@receiver(pre_delete, sender=Category)
+def remember_category_owners(sender, instance, **kwargs):
+    """Keeps the owners of the transactions of a category that is about to be deleted."""
+    instance._summary_user_ids = set(instance.transactions.values_list('id_user', flat=True))
+
+
+@receiver(post_delete, sender=Category)
+def rebuild_category_owner_summaries(sender, instance, **kwargs):
+    """Deleting a category untags its transactions without m2m signals, so their owners are rebuilt."""
+    user_ids = getattr(instance, '_summary_user_ids', None)
+    if user_ids:
+        rebuild_monthly_summaries(user_ids)
+
+
+@receiver(post_delete, sender=Transaction)
+@receiver(post_delete, sender=Debt)
+@receiver(post_delete, sender=ScheduledTransaction)
+def record_deleted_row(sender, instance, **kwargs):
+    """Leaves a tombstone for the sync endpoint when a transaction, debt or scheduled transaction is deleted."""
+    kind = {
+        Transaction: SyncTombstone.KindEnum.TRANSACTION,
+        Debt: SyncTombstone.KindEnum.DEBT,
+        ScheduledTransaction: SyncTombstone.KindEnum.SCHEDULED_TRANSACTION,
+    }[sender]
+    owner_id = instance.user_id if sender is ScheduledTransaction else instance.id_user_id
+    record_tombstones(kind, [owner_id], [instance.pk])
+
+
+def _touch_m2m(model, instance, action, reverse, pk_set):
+    """
+    Updates `updated_at` of the `model` rows whose categories changed, so they are synced again.
+    """
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            touch(model, [instance.pk])
+    elif action == 'pre_clear':
+        instance._sync_cleared = list(model.objects.filter(categories=instance).values_list('pk', flat=True))
+    elif action == 'post_clear':
+        touch(model, getattr(instance, '_sync_cleared', []))
+    elif action in ('post_add', 'post_remove'):
+        touch(model, pk_set)
+
+
+@receiver(m2m_changed, sender=Transaction.categories.through)
+def touch_transaction_categories(sender, instance, action, reverse, pk_set, **kwargs):
+    _touch_m2m(Transaction, instance, action, reverse, pk_set)
+
+
+@receiver(m2m_changed, sender=ScheduledTransaction.categories.through)
+def touch_scheduled_categories(sender, instance, action, reverse, pk_set, **kwargs):
+    _touch_m2m(ScheduledTransaction, instance, action, reverse, pk_set)
+
+
+@receiver(m2m_changed, sender=User.categories.through)
+def sync_user_categories(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Makes categories newly associated with a user show up in the next sync, and leaves a
+    tombstone when a non-universal category is no longer associated with a user.
+    """
+    if action == 'pre_clear':
+        if reverse:
+            instance._sync_cleared = list(instance.users.values_list('pk', flat=True))
+        else:
+            instance._sync_cleared = list(instance.categories.values_list('pk', flat=True))
+        return
+    if action == 'post_clear':
+        pk_set = getattr(instance, '_sync_cleared', [])
+    elif action not in ('post_add', 'post_remove'):
+        return
+    if reverse:
+        categories, user_ids = [instance], list(pk_set)
+    else:
+        categories, user_ids = list(Category.objects.filter(pk__in=pk_set)), [instance.pk]
+    if action == 'post_add':
+        touch(Category, [category.pk for category in categories])
+    else:
+        record_tombstones(SyncTombstone.KindEnum.CATEGORY, user_ids,
+                          [category.pk for category in categories if not category.is_universal])
+
+
+@receiver(pre_delete, sender=Category)
+def record_deleted_category(sender, instance, **kwargs):
+    """
+    Leaves a tombstone for every user of a deleted category (one for everyone if it is
+    universal) and touches the rows that lose it, since the cascade sends no m2m signals.
+    """
+    user_ids = [None] if instance.is_universal else list(instance.users.values_list('pk', flat=True))
+    record_tombstones(SyncTombstone.KindEnum.CATEGORY, user_ids, [instance.pk])
+    touch(Transaction, instance.transactions.values_list('pk', flat=True))
+    touch(ScheduledTransaction, instance.scheduled_transactions.values_list('pk', flat=True))
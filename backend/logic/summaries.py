@@ -0,0 +1,167 @@
+from datetime import datetime, time
+from collections import defaultdict
+from django.db import transaction as db_transaction
+from django.db.models import Count, DateField, F, Q, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+from logic.models import Transaction, UserMonthlySummary
+
+
+def month_of(moment):
+    """
+    Returns the first day of the month of `moment` in the current time zone.
+    """
+    if timezone.is_aware(moment):
+        moment = timezone.localtime(moment)
+    return moment.date().replace(day=1)
+
+
+def transaction_deltas(transactions, sign=1, include_total=True, include_categories=True, categories=None):
+    """
+    Computes the summary changes caused by adding (`sign=1`) or removing (`sign=-1`) transactions.
+
+    Parameters:
+        - transactions: Iterable of saved `Transaction` instances.
+        - sign: 1 to add the transactions to the summary, -1 to remove them.
+        - include_total: Whether to include the total rows.
+        - include_categories: Whether to include the category and untagged rows.
+        - categories: Optional mapping of transaction ID to category IDs; read from the
+          database when omitted.
+
+    Returns:
+        - dict: Maps `(user_id, month, type, category_id, is_total)` to `[total, count]`.
+    """
+    transactions = list(transactions)
+    if include_categories and categories is None:
+        categories = defaultdict(list)
+        through = Transaction.categories.through
+        rows = through.objects.filter(transaction_id__in=[t.pk for t in transactions])
+        for transaction_id, category_id in rows.values_list('transaction_id', 'category_id'):
+            categories[transaction_id].append(category_id)
+
+    deltas = defaultdict(lambda: [0.0, 0])
+    for transaction in transactions:
+        base = (transaction.id_user_id, month_of(transaction.date), int(transaction.type))
+        keys = []
+        if include_total:
+            keys.append(base + (None, True))
+        if include_categories:
+            keys.extend(base + (category_id, False) for category_id in (categories.get(transaction.pk) or [None]))
+        for key in keys:
+            deltas[key][0] += sign * transaction.mount
+            deltas[key][1] += sign
+    return deltas
+
+
+def merge_deltas(*deltas_list):
+    """
+    Adds several results of `transaction_deltas` together.
+    """
+    merged = defaultdict(lambda: [0.0, 0])
+    for deltas in deltas_list:
+        for key, (total, count) in deltas.items():
+            merged[key][0] += total
+            merged[key][1] += count
+    return merged
+
+
+def apply_deltas(deltas):
+    """
+    Adds the given changes to the summary rows with atomic UPDATEs, creating missing rows.
+
+    A missing row is created with `get_or_create` before the UPDATE, so two writers that both
+    miss it share the row the unique key lets only one of them insert.
+    """
+    with db_transaction.atomic():
+        for (user_id, month, type_, category_id, is_total), (total, count) in deltas.items():
+            if not total and not count:
+                continue
+            key = {'user_id': user_id, 'month': month, 'type': type_, 'category_key': category_id or 0,
+                   'is_total': is_total}
+            rows = UserMonthlySummary.objects.filter(**key)
+            change = {'total': F('total') + total, 'count': F('count') + count}
+            if not rows.update(**change):
+                UserMonthlySummary.objects.get_or_create(**key, defaults={'category_id': category_id})
+                rows.update(**change)
+
+
+def rebuild_monthly_summaries(user_ids=None):
+    """
+    Recomputes the summary rows from the transactions, for some users or for everyone.
+
+    Parameters:
+        - user_ids: Optional iterable of user IDs; all users when omitted.
+
+    Returns:
+        - int: Number of summary rows written.
+    """
+    transactions = Transaction.objects.all()
+    summaries = UserMonthlySummary.objects.all()
+    if user_ids is not None:
+        user_ids = list(user_ids)
+        transactions = transactions.filter(id_user__in=user_ids)
+        summaries = summaries.filter(user__in=user_ids)
+    grouped = transactions.annotate(month=TruncMonth('date', output_field=DateField()))
+    aggregates = {'total': Sum('mount'), 'count': Count('id_transaction')}
+
+    rows = [
+        UserMonthlySummary(user_id=row['id_user'], month=row['month'], type=row['type'],
+                           is_total=True, total=row['total'], count=row['count'])
+        for row in grouped.values('id_user', 'month', 'type').annotate(**aggregates).order_by()
+    ] + [
+        UserMonthlySummary(user_id=row['id_user'], month=row['month'], type=row['type'],
+                           category_id=row['categories'], category_key=row['categories'] or 0,
+                           total=row['total'], count=row['count'])
+        for row in grouped.values('id_user', 'month', 'type', 'categories').annotate(**aggregates).order_by()
+    ]
+    with db_transaction.atomic():
+        summaries.delete()
+        UserMonthlySummary.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def summary_totals(user):
+    """
+    Returns the user's total income and total expenses from the summary rows, with one
+    conditional aggregate.
+    """
+    totals = UserMonthlySummary.objects.filter(user=user, is_total=True).aggregate(
+        income=Sum('total', filter=Q(type=Transaction.TransEnum.INCOME)),
+        expense=Sum('total', filter=Q(type=Transaction.TransEnum.EXPENSE)),
+    )
+    return round(totals['income'] or 0, 2), round(totals['expense'] or 0, 2)
+
+
+def summary_category_totals(user, transaction_type):
+    """
+    Returns `(category names, totals)` of one transaction type, for the pie charts.
+    Untagged transactions are reported as 'Uncategorized'.
+    """
+    rows = (
+        UserMonthlySummary.objects.filter(user=user, type=transaction_type, is_total=False)
+        .values('category__category_name').annotate(amount=Sum('total'), transactions=Sum('count'))
+        .filter(transactions__gt=0).order_by('category__category_name')
+    )
+    names = [row['category__category_name'] or 'Uncategorized' for row in rows]
+    totals = [round(row['amount'], 2) for row in rows]
+    return names, totals
+
+
+def summary_balance_before(user, moment):
+    """
+    Returns the user's income minus expenses of every transaction dated before `moment`.
+
+    The months before the month of `moment` come from the summary rows; only the transactions
+    of its own month up to `moment` are read, so the cost does not grow with account age.
+    """
+    month = month_of(moment)
+    income = Q(type=Transaction.TransEnum.INCOME)
+    expense = Q(type=Transaction.TransEnum.EXPENSE)
+    months = UserMonthlySummary.objects.filter(user=user, is_total=True, month__lt=month).aggregate(
+        income=Sum('total', filter=income), expense=Sum('total', filter=expense))
+    month_start = timezone.make_aware(datetime.combine(month, time.min))
+    days = Transaction.objects.filter(id_user=user, date__gte=month_start, date__lt=moment).aggregate(
+        income=Sum('mount', filter=income), expense=Sum('mount', filter=expense))
+    balance = ((months['income'] or 0) - (months['expense'] or 0)
+               + (days['income'] or 0) - (days['expense'] or 0))
+    return round(balance, 2)
@@ -0,0 +1,141 @@
+import re
+from datetime import timedelta, timezone as dt_timezone
+from django.conf import settings
+from django.db.models import Prefetch, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from logic.models import Category, Debt, ScheduledTransaction, SyncTombstone, Transaction
+from logic.serializer import (
+    CategorySerializer, DebtsSerializer, ScheduledTransactionSerializer, TransactionSerializer,
+)
+
+# Rows are selected from slightly before the checkpoint so that a write whose database
+# transaction was still open when the checkpoint was taken is not missed. Clients upsert by ID,
+# so receiving a row twice is harmless.
+CHECKPOINT_OVERLAP = timedelta(seconds=5)
+
+TOMBSTONE_GROUPS = {
+    SyncTombstone.KindEnum.TRANSACTION: 'transactions',
+    SyncTombstone.KindEnum.DEBT: 'debts',
+    SyncTombstone.KindEnum.SCHEDULED_TRANSACTION: 'scheduled_transactions',
+    SyncTombstone.KindEnum.CATEGORY: 'categories',
+}
+
+
+def format_checkpoint(moment):
+    """
+    Formats a checkpoint as UTC ISO 8601 with a `Z` suffix, which needs no URL encoding when a
+    client sends it back in `?since=`.
+    """
+    return moment.astimezone(dt_timezone.utc).isoformat().replace('+00:00', 'Z')
+
+
+def parse_checkpoint(value):
+    """
+    Parses a checkpoint returned by a previous sync. A `+HH:MM` offset sent without URL
+    encoding arrives as ` HH:MM` and is accepted as well.
+
+    Returns:
+        - datetime | None: The checkpoint, or None when `value` is empty (first sync).
+
+    Raises:
+        - ValueError: If `value` is not a checkpoint.
+    """
+    if not value:
+        return None
+    moment = parse_datetime(re.sub(r' (\d{2}:?\d{2})$', r'+\1', value))
+    if moment is None:
+        raise ValueError(f"Invalid checkpoint '{value}'.")
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment, dt_timezone.utc)
+    return moment
+
+
+def record_tombstones(kind, user_ids, object_ids):
+    """
+    Writes one tombstone per (user, object) pair with a single INSERT.
+
+    Parameters:
+        - kind: A `SyncTombstone.KindEnum` value.
+        - user_ids: IDs of the users to notify; a None entry notifies every user.
+        - object_ids: Primary keys of the removed objects.
+    """
+    moment = timezone.now()
+    SyncTombstone.objects.bulk_create([
+        SyncTombstone(user_id=user_id, kind=kind, object_id=object_id, deleted_at=moment)
+        for user_id in user_ids for object_id in object_ids
+    ])
+
+
+def touch(model, pks):
+    """
+    Marks rows as changed without sending signals, after a change to their categories.
+    """
+    pks = list(pks)
+    if pks:
+        model.objects.filter(pk__in=pks).update(updated_at=timezone.now())
+
+
+def tombstone_retention():
+    return timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+
+
+def prune_tombstones():
+    """
+    Deletes the tombstones older than `SYNC_TOMBSTONE_RETENTION_DAYS`.
+
+    Returns:
+        - int: Number of deleted tombstones.
+    """
+    deleted, _ = SyncTombstone.objects.filter(deleted_at__lt=timezone.now() - tombstone_retention()).delete()
+    return deleted
+
+
+def collect_changes(user, since=None):
+    """
+    Gathers everything that changed for a user since a checkpoint.
+
+    A client applies `deleted` first and then upserts the changed rows by ID. When `since` is
+    missing, or older than the tombstone retention, `full` is true: every row is returned and
+    the client must replace its local copy instead of merging.
+
+    Parameters:
+        - user: The `User` to synchronize.
+        - since: Checkpoint of the previous sync (see `parse_checkpoint`), or None.
+
+    Returns:
+        - dict: The new `checkpoint`, the `full` flag, the changed transactions, debts,
+          scheduled transactions and categories, and the IDs deleted per kind.
+    """
+    checkpoint = timezone.now()
+    full = since is None or since < checkpoint - tombstone_retention()
+    changed = Q() if full else Q(updated_at__gte=since - CHECKPOINT_OVERLAP)
+
+    categories_prefetch = Prefetch('categories', queryset=Category.objects.only('id_category'))
+    transactions = (Transaction.objects.filter(changed, id_user=user)
+                    .prefetch_related(categories_prefetch).order_by('id_transaction'))
+    debts = Debt.objects.filter(changed, id_user=user).order_by('id_debt')
+    scheduled = (ScheduledTransaction.objects.filter(changed, user=user)
+                 .prefetch_related('categories').order_by('id_transaction'))
+    categories = (Category.objects.filter(changed)
+                  .filter(Q(users=user) | Q(is_universal=True)).distinct().order_by('id_category'))
+
+    deleted = {group: [] for group in TOMBSTONE_GROUPS.values()}
+    if not full:
+        tombstones = (SyncTombstone.objects
+                      .filter(Q(user_id=user.id_user) | Q(user_id__isnull=True),
+                              deleted_at__gte=since - CHECKPOINT_OVERLAP)
+                      .order_by('id').values_list('kind', 'object_id'))
+        for kind, object_id in tombstones:
+            deleted[TOMBSTONE_GROUPS[kind]].append(object_id)
+        deleted = {group: list(dict.fromkeys(ids)) for group, ids in deleted.items()}
+
+    return {
+        'checkpoint': format_checkpoint(checkpoint),
+        'full': full,
+        'transactions': TransactionSerializer(transactions, many=True).data,
+        'debts': DebtsSerializer(debts, many=True).data,
+        'scheduled_transactions': ScheduledTransactionSerializer(scheduled, many=True).data,
+        'categories': CategorySerializer(categories, many=True).data,
+        'deleted': deleted,
+    }
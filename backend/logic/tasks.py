@@ -1,9 +1,15 @@
 from celery import shared_task
-from .models import ScheduledTransaction, Transaction, User
+from .models import ScheduledTransaction, Transaction, User, ReportJob, ExportJob
 from django.utils.timezone import now
 from datetime import timedelta
 from dateutil.relativedelta import relativedelta
-from logic.views.general_views import send_email_to_user
+import tempfile
+from django.core.files.base import ContentFile, File
+from django.core.files.storage import default_storage
+from logic.exporters import prune_export_jobs, write_export_job
+from logic.importers import import_statement, open_text
+from logic.sync import prune_tombstones
+from logic.reports import get_report_pdf, prune_report_jobs, report_period, send_email_to_user
 
 
 @shared_task
@@ -54,6 +60,9 @@ def send_scheduled_emails():
     This task checks the email schedule frequency for each user (daily, weekly, monthly, or yearly) and sends an email
     if the current date matches their scheduled send date. After sending the email, the user's `email_schedule_start_date`
     is updated to the next scheduled send date based on their frequency.
+
+    Each report covers the last period of the user's frequency (e.g. the last month for a monthly report)
+    and draws the parts of the user's `report_profile`.
     """
     users = User.objects.all()
     today = now().date()
@@ -63,16 +72,139 @@ def send_scheduled_emails():
         frequency = user.email_schedule_frequency
 
         if frequency == 'daily' and next_send_date <= today:
-            send_email_to_user(user.id_user)
+            send_email_to_user(user.id_user, *report_period(frequency))
             user.email_schedule_start_date = today + timedelta(days=1)
         elif frequency == 'weekly' and next_send_date <= today:
-            send_email_to_user(user.id_user)
+            send_email_to_user(user.id_user, *report_period(frequency))
             user.email_schedule_start_date = today + timedelta(weeks=1)
         elif frequency == 'monthly' and next_send_date <= today:
-            send_email_to_user(user.id_user)
+            send_email_to_user(user.id_user, *report_period(frequency))
             user.email_schedule_start_date = today + relativedelta(months=1)
         elif frequency == 'yearly' and next_send_date <= today:
-            send_email_to_user(user.id_user)
+            send_email_to_user(user.id_user, *report_period(frequency))
             user.email_schedule_start_date = today + relativedelta(years=1)
 
         user.save()
+
+@shared_task(bind=True)
+def import_transactions_file(self, user_id, path, fmt, columns=None):
+    """
+    Imports a stored bank statement into the user's transactions.
+
+    The file is streamed in chunks by `import_statement`; after each chunk the task state is
+    set to `PROGRESS` with the number of rows processed, created and failed so far. The stored
+    file is deleted once the import finishes.
+
+    Parameters:
+        - user_id: The ID of the user that owns the imported transactions.
+        - path: Path of the uploaded statement in the default storage.
+        - fmt: Statement format (`csv`, `ofx` or `qif`).
+        - columns: Optional CSV column mapping.
+
+    Returns:
+        - dict: The import summary.
+    """
+    user = User.objects.get(id_user=user_id)
+
+    def progress(summary):
+        self.update_state(state='PROGRESS', meta={
+            'processed': summary['processed'],
+            'created': summary['created'],
+            'failed': summary['failed'],
+        })
+
+    try:
+        with default_storage.open(path, 'rb') as statement:
+            return import_statement(user, open_text(statement), fmt, columns, progress=progress)
+    finally:
+        default_storage.delete(path)
+
+
+@shared_task
+def prune_sync_tombstones():
+    """
+    Deletes the sync tombstones older than `SYNC_TOMBSTONE_RETENTION_DAYS`.
+
+    Returns:
+        - int: Number of deleted tombstones.
+    """
+    return prune_tombstones()
+
+
+@shared_task
+def build_report(job_id):
+    """
+    Builds the PDF of a report job and stores it in the default storage.
+
+    The job is marked `running` while the PDF is built, then `done` with the stored file, or
+    `failed` with the error message.
+
+    Parameters:
+        - job_id: The ID of the `ReportJob` to build.
+    """
+    job = ReportJob.objects.select_related('user').get(pk=job_id)
+    if job.status == ReportJob.StatusEnum.DONE:
+        return
+    ReportJob.objects.filter(pk=job.pk).update(status=ReportJob.StatusEnum.RUNNING)
+    try:
+        pdf = get_report_pdf(job.user, job.period_start, job.period_end, job.renderer, job.profile)
+    except Exception as e:
+        ReportJob.objects.filter(pk=job.pk).update(
+            status=ReportJob.StatusEnum.FAILED, error=str(e), finished_at=now())
+        raise
+    job.file.save(f'report_{job.user_id}_{job.pk}.pdf', ContentFile(pdf), save=False)
+    job.status = ReportJob.StatusEnum.DONE
+    job.finished_at = now()
+    job.save(update_fields=['file', 'status', 'finished_at'])
+
+
+@shared_task
+def prune_old_report_jobs():
+    """
+    Deletes the report jobs, and their PDFs, older than `REPORT_JOB_RETENTION_DAYS`.
+
+    Returns:
+        - int: Number of deleted jobs.
+    """
+    return prune_report_jobs()
+
+
+@shared_task
+def build_export(job_id):
+    """
+    Writes the file of an admin export job and stores it in the default storage.
+
+    The rows are written to a temporary file as they are read, so the task never holds the
+    whole export in memory. The job is marked `running`, then `done` with the stored file, or
+    `failed` with the error message.
+
+    Parameters:
+        - job_id: The ID of the `ExportJob` to write.
+    """
+    job = ExportJob.objects.get(pk=job_id)
+    if job.status == ExportJob.StatusEnum.DONE:
+        return
+    ExportJob.objects.filter(pk=job.pk).update(status=ExportJob.StatusEnum.RUNNING)
+    with tempfile.TemporaryFile() as output:
+        try:
+            write_export_job(job, output)
+        except Exception as e:
+            ExportJob.objects.filter(pk=job.pk).update(
+                status=ExportJob.StatusEnum.FAILED, error=str(e), finished_at=now())
+            raise
+        output.seek(0)
+        job.file.save(f'export_{job.model.split(".")[-1]}_{job.pk}.{job.format}', File(output), save=False)
+    job.status = ExportJob.StatusEnum.DONE
+    job.finished_at = now()
+    job.save(update_fields=['file', 'status', 'finished_at'])
+
+
+@shared_task
+def prune_old_export_jobs():
+    """
+    Deletes the admin export jobs, and their files, older than `EXPORT_JOB_RETENTION_DAYS`.
+
+    Returns:
+        - int: Number of deleted jobs.
+    """
+    return prune_export_jobs()
@@ -1,11 +1,18 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.urls import reverse
+from django.core.cache import cache, caches
+from django.core.files.uploadedfile import SimpleUploadedFile
 from rest_framework import status
 from rest_framework.test import APIClient
 from .models import *
 from logic.serializer import TransactionSerializer, DebtsSerializer
-from datetime import date, timedelta
+from logic.caching import chart_cache, report_cache
+from datetime import date, datetime, timedelta
+import json
 
+# The tests never touch the shared Redis cache: every cache alias points at the local memory one.
+@override_settings(CACHE_STATS_ALIAS='default', FILTER_CACHE_ALIAS='default', FORECAST_CACHE_ALIAS='default',
+                   CHART_CACHE_ALIAS='default', REPORT_CACHE_ALIAS='default')
 class APITest(TestCase):
     """
     This class contains automated tests to verify the correct functionality of the API views
@@ -17,6 +24,9 @@ class APITest(TestCase):
         a user, categories, and the necessary URLs for the tests.
         """
         self.client = APIClient()
+        cache.clear()
+        chart_cache.clear()
+        report_cache.clear()
         self.user = User.objects.create(
             email="testuser@gmail.com",
             password="123password",
@@ -32,6 +42,13 @@ class APITest(TestCase):
         self.category = Category.objects.create(category_name="Example Category", is_universal=False)
         self.user.categories.add(self.category)
         self.debt_url = reverse('debts-list')
+
+    def cache_stats(self, name):
+        """
+        Returns the hits and misses of the cache `name` reported by the cache-stats endpoint.
+        """
+        stats = self.client.get(reverse('cache-stats')).data[name]
+        return stats['hits'], stats['misses']
         self.get_debts_url = reverse ('debts-info', kwargs={'id_user': self.user.id_user})
 
 
@@ -301,3 +318,769 @@ class APITest(TestCase):
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertEqual(response.data["error"], "Cannot modify global categories.")
         self.assertEqual(Category.objects.filter(category_name="Updated Global Category").count(), 0)
+
+    def test_get_transactions_by_user_cursor_pagination(self):
+        """
+        Verifies that the transactions of a user can be walked page by page with the cursors
+        returned by the API, forwards and backwards, without repeating or skipping rows.
+        """
+        same_date = timezone.now()
+        for i in range(5):
+            Transaction.objects.create(
+                id_user=self.user,
+                mount=float(i),
+                type=Transaction.TransEnum.EXPENSE,
+                date=same_date if i < 3 else same_date + timedelta(days=i),
+            )
+        response = self.client.get(self.get_transactions_url, {'page_size': 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(response.data['previous'])
+        seen = [t['mount'] for t in response.data['results']]
+        next_url = response.data['next']
+        while next_url:
+            response = self.client.get(next_url)
+            seen.extend(t['mount'] for t in response.data['results'])
+            next_url = response.data['next']
+        self.assertEqual(seen, [0.0, 1.0, 2.0, 3.0, 4.0])
+
+        response = self.client.get(response.data['previous'])
+        self.assertEqual([t['mount'] for t in response.data['results']], [2.0, 3.0])
+
+    def test_pagination_invalid_cursor(self):
+        """
+        Verifies that a tampered cursor is rejected instead of returning an arbitrary page.
+        """
+        response = self.client.get(self.get_transactions_url, {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_bulk_create_transactions(self):
+        """
+        Verifies that a batch of transactions is stored with its categories and that invalid
+        rows are reported by index without blocking the valid ones.
+        """
+        data = [
+            {"id_user": self.user.id_user, "mount": 10.0, "type": Transaction.TransEnum.EXPENSE,
+             "categories": [self.category.id_category]},
+            {"id_user": self.user.id_user, "mount": "not a number"},
+            {"id_user": self.user.id_user, "mount": 30.0, "categories": [999999]},
+            {"id_user": self.user.id_user, "mount": 40.0, "description": "Salary"},
+        ]
+        response = self.client.post(reverse('transactions-bulk'), data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["created"], 2)
+        self.assertEqual([error["index"] for error in response.data["errors"]], [1, 2])
+        self.assertIn("mount", response.data["errors"][0]["errors"])
+        self.assertIn("categories", response.data["errors"][1]["errors"])
+        first = Transaction.objects.get(id_transaction=response.data["ids"][0])
+        self.assertEqual(list(first.categories.all()), [self.category])
+        self.assertEqual(Transaction.objects.filter(id_user=self.user).count(), 2)
+
+        other = User.objects.create(email="other@gmail.com", password="123password")
+        private = Category.objects.create(category_name="Private", is_universal=False)
+        other.categories.add(private)
+        universal = Category.objects.create(category_name="Shared", is_universal=True)
+        data = [
+            {"id_user": self.user.id_user, "mount": 5.0, "categories": [private.id_category]},
+            {"id_user": self.user.id_user, "mount": 6.0, "categories": [universal.id_category]},
+        ]
+        response = self.client.post(reverse('transactions-bulk'), data, format='json')
+        self.assertEqual((response.data["created"], [e["index"] for e in response.data["errors"]]), (1, [0]))
+        self.assertFalse(private.transactions.exists())
+
+    def test_import_transactions_csv(self):
+        """
+        Verifies that a CSV statement is imported row by row, creating its categories once,
+        reading European and accounting amounts, and reporting the rows that cannot be parsed.
+        """
+        content = (
+            "date,amount,description,category\n"
+            "2024-01-05,-25.50,Groceries,Food\n"
+            "2024-01-06,1000,Salary,Work\n"
+            "2024-01-07,abc,Broken row,Food\n"
+            "2024-01-08,-12,Lunch,Food\n"
+        )
+        upload = SimpleUploadedFile("statement.csv", content.encode("utf-8"), content_type="text/csv")
+        response = self.client.post(reverse('transactions-import', kwargs={'id_user': self.user.id_user}),
+                                    {"file": upload}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["created"], 3)
+        self.assertEqual(response.data["failed"], 1)
+        self.assertEqual(response.data["errors"][0]["row"], 3)
+        food = Category.objects.get(category_name="Food")
+        self.assertTrue(self.user.categories.filter(id_category=food.id_category).exists())
+        expenses = Transaction.objects.filter(id_user=self.user, type=Transaction.TransEnum.EXPENSE)
+        self.assertEqual(sorted(t.mount for t in expenses), [12.0, 25.5])
+        self.assertEqual(food.transactions.count(), 2)
+
+        content = (
+            "date,amount,description\n"
+            "2024-02-30,-5,Invalid day\n"
+            "2024-13-01,-5,Invalid month\n"
+            "2024-02-01,\"1.234,50\",Bonus\n"
+            "2024-02-02,(12.00),Refund reversal\n"
+        )
+        upload = SimpleUploadedFile("statement.csv", content.encode("utf-8"), content_type="text/csv")
+        response = self.client.post(reverse('transactions-import', kwargs={'id_user': self.user.id_user}),
+                                    {"file": upload}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual((response.data["created"], response.data["failed"]), (2, 2))
+        self.assertEqual([error["row"] for error in response.data["errors"]], [1, 2])
+        self.assertEqual(Transaction.objects.get(description="Bonus").mount, 1234.5)
+        reversal = Transaction.objects.get(description="Refund reversal")
+        self.assertEqual((reversal.mount, reversal.type), (12.0, Transaction.TransEnum.EXPENSE))
+
+        for columns in ('[1]', '"amount"', '{"mount": 1}', '{"amount": "total"}'):
+            upload = SimpleUploadedFile("statement.csv", content.encode("utf-8"), content_type="text/csv")
+            response = self.client.post(reverse('transactions-import', kwargs={'id_user': self.user.id_user}),
+                                        {"file": upload, "columns": columns}, format='multipart')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_export_transactions_streams_filtered_rows(self):
+        """
+        Verifies that the export endpoint streams the filtered transactions with their category
+        names in both CSV and NDJSON formats.
+        """
+        expense = Transaction.objects.create(id_user=self.user, mount=20.0, type=Transaction.TransEnum.EXPENSE,
+                                             description="Taxi")
+        expense.categories.add(self.category)
+        Transaction.objects.create(id_user=self.user, mount=900.0, type=Transaction.TransEnum.INCOME)
+        url = reverse('export-transactions', kwargs={'id_user': self.user.id_user})
+
+        response = self.client.get(url, {'type': 'expenses'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        lines = b''.join(response.streaming_content).decode('utf-8').splitlines()
+        self.assertEqual(lines[0], "id,date,type,amount,description,category")
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[1].endswith(",expense,20.0,Taxi,Example Category"))
+
+        response = self.client.get(url, {'export_format': 'ndjson'})
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[0]["categories"], ["Example Category"])
+
+    def test_transactions_etag_not_modified(self):
+        """
+        Verifies that an unchanged list is answered with 304 for a matching ETag and that any
+        write to the user's data produces a new ETag.
+        """
+        Transaction.objects.create(id_user=self.user, mount=10.0)
+        response = self.client.get(self.get_transactions_url)
+        etag = response['ETag']
+        response = self.client.get(self.get_transactions_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        transaction = Transaction.objects.create(id_user=self.user, mount=20.0)
+        transaction.categories.add(self.category)
+        response = self.client.get(self.get_transactions_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(len(response.data), 2)
+
+    def test_categories_etag_sees_new_universal_category(self):
+        """
+        Verifies that creating a universal category invalidates the category list of every user.
+        """
+        url = reverse('get-categories', kwargs={'id_user': self.user.id_user})
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_304_NOT_MODIFIED)
+        Category.objects.create(category_name="Universal Category", is_universal=True)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("Universal Category", [category['category_name'] for category in response.data])
+
+    def test_data_version_bumped_on_writes(self):
+        """
+        Verifies that the data version increases with changes to transactions, debts, scheduled
+        transactions and category associations.
+        """
+        def version():
+            self.user.refresh_from_db()
+            return self.user.data_version
+
+        start = version()
+        transaction = Transaction.objects.create(id_user=self.user, mount=10.0)
+        self.assertGreater(version(), start)
+        start = version()
+        self.category.transactions.remove(transaction)
+        self.category.transactions.add(transaction)
+        self.assertGreater(version(), start)
+        start = version()
+        Debt.objects.create(id_user=self.user, amount=5.0)
+        self.assertGreater(version(), start)
+        start = version()
+        ScheduledTransaction.objects.create(user=self.user, amount=1.0, schedule_date=date.today())
+        self.assertGreater(version(), start)
+        start = version()
+        self.user.categories.remove(self.category)
+        self.assertGreater(version(), start)
+
+    def test_monthly_summary_follows_transaction_changes(self):
+        """
+        Verifies that the incrementally maintained monthly summary matches a full rebuild after
+        transactions are created, edited, re-tagged and deleted, and that its rows are unique.
+        """
+        from django.db import IntegrityError, transaction as db_transaction
+        from logic.summaries import rebuild_monthly_summaries, summary_totals, summary_category_totals
+
+        def snapshot():
+            return sorted(
+                (row.month, row.type, row.category_id or 0, row.is_total, round(row.total, 2), row.count)
+                for row in UserMonthlySummary.objects.filter(user=self.user) if row.count
+            )
+
+        other = Category.objects.create(category_name="Other")
+        first = Transaction.objects.create(id_user=self.user, mount=100.0, type=Transaction.TransEnum.EXPENSE)
+        first.categories.set([self.category, other])
+        second = Transaction.objects.create(id_user=self.user, mount=40.0, type=Transaction.TransEnum.EXPENSE)
+        Transaction.objects.create(id_user=self.user, mount=500.0, type=Transaction.TransEnum.INCOME)
+        second.mount = 60.0
+        second.date = timezone.now() - timedelta(days=62)
+        second.save()
+        first.categories.remove(other)
+        self.category.transactions.add(second)
+        self.assertEqual(summary_totals(self.user), (500.0, 160.0))
+
+        first.delete()
+        self.assertEqual(summary_totals(self.user), (500.0, 60.0))
+        self.assertEqual(summary_category_totals(self.user, Transaction.TransEnum.EXPENSE),
+                         (["Example Category"], [60.0]))
+
+        incremental = snapshot()
+        rebuild_monthly_summaries([self.user.id_user])
+        self.assertEqual(incremental, snapshot())
+
+        # The total and untagged rows have no category but are still unique.
+        total_row = UserMonthlySummary.objects.filter(user=self.user, is_total=True).first()
+        with self.assertRaises(IntegrityError), db_transaction.atomic():
+            UserMonthlySummary.objects.create(user=self.user, month=total_row.month, type=total_row.type, is_total=True)
+
+    def test_transactions_by_period_fills_empty_buckets(self):
+        """
+        Verifies that period totals are split by type and that months without transactions
+        are returned with zeros.
+        """
+        january = timezone.make_aware(datetime(2024, 1, 10, 12))
+        march = timezone.make_aware(datetime(2024, 3, 5, 12))
+        Transaction.objects.create(id_user=self.user, mount=100.0, type=Transaction.TransEnum.INCOME, date=january)
+        Transaction.objects.create(id_user=self.user, mount=30.0, type=Transaction.TransEnum.EXPENSE, date=january)
+        Transaction.objects.create(id_user=self.user, mount=20.0, type=Transaction.TransEnum.EXPENSE, date=march)
+        url = reverse('transactions-by-period', kwargs={'id_user': self.user.id_user})
+
+        response = self.client.get(url, {'period': 'monthly'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        buckets = response.data['buckets']
+        self.assertEqual([b['period'] for b in buckets], ['2024-01-01', '2024-02-01', '2024-03-01'])
+        self.assertEqual((buckets[0]['income'], buckets[0]['expense'], buckets[0]['balance']), (100.0, 30.0, 70.0))
+        self.assertEqual((buckets[1]['income'], buckets[1]['expense']), (0, 0))
+        self.assertEqual(buckets[2]['expense_count'], 1)
+
+        response = self.client.get(url, {'period': 'hourly'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_filter_transactions_cache(self):
+        """
+        Verifies that equivalent filter queries share a cache entry and that a write to the
+        user's data is never answered from the old entry.
+        """
+        hits, misses = self.cache_stats('filter_transactions')
+        Transaction.objects.create(id_user=self.user, mount=10.0, type=Transaction.TransEnum.EXPENSE)
+        url = reverse('filter-transaction', kwargs={'id_user': self.user.id_user})
+        response = self.client.get(url, {'type': 'expenses', 'min_amount': '5'})
+        self.assertEqual(response['X-Cache'], 'MISS')
+        response = self.client.get(url, {'min_amount': '5.0', 'type': 'expenses'})
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual(len(response.data), 1)
+
+        Transaction.objects.create(id_user=self.user, mount=20.0, type=Transaction.TransEnum.EXPENSE)
+        response = self.client.get(url, {'type': 'expenses', 'min_amount': '5'})
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(len(response.data), 2)
+        self.assertEqual(self.cache_stats('filter_transactions'), (hits + 1, misses + 2))
+
+        response = self.client.get(url, {'page_size': 1})
+        self.assertTrue(response.data['next'].startswith('http://testserver/'))
+        response = self.client.get(url, {'page_size': 1}, secure=True)
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertTrue(response.data['next'].startswith('https://testserver/'))
+        self.assertIsNone(response.data['previous'])
+        response = self.client.get(response.data['next'], secure=True)
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertTrue(response.data['previous'].startswith('https://testserver/'))
+
+        # A page takes the same queries as the whole list: the categories are prefetched.
+        for transaction in Transaction.objects.filter(id_user=self.user):
+            transaction.categories.add(self.category)
+        with self.assertNumQueries(4):
+            self.client.get(url, {'type': 'expenses'})
+        with self.assertNumQueries(4):
+            response = self.client.get(url, {'type': 'expenses', 'page_size': 2})
+        self.assertEqual(len(response.data['results']), 2)
+
+    def test_sync_changes_since_checkpoint(self):
+        """
+        Verifies that a sync after a checkpoint returns only the rows changed since then, the
+        deleted IDs and the removed category associations.
+        """
+        kept = Transaction.objects.create(id_user=self.user, mount=10.0)
+        removed = Transaction.objects.create(id_user=self.user, mount=20.0)
+        url = reverse('sync-changes', kwargs={'id_user': self.user.id_user})
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data['full'])
+        self.assertEqual(len(response.data['transactions']), 2)
+        checkpoint = response.data['checkpoint']
+
+        # Move the existing rows out of the overlap window, as if the last sync were long ago.
+        past = timezone.now() - timedelta(minutes=10)
+        Transaction.objects.update(updated_at=past)
+        Category.objects.update(updated_at=past)
+        kept.categories.add(self.category)
+        removed_id = removed.id_transaction
+        removed.delete()
+        self.user.categories.remove(self.category)
+
+        response = self.client.get(url, {'since': checkpoint})
+        self.assertFalse(response.data['full'])
+        self.assertEqual([t['id_transaction'] for t in response.data['transactions']], [kept.id_transaction])
+        self.assertEqual(response.data['transactions'][0]['categories'], [self.category.id_category])
+        self.assertEqual(response.data['deleted']['transactions'], [removed_id])
+        self.assertEqual(response.data['deleted']['categories'], [self.category.id_category])
+
+        self.assertTrue(checkpoint.endswith('Z'))
+        response = self.client.get(f"{url}?since={response.data['checkpoint']}")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        from logic.sync import parse_checkpoint
+        self.assertEqual(parse_checkpoint('2024-05-01T10:00:00 00:00'), parse_checkpoint('2024-05-01T10:00:00+00:00'))
+
+        response = self.client.get(url, {'since': 'yesterday'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_transaction_arrays_analytics(self):
+        """
+        Verifies the vectorized totals, category split, period buckets, running balance and
+        top-N against hand-computed values.
+        """
+        from logic.analytics import TransactionArrays
+        other = Category.objects.create(category_name="Other Category")
+        january = timezone.make_aware(datetime(2024, 1, 10, 12))
+        march = timezone.make_aware(datetime(2024, 3, 5, 12))
+        salary = Transaction.objects.create(id_user=self.user, mount=100.0, type=Transaction.TransEnum.INCOME, date=january)
+        rent = Transaction.objects.create(id_user=self.user, mount=60.0, type=Transaction.TransEnum.EXPENSE, date=january)
+        Transaction.objects.create(id_user=self.user, mount=15.0, type=Transaction.TransEnum.EXPENSE, date=march)
+        rent.categories.add(self.category, other)
+        salary.categories.add(self.category)
+
+        arrays = TransactionArrays.for_user(self.user)
+        self.assertEqual(arrays.totals(), (100.0, 75.0))
+        self.assertEqual(arrays.category_totals(Transaction.TransEnum.EXPENSE),
+                         (['Example Category', 'Other Category', 'Uncategorized'], [60.0, 60.0, 15.0]))
+        buckets = arrays.period_buckets('monthly')
+        self.assertEqual([b['period'] for b in buckets], ['2024-01-01', '2024-03-01'])
+        self.assertEqual((buckets[0]['income'], buckets[0]['expense'], buckets[0]['expense_count']), (100.0, 60.0, 1))
+        self.assertEqual(arrays.running_balance().tolist(), [100.0, 40.0, 25.0])
+        self.assertEqual([t['id_transaction'] for t in arrays.top(1, Transaction.TransEnum.EXPENSE)], [rent.id_transaction])
+        self.assertEqual(arrays.period_starts('weekly')[0].item(), date(2024, 1, 8))
+
+    def test_cash_flow_forecast(self):
+        """
+        Verifies that scheduled transactions are projected onto the current balance, that the
+        days below zero are reported and that the forecast is served from the cache.
+        """
+        from dateutil.relativedelta import relativedelta
+        Transaction.objects.create(id_user=self.user, mount=100.0, type=Transaction.TransEnum.INCOME)
+        first = timezone.localdate() + timedelta(days=1)
+        ScheduledTransaction.objects.create(user=self.user, amount=60.0, type=Transaction.TransEnum.EXPENSE,
+                                            schedule_date=first, repeat='monthly')
+        url = reverse('forecast-cash-flow', kwargs={'id_user': self.user.id_user})
+
+        response = self.client.get(url, {'days': 60})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        balances = response.data['balances']
+        self.assertEqual(len(balances), 60)
+        self.assertEqual((balances[0]['balance'], balances[1]['balance']), (100.0, 40.0))
+        negative = response.data['negative_days']
+        self.assertEqual(negative[0], {'date': (first + relativedelta(months=1)).isoformat(), 'balance': -20.0})
+        self.assertEqual(response.data['lowest']['balance'], -20.0)
+
+        self.assertEqual(self.client.get(url, {'days': 60})['X-Cache'], 'HIT')
+        self.assertEqual(self.client.get(url, {'days': 0}).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_report_job_lifecycle(self):
+        """
+        Verifies that a report job is built in the background, deduplicated while the data does
+        not change, and downloadable once done.
+        """
+        Transaction.objects.create(id_user=self.user, mount=50.0, type=Transaction.TransEnum.INCOME)
+        Transaction.objects.create(id_user=self.user, mount=20.0, type=Transaction.TransEnum.EXPENSE)
+        url = reverse('report-job-create', kwargs={'id_user': self.user.id_user})
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(url)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        job_id = response.data['id']
+
+        status_url = reverse('report-job-status', kwargs={'id_user': self.user.id_user, 'job_id': job_id})
+        response = self.client.get(status_url)
+        self.assertEqual(response.data['status'], ReportJob.StatusEnum.DONE)
+        response = self.client.get(response.data['download_url'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        response.close()
+
+        response = self.client.post(url)
+        self.assertEqual((response.status_code, response.data['id']), (status.HTTP_200_OK, job_id))
+        Transaction.objects.create(id_user=self.user, mount=5.0)
+        response = self.client.post(url)
+        self.assertNotEqual(response.data['id'], job_id)
+        ReportJob.objects.get(pk=job_id).file.delete(save=False)
+
+    def test_report_charts_served_from_memory(self):
+        """
+        Verifies that the report charts are rendered in memory and served to WeasyPrint by the
+        `chart:` fetcher, and that the e-mailed report is built without writing chart files.
+        """
+        from django.core import mail
+        from django.test import override_settings
+        import tempfile, os
+        from logic.reports import render_report_charts, chart_url_fetcher, build_report_context
+        from logic.reports import send_email_to_user
+        Transaction.objects.create(id_user=self.user, mount=50.0, type=Transaction.TransEnum.INCOME)
+
+        charts = render_report_charts(self.user)
+        self.assertEqual(set(charts), {'income', 'expense', 'inpie', 'expie'})
+        fetched = chart_url_fetcher(charts)(build_report_context(self.user)['expie_chart_url'])
+        self.assertEqual((fetched['mime_type'], fetched['string'][:4]), ('image/png', b'\x89PNG'))
+
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root):
+            send_email_to_user(self.user.id_user)
+            self.assertEqual(os.listdir(media_root), [])
+        self.assertEqual(mail.outbox[-1].attachments[0][2], 'application/pdf')
+
+    def test_chart_cache_reuses_unchanged_charts(self):
+        """
+        Verifies that charts of unchanged data are served from the chart cache, that new data
+        produces new images, and that the LRU stays within its byte budget.
+        """
+        from logic.caching import ChartCache
+        from logic.reports import render_report_charts
+        hits, misses = self.cache_stats('charts')
+        Transaction.objects.create(id_user=self.user, mount=50.0, type=Transaction.TransEnum.INCOME)
+        first = render_report_charts(self.user)
+        self.assertEqual(render_report_charts(self.user), first)
+        self.assertEqual(self.cache_stats('charts'), (hits + 4, misses + 4))
+
+        Transaction.objects.create(id_user=self.user, mount=25.0, type=Transaction.TransEnum.INCOME)
+        second = render_report_charts(self.user)
+        self.assertNotEqual(second['income'], first['income'])
+        self.assertEqual(second['expense'], first['expense'])
+
+        small = ChartCache(max_bytes=10)
+        small.get_or_render('chart:a', lambda: b'12345')
+        small.get_or_render('chart:b', lambda: b'67890')
+        small.get_or_render('chart:c', lambda: b'abcde')
+        self.assertEqual(list(small.entries), ['chart:b', 'chart:c'])
+
+    def test_render_charts_in_process_pool(self):
+        """
+        Verifies that only a process that started the pool uses it, and that the charts drawn by
+        the pool are valid PNGs identical to the ones drawn in-process.
+        """
+        import numpy as np
+        from logic import charts
+        from logic.charts import render_charts, shutdown_pool
+        dates = np.array(['2024-01-01', '2024-02-01'], dtype='datetime64[s]')
+        specs = {
+            'line': ('line', (dates, np.array([1.0, 2.0])), {'label': 'a', 'color': 'green', 'title': 't'}),
+            'pie': ('pie', (['x', 'y'], [1.0, 3.0]), {'title': 't'}),
+            'empty': ('pie', ([], []), {'title': 't'}),
+        }
+        # Without `start_pool` (e.g. in a Celery worker) the charts are drawn in-process.
+        inline = render_charts(specs, workers=2)
+        self.assertIsNone(charts._pool)
+        try:
+            charts.start_pool(2)
+            pool = charts.get_pool(2)
+            pooled = render_charts(specs, workers=2)
+            self.assertIs(charts.get_pool(2), pool)
+        finally:
+            shutdown_pool()
+            charts._pool_enabled = False
+        self.assertEqual(set(pooled), set(specs))
+        for name in specs:
+            self.assertEqual(pooled[name][:4], b'\x89PNG')
+        self.assertEqual(pooled['line'], inline['line'])
+
+    def test_report_context_query_count(self):
+        """
+        Verifies that a report's context, template and charts take the same number of queries
+        whatever the size of the user's history, and that the totals come out right.
+        """
+        from django.template.loader import render_to_string
+        from logic.reports import ReportContext
+
+        def seed(count):
+            for i in range(count):
+                transaction = Transaction.objects.create(
+                    id_user=self.user, mount=10.0 + i,
+                    type=Transaction.TransEnum.INCOME if i % 2 else Transaction.TransEnum.EXPENSE)
+                transaction.categories.add(self.category)
+                Debt.objects.create(id_user=self.user, amount=5.0, totalAmount=5.0,
+                                    status=Debt.StatusEnum.OVERDUE if i % 2 else Debt.StatusEnum.PENDING)
+                scheduled = ScheduledTransaction.objects.create(user=self.user, amount=1.0, schedule_date=date.today())
+                scheduled.categories.add(self.category)
+
+        def build():
+            report = ReportContext(self.user)
+            render_to_string('pdf_template.html', report.template_context())
+            report.chart_specs()
+            return report
+
+        seed(1)
+        with self.assertNumQueries(7):
+            build()
+        seed(20)
+        with self.assertNumQueries(7):
+            report = build()
+        self.assertEqual(len(report.transactions), 21)
+        self.assertEqual((report.total_income, report.total_expenses), (200.0, 200.0))
+        self.assertEqual((report.total_pending_debt, report.total_overdue_debt), (55.0, 50.0))
+
+    def test_period_report_carries_prior_balance(self):
+        """
+        Verifies that a period report only lists the period's transactions, carries the
+        earlier ones over as one balance, and that invalid periods are rejected.
+        """
+        from django.utils import timezone
+        from logic.reports import ReportContext, parse_report_period, period_bounds, report_period
+        start, end = report_period('monthly')
+        first, after = period_bounds(start, end)
+        Transaction.objects.create(id_user=self.user, mount=100.0, type=Transaction.TransEnum.INCOME,
+                                   date=first - timedelta(days=70))
+        Transaction.objects.create(id_user=self.user, mount=10.0, type=Transaction.TransEnum.EXPENSE,
+                                   date=first - timedelta(hours=1))
+        Transaction.objects.create(id_user=self.user, mount=30.0, type=Transaction.TransEnum.EXPENSE, date=first)
+        Transaction.objects.create(id_user=self.user, mount=50.0, type=Transaction.TransEnum.INCOME,
+                                   date=timezone.now())
+
+        self.assertEqual(parse_report_period({'period': 'monthly'}), (start, end))
+        report = ReportContext(self.user, start, end)
+        self.assertEqual(len(report.transactions), 2)
+        self.assertEqual((report.prior_balance, report.total_income, report.total_expenses), (90.0, 50.0, 30.0))
+        self.assertEqual(report.template_context()['main_balance_message'], '$110.00')
+
+        self.assertEqual(parse_report_period({}), (None, None))
+        for params in ({'period': 'hourly'}, {'start_date': 'nope'}, {'end_date': '2024-01-01'},
+                       {'start_date': '2024-02-01', 'end_date': '2024-01-01'}):
+            with self.assertRaises(ValueError):
+                parse_report_period(params)
+        response = self.client.get(reverse('generate_pdf', kwargs={'id_user': self.user.id_user}), {'period': 'hourly'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_line_chart_series_downsampled(self):
+        """
+        Verifies that long line series are reduced to `CHART_MAX_POINTS` points, keeping the
+        end points and the peaks, and that short series are left untouched.
+        """
+        import numpy as np
+        from django.test import override_settings
+        from logic.charts import lttb
+        from logic.reports import ReportContext
+        amounts = np.ones(1000)
+        amounts[500] = 50.0
+        kept = lttb(np.arange(1000), amounts, 20)
+        self.assertEqual((len(kept), kept[0], kept[-1]), (20, 0, 999))
+        self.assertIn(500, kept)
+        self.assertEqual(lttb(np.arange(5), np.arange(5), 20).tolist(), [0, 1, 2, 3, 4])
+
+        for i in range(12):
+            Transaction.objects.create(id_user=self.user, mount=1.0 + i, type=Transaction.TransEnum.INCOME)
+        with override_settings(CHART_MAX_POINTS=5):
+            dates, values = ReportContext(self.user).chart_specs()['income'][1]
+        self.assertEqual((len(dates), values[0], values[-1]), (5, 1.0, 12.0))
+
+    def test_report_dependencies_load_lazily(self):
+        """
+        Verifies that loading the URLs and the Celery tasks does not import matplotlib or
+        WeasyPrint, and that the import-time report is parsed per package.
+        """
+        import subprocess, sys
+        from django.conf import settings
+        from logic.management.commands.benchmark_imports import parse_importtime
+        code = ('import sys, django; django.setup(); import backend.urls, logic.tasks; '
+                'print(sorted(name for name in ("matplotlib", "weasyprint") if name in sys.modules))')
+        # The child inherits DJANGO_SETTINGS_MODULE from the test runner.
+        result = subprocess.run([sys.executable, '-c', code], cwd=settings.BASE_DIR, capture_output=True, text=True)
+        self.assertEqual((result.returncode, result.stdout.strip()), (0, '[]'), result.stderr)
+
+        report = ('import time: self [us] | cumulative | imported package\n'
+                  'import time:        10 |         10 |   numpy.core\n'
+                  'import time:        20 |         30 | numpy\n')
+        self.assertEqual(parse_importtime(report), (30, {'numpy': 30}))
+
+    def test_report_pdf_cache(self):
+        """
+        Verifies that a report downloaded and then e-mailed for the same data is built once,
+        that a write or another period builds a new one, and that the LRU is bounded.
+        """
+        from logic.caching import ReportCache
+        from logic.reports import get_report_pdf, send_email_to_user
+        hits, misses = self.cache_stats('reports')
+        Transaction.objects.create(id_user=self.user, mount=50.0, type=Transaction.TransEnum.INCOME)
+        response = self.client.get(reverse('generate_pdf', kwargs={'id_user': self.user.id_user}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        send_email_to_user(self.user.id_user)
+        self.assertEqual(self.cache_stats('reports'), (hits + 1, misses + 1))
+
+        Transaction.objects.create(id_user=self.user, mount=5.0, type=Transaction.TransEnum.EXPENSE)
+        self.user.refresh_from_db()
+        get_report_pdf(self.user)
+        get_report_pdf(self.user, date.today(), date.today())
+        self.assertEqual(self.cache_stats('reports'), (hits + 1, misses + 3))
+
+        small = ReportCache(max_bytes=10)
+        small.put('report:a', b'123456')
+        small.put('report:b', b'789012')
+        self.assertEqual(list(small.entries), ['report:b'])
+
+        # A local memory alias is not used as the shared layer.
+        small.put('report:c', b'345')
+        self.assertIsNone(caches['default'].get('report:c'))
+
+    def test_chunked_report_rendering(self):
+        """
+        Verifies that large reports are walked in fixed-size row chunks across sections and
+        that the merged PDF is numbered across all of its pages.
+        """
+        from io import BytesIO
+        from pypdf import PdfReader
+        from logic.reports import ReportContext, build_report_pdf
+        for i in range(12):
+            Transaction.objects.create(id_user=self.user, mount=1.0 + i, type=Transaction.TransEnum.INCOME)
+        for i in range(3):
+            Debt.objects.create(id_user=self.user, amount=5.0, totalAmount=5.0)
+
+        chunks = list(ReportContext(self.user).iter_row_chunks(5))
+        self.assertEqual([sum(len(rows) for rows in chunk.values()) for chunk in chunks], [5, 5, 5])
+        self.assertEqual([list(chunk) for chunk in chunks], [['transactions'], ['transactions'], ['transactions', 'debts']])
+        self.assertEqual([t.mount for chunk in chunks for t in chunk.get('transactions', [])],
+                         [1.0 + i for i in range(12)])
+
+        pages = PdfReader(BytesIO(build_report_pdf(self.user, chunk_rows=5))).pages
+        self.assertGreaterEqual(len(pages), len(chunks) + 1)
+        self.assertIn(f'Page {len(pages)} of {len(pages)}', pages[-1].extract_text())
+        self.assertEqual(build_report_pdf(self.user, chunk_rows=0)[:4], b'%PDF')
+
+    def test_reportlab_renderer(self):
+        """
+        Verifies that the ReportLab renderer draws the report without WeasyPrint and that the
+        renderer is chosen by query parameter and validated.
+        """
+        from io import BytesIO
+        from pypdf import PdfReader
+        from logic.reports import build_report_pdf, parse_report_options
+        Transaction.objects.create(id_user=self.user, mount=75.0, type=Transaction.TransEnum.INCOME,
+                                   description='Salary')
+        Debt.objects.create(id_user=self.user, lender='Bank', amount=5.0, totalAmount=5.0)
+
+        text = ''.join(page.extract_text() for page in PdfReader(BytesIO(build_report_pdf(self.user, renderer='reportlab'))).pages)
+        self.assertIn('Financial Report', text)
+        self.assertIn('Salary', text)
+        self.assertIn('Bank', text)
+        self.assertIn('Page 1', text)
+
+        with self.assertRaises(ValueError):
+            parse_report_options({'renderer': 'latex'})
+        url = reverse('generate_pdf', kwargs={'id_user': self.user.id_user})
+        response = self.client.get(url, {'renderer': 'reportlab'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.content[:4], b'%PDF')
+        self.assertEqual(self.client.get(url, {'renderer': 'latex'}).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_report_profiles(self):
+        """
+        Verifies that a report profile only runs the queries and charts of its parts and that
+        the user's preferred profile is used when none is requested.
+        """
+        from io import BytesIO
+        from pypdf import PdfReader
+        from logic.reports import ReportContext, get_report_pdf, parse_report_options
+        Transaction.objects.create(id_user=self.user, mount=75.0, type=Transaction.TransEnum.INCOME,
+                                   description='Salary')
+
+        report = ReportContext(self.user, profile='summary')
+        with self.assertNumQueries(2):
+            context = report.template_context()
+        self.assertEqual(report.render_charts(), {})
+        self.assertFalse(context['show_transactions'] or context['show_charts'])
+        self.assertEqual(context['total_income'], 75.0)
+        with self.assertNumQueries(0):
+            self.assertEqual(ReportContext(self.user, profile='tables-only').render_charts(), {})
+        self.assertEqual(set(ReportContext(self.user, profile='charts-only').render_charts()),
+                         {'income', 'expense', 'inpie', 'expie'})
+
+        self.user.report_profile = 'summary'
+        self.user.save()
+        text = ''.join(page.extract_text() for page in PdfReader(BytesIO(get_report_pdf(self.user, renderer='reportlab'))).pages)
+        self.assertIn('Financial Balances', text)
+        self.assertNotIn('Salary', text)
+        text = ''.join(page.extract_text() for page in PdfReader(BytesIO(
+            get_report_pdf(self.user, renderer='reportlab', profile='tables-only'))).pages)
+        self.assertIn('Salary', text)
+        self.assertNotIn('Financial Balances', text)
+
+        self.assertIsNone(parse_report_options({})['profile'])
+        with self.assertRaises(ValueError):
+            parse_report_options({'profile': 'everything'})
+        url = reverse('generate_pdf', kwargs={'id_user': self.user.id_user})
+        self.assertEqual(self.client.get(url, {'profile': 'everything'}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(url, {'profile': 'charts-only'}).status_code, status.HTTP_200_OK)
+
+    def test_admin_exports(self):
+        """
+        Verifies that the admin exports stream the selected rows in each format, reading them in
+        keyset chunks, and that large selections are written by a background job from the
+        stored query.
+        """
+        import csv, tempfile
+        from io import BytesIO, StringIO
+        from django.contrib import admin
+        from django.contrib.messages.storage.fallback import FallbackStorage
+        from django.test import RequestFactory, override_settings
+        from openpyxl import load_workbook
+        from pypdf import PdfReader
+        from logic.admin import export_csv, export_excel, export_pdf
+        from logic.exporters import iter_export_rows
+        for i in range(3):
+            Transaction.objects.create(id_user=self.user, mount=10.0 + i, description=f'Row {i}')
+        other = User.objects.create(email="other@gmail.com", password="123password", first_name="Other",
+                                    last_name_father="User", curp="OTHER123456789", rfc="OTHERRFC123")
+        Transaction.objects.create(id_user=other, mount=99.0, description='Other user')
+        queryset = Transaction.objects.filter(id_user=self.user).order_by('id_transaction')
+        modeladmin = admin.site._registry[Transaction]
+        request = RequestFactory().post('/')
+
+        response = export_csv(modeladmin, request, queryset)
+        self.assertTrue(response.streaming)
+        rows = list(csv.reader(StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual(rows[0][:3], ['id_transaction', 'id_user', 'mount'])
+        self.assertEqual([row[1:3] for row in rows[1:]], [[str(self.user.id_user), str(10.0 + i)] for i in range(3)])
+        sheet = load_workbook(BytesIO(export_excel(modeladmin, request, queryset).content)).active
+        self.assertEqual([row[2] for row in sheet.iter_rows(min_row=2, values_only=True)], [10.0, 11.0, 12.0])
+        text = PdfReader(BytesIO(export_pdf(modeladmin, request, queryset).content)).pages[0].extract_text()
+        self.assertIn('Row 2', text)
+
+        rows = list(iter_export_rows(queryset.order_by('-id_transaction'), chunk_size=2))
+        self.assertEqual([row[3] for row in rows], ['Row 0', 'Row 1', 'Row 2'])
+
+        request.session = {}
+        request._messages = FallbackStorage(request)
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root, ADMIN_EXPORT_ASYNC_ROWS=2):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.assertIsNone(export_csv(modeladmin, request, queryset.order_by('-id_transaction')))
+            job = ExportJob.objects.get()
+            self.assertEqual((job.status, job.row_count), (ExportJob.StatusEnum.DONE, 3))
+            with job.file.open('rb') as file:
+                rows = list(csv.reader(StringIO(file.read().decode())))
+            self.assertEqual([row[3] for row in rows[1:]], ['Row 0', 'Row 1', 'Row 2'])
+            job.file.delete(save=False)
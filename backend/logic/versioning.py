@@ -0,0 +1,39 @@
+import hashlib
+from django.db.models import F
+from django.views.decorators.http import condition
+from logic.models import User
+
+
+def bump_data_version(*user_ids):
+    """
+    Increases the data version of the given users with a single atomic UPDATE.
+
+    Parameters:
+        - user_ids: IDs of the users whose data changed. Duplicates and None are ignored.
+    """
+    user_ids = {user_id for user_id in user_ids if user_id is not None}
+    if user_ids:
+        User.objects.filter(id_user__in=user_ids).update(data_version=F('data_version') + 1)
+
+
+def get_data_version(user_id):
+    """
+    Returns the current data version of a user, or None if the user does not exist.
+    """
+    return User.objects.filter(id_user=user_id).values_list('data_version', flat=True).first()
+
+
+def data_version_etag(request, id_user, *args, **kwargs):
+    """
+    ETag of a per-user GET view: the user's data version plus a digest of the full path, so
+    each filter combination and page gets its own tag.
+    """
+    version = get_data_version(id_user)
+    if version is None:
+        return None
+    digest = hashlib.sha1(request.get_full_path().encode('utf-8')).hexdigest()[:16]
+    return f'"{id_user}-{version}-{digest}"'
+
+
+# Answers `If-None-Match` with 304 before the view runs, and adds the ETag to fresh responses.
+etag_by_data_version = condition(etag_func=data_version_etag)
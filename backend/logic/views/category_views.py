@@ -3,12 +3,17 @@ from rest_framework.response import Response
 from rest_framework.decorators import api_view
 from logic.models import User, Transaction, Category
 from logic.serializer import CategorySerializer
+from logic.versioning import etag_by_data_version
 
 @api_view(['GET'])
+@etag_by_data_version
 def get_categories_by_user(request, id_user):
     """
     Retrieve all categories associated with a user, including universal categories.
 
+    The response carries an ETag tied to the user's data version; a matching `If-None-Match`
+    is answered with 304 without querying the list.
+
     Args:
         request: The HTTP request object.
         id_user (int): ID of the user whose categories are to be retrieved.
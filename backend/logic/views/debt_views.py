@@ -4,6 +4,8 @@ from rest_framework.decorators import api_view
 from rest_framework.exceptions import ValidationError
 from logic.models import Debt, Transaction
 from logic.serializer import DebtsSerializer
+from logic.pagination import DebtPagination
+from logic.versioning import etag_by_data_version
 from datetime import datetime, timezone
 from dateutil.parser import isoparse
 from logic.views.category_views import  create_or_associate_category_logic
@@ -141,10 +143,16 @@ def update_user_debt(request, id_user, id_debt):
 
 
 @api_view(['GET'])
+@etag_by_data_version
 def get_debts_by_user(request, id_user):
     """
     Retrieve all debts associated with a specific user.
 
+    When `cursor` or `page_size` is given, the list is paginated by `(init_date, id_debt)`.
+
+    The response carries an ETag tied to the user's data version; a matching `If-None-Match`
+    is answered with 304 without querying the list.
+
     Args:
         request: The HTTP request object.
         id_user (int): ID of the user whose debts are to be retrieved.
@@ -153,6 +161,11 @@ def get_debts_by_user(request, id_user):
         Response: Serialized list of debts for the user.
     """
     debts = Debt.objects.filter(id_user=id_user)
+    paginator = DebtPagination()
+    page = paginator.paginate_queryset(debts, request)
+    if page is not None:
+        serializer = DebtsSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
     serializer = DebtsSerializer(debts, many=True)
     return Response(serializer.data, status=status.HTTP_200_OK)
 
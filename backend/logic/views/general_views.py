@@ -2,40 +2,41 @@ from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.decorators import api_view
 from django.utils.dateparse import parse_date
-from django.http import HttpResponse
-from django.shortcuts import render
-from io import BytesIO
-import matplotlib.pyplot as plt
+from django.http import HttpResponse, StreamingHttpResponse
 import base64
-from django.db.models import Sum
-from matplotlib.dates import DateFormatter, AutoDateLocator
-from weasyprint import HTML
-from matplotlib.colors import to_hex
-import random
 from django.core.mail import EmailMessage
 from datetime import datetime
-from logic.models import User, Transaction, Debt, ScheduledTransaction
+from logic.models import User
 from logic.serializer import TransactionSerializer
+from logic.pagination import TransactionPagination
+from logic.versioning import etag_by_data_version, get_data_version
+from logic.caching import get_cache, record_cache_access, get_cache_stats, filter_cache_key
+from logic.filters import filter_transactions_queryset
+from logic.exporters import EXPORT_FORMATS, EXPORT_STREAMS
+from logic.periods import PERIODS, aggregate_by_period
+from logic.reports import get_report_pdf, parse_report_options
 from datetime import datetime, timezone
 from django.utils import timezone
-from django.template.loader import render_to_string
 from tempfile import NamedTemporaryFile
 from django.conf import settings
 from django.utils.timezone import now
 from django.utils.dateparse import parse_datetime
-import os
 from django.conf import settings
 from django.contrib.sites.shortcuts import get_current_site
-from weasyprint import HTML
-from django.utils.timezone import localtime
 
 
 @api_view(['GET'])
+@etag_by_data_version
 def filter_transactions(request, id_user):
     """
     Filters transactions for a specific user based on various query parameters like date range,
     categories, minimum and maximum amount, and transaction type (income or expense).
 
+    The response carries an ETag tied to the user's data version; a matching `If-None-Match`
+    is answered with 304 without querying the list. Results are cached under a normalized form
+    of the query and the data version (see `FILTER_CACHE_ALIAS` and `FILTER_CACHE_TIMEOUT`);
+    the `X-Cache` header tells whether the cache was used.
+
     Parameters:
         - start_date (optional): Start date for filtering transactions.
         - end_date (optional): End date for filtering transactions.
@@ -43,37 +44,105 @@ def filter_transactions(request, id_user):
         - min_amount (optional): Minimum amount for filtering transactions.
         - max_amount (optional): Maximum amount for filtering transactions.
         - type (optional): Type of transaction (`incomes` or `expenses`).
+        - cursor, page_size (optional): Keyset pagination by `(date, id_transaction)`.
 
     Returns:
         - Response: A list of filtered transactions, serialized using the `TransactionSerializer`.
     """
+    cache = get_cache('FILTER_CACHE_ALIAS')
+    cache_key = filter_cache_key(id_user, get_data_version(id_user), request.GET)
+    paginator = TransactionPagination()
+    data = cache.get(cache_key)
+    record_cache_access('filter_transactions', data is not None)
+    cache_status = 'HIT'
+    if data is None:
+        # Pages are cached with their cursors, not their links: the links are absolute URLs
+        # and must follow the host and scheme of each request.
+        transactions = filter_transactions_queryset(id_user, request.GET).prefetch_related('categories')
+        page = paginator.paginate_queryset(transactions, request)
+        if page is not None:
+            data = {'cursors': paginator.get_page_cursors(), 'results': TransactionSerializer(page, many=True).data}
+        else:
+            data = {'results': TransactionSerializer(transactions, many=True).data}
+        cache.set(cache_key, data, settings.FILTER_CACHE_TIMEOUT)
+        cache_status = 'MISS'
+
+    if 'cursors' in data:
+        body = {**paginator.build_links(request, data['cursors']), 'results': data['results']}
+    else:
+        body = data['results']
+    response = Response(body, status=status.HTTP_200_OK)
+    response['X-Cache'] = cache_status
+    return response
+
+@api_view(['GET'])
+@etag_by_data_version
+def transactions_by_period(request, id_user):
+    """
+    Returns the income and expense totals of a user per daily, weekly, monthly or yearly bucket.
+
+    The sums are computed in the database, so the response size depends on the number of buckets
+    and not on the number of transactions. Buckets without transactions are filled with zeros.
+    Accepts the same filters as `filter_transactions`; `start_date` and `end_date` also set the
+    range of buckets returned.
+
+    Parameters:
+        - period (optional): `daily`, `weekly`, `monthly` (default) or `yearly`.
+        - start_date, end_date, categories, min_amount, max_amount, type (optional): See `filter_transactions`.
+
+    Returns:
+        - Response: The period and the list of buckets, or an error message.
+    """
+    period = request.GET.get('period', 'monthly')
+    if period not in PERIODS:
+        return Response({'error': 'Invalid period'}, status=status.HTTP_400_BAD_REQUEST)
     start_date = request.GET.get('start_date')
     end_date = request.GET.get('end_date')
-    categories = request.GET.getlist('categories')
-    min_amount = request.GET.get('min_amount')
-    max_amount = request.GET.get('max_amount')
-    transaction_type = request.GET.get('type')
-
-    transactions = Transaction.objects.filter(id_user=id_user)
-
-    if transaction_type == 'expenses':
-        transactions = transactions.filter(type=Transaction.TransEnum.EXPENSE)
-    elif transaction_type == 'incomes':
-        transactions = transactions.filter(type=Transaction.TransEnum.INCOME)
-    if start_date:
-        transactions = transactions.filter(date__gte=parse_date(start_date))
-    if end_date:
-        end_date = datetime.combine(parse_date(end_date), datetime.max.time())
-        transactions = transactions.filter(date__lte=end_date)
-    if min_amount:
-        transactions = transactions.filter(mount__gte=float(min_amount))
-    if max_amount:
-        transactions = transactions.filter(mount__lte=float(max_amount))
-    if categories:
-        transactions = transactions.filter(categories__in=categories).distinct()
-
-    serializer = TransactionSerializer(transactions, many=True)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    transactions = filter_transactions_queryset(id_user, request.GET)
+    try:
+        buckets = aggregate_by_period(
+            transactions, period,
+            parse_date(start_date) if start_date else None,
+            parse_date(end_date) if end_date else None,
+        )
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    return Response({'period': period, 'buckets': buckets}, status=status.HTTP_200_OK)
+
+@api_view(['GET'])
+def export_transactions(request, id_user):
+    """
+    Streams the transactions of a user as a CSV or NDJSON download.
+
+    Accepts the same filters as `filter_transactions`. Rows are read in keyset-ordered chunks
+    and written to the response as they are produced, so the download starts immediately and
+    the full result is never held in memory.
+
+    Parameters:
+        - export_format (optional): `csv` (default) or `ndjson`.
+        - start_date, end_date, categories, min_amount, max_amount, type (optional): See `filter_transactions`.
+
+    Returns:
+        - StreamingHttpResponse: The exported file as an attachment.
+    """
+    export_format = request.GET.get('export_format', 'csv')
+    if export_format not in EXPORT_STREAMS:
+        return Response({'error': 'Invalid export_format'}, status=status.HTTP_400_BAD_REQUEST)
+    transactions = filter_transactions_queryset(id_user, request.GET)
+    response = StreamingHttpResponse(EXPORT_STREAMS[export_format](transactions),
+                                     content_type=EXPORT_FORMATS[export_format])
+    response['Content-Disposition'] = f'attachment; filename="transactions_{id_user}.{export_format}"'
+    return response
+
+@api_view(['GET'])
+def cache_stats(request):
+    """
+    Returns the hit and miss counters of the server-side result caches.
+
+    Returns:
+        - Response: Hits, misses and hit rate per cache.
+    """
+    return Response(get_cache_stats(), status=status.HTTP_200_OK)
 
 @api_view(['GET'])
 def generate_pdf(request, id_user):
@@ -83,134 +152,22 @@ def generate_pdf(request, id_user):
 
     Parameters:
         - id_user: The ID of the user for whom the report is being generated.
+        - period, start_date, end_date, renderer, profile (optional): The report options; see
+          `parse_report_options`.
+          The whole history is reported by default.
 
     Returns:
-        - HttpResponse: A PDF file containing the generated report as an attachment.
+        - HttpResponse: A PDF file containing the generated report as an attachment, or an
+          error message if the period is invalid.
     """
+    try:
+        options = parse_report_options(request.GET)
+    except ValueError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
     user = User.objects.get(id_user=id_user)
-    transactions = Transaction.objects.filter(id_user=user).select_related('id_user').prefetch_related('categories')
-    for transaction in transactions:
-        transaction.date = localtime(transaction.date)
-    debts = Debt.objects.filter(id_user=user)
-    scheduled_transactions = ScheduledTransaction.objects.filter(user=user).prefetch_related('categories')
-
-    income_data = transactions.filter(type=Transaction.TransEnum.INCOME)
-    expense_data = transactions.filter(type=Transaction.TransEnum.EXPENSE)
-
-    total_income = sum(t.mount for t in income_data)
-    total_expenses = sum(t.mount for t in expense_data)
-
-    total_paid_debt = sum(d.totalAmount for d in debts if d.status == Debt.StatusEnum.PAID)
-    total_pending_debt = sum(d.totalAmount for d in debts if d.status == Debt.StatusEnum.PENDING)
-    total_overdue_debt = sum(d.totalAmount for d in debts if d.status == Debt.StatusEnum.OVERDUE)
-
-    main_balance = total_income - total_expenses
-    debt_balance = total_pending_debt + total_overdue_debt
-    suggested_balance = main_balance - (total_pending_debt + total_overdue_debt)
-
-    main_balance_message = ( f"${main_balance:.2f}")
-    debt_balance_message = f"${debt_balance:.2f}"
-    suggested_balance_message = f"${suggested_balance:.2f}"
-
-
-    income_dates = [t.date for t in income_data]
-    income_amounts = [t.mount for t in income_data]
-    expense_dates = [t.date for t in expense_data]
-    expense_amounts = [t.mount for t in expense_data]
-
-    temp_images = []
-
-
-    #Line Graph Incomes
-    income_temp_file = os.path.join(settings.MEDIA_ROOT, f"temp_income_chart_{id_user}.png")
-    fig, ax = plt.subplots(figsize=(16, 9))
-    ax.plot(income_dates, income_amounts, label='Ingresos', color='green', linewidth=2)
-    ax.scatter(income_dates, income_amounts, color='black', zorder=5, label='Entries')
-    ax.set_xlabel('Date')
-    ax.set_ylabel('Amount ($)')
-    ax.set_title('Income over Time')
-    ax.xaxis.set_major_locator(AutoDateLocator())
-    ax.xaxis.set_major_formatter(DateFormatter("%Y-%m-%d"))
-    ax.tick_params(axis='x', rotation=45)
-    ax.legend()
-    ax.grid(visible=True, linestyle='--', alpha=0.6)
-    fig.savefig(income_temp_file, format='png')
-    plt.close(fig)
-    income_chart_url = request.build_absolute_uri(settings.MEDIA_URL + os.path.basename(income_temp_file))
-
-    #Line Graph Expenses
-    expense_temp_file = os.path.join(settings.MEDIA_ROOT, f"temp_expense_chart_{id_user}.png")
-    fig, ax = plt.subplots(figsize=(16, 9))
-    ax.plot(expense_dates, expense_amounts, label='Egresos', color='red', linewidth=2)
-    ax.scatter(expense_dates, expense_amounts, color='black', zorder=5, label='Entries')
-    ax.set_xlabel('Date')
-    ax.set_ylabel('Amount ($)')
-    ax.set_title('Expenses over Time')
-    ax.xaxis.set_major_locator(AutoDateLocator())
-    ax.xaxis.set_major_formatter(DateFormatter("%Y-%m-%d"))
-    ax.tick_params(axis='x', rotation=45)
-    ax.legend()
-    ax.grid(visible=True, linestyle='--', alpha=0.6)
-    fig.savefig(expense_temp_file, format='png')
-    plt.close(fig)
-    expense_chart_url = request.build_absolute_uri(settings.MEDIA_URL + os.path.basename(expense_temp_file))
-
-    #Category Graph Incomes
-    inpie_temp_file = os.path.join(settings.MEDIA_ROOT, f"temp_inpie_chart_{id_user}.png")
-    income_categories = income_data.values('categories__category_name').annotate(total=Sum('mount'))
-    category_names = [cat['categories__category_name'] for cat in income_categories]
-    category_totals = [cat['total'] for cat in income_categories]
-    income_colors = [to_hex((random.random(), random.random(), random.random())) for _ in category_names]
-    fig, ax = plt.subplots(figsize=(8, 8))
-    ax.pie(category_totals, labels=category_names, autopct='%1.1f%%', colors=income_colors)
-    ax.set_title('Income Distribution by Category')
-    fig.savefig(inpie_temp_file, format='png')
-    plt.close(fig)
-    inpie_chart_url = request.build_absolute_uri(settings.MEDIA_URL + os.path.basename(inpie_temp_file))
-
-
-    #Category Graph Expenses
-    expie_temp_file = os.path.join(settings.MEDIA_ROOT, f"temp_expie_chart_{id_user}.png")
-    expense_categories = expense_data.values('categories__category_name').annotate(total=Sum('mount'))
-    category_names_expense = [cat['categories__category_name'] for cat in expense_categories]
-    category_totals_expense = [cat['total'] for cat in expense_categories]
-    expense_colors = [to_hex((random.random(), random.random(), random.random())) for _ in category_names_expense]
-    fig, ax = plt.subplots(figsize=(8, 8))
-    ax.pie(category_totals_expense, labels=category_names_expense, autopct='%1.1f%%', colors=expense_colors)
-    ax.set_title('Expenses Distribution by Category')
-    fig.savefig(expie_temp_file, format='png')
-    plt.close(fig)
-    expie_chart_url = request.build_absolute_uri(settings.MEDIA_URL + os.path.basename(expie_temp_file))
-
-
-    context = {
-       'transactions': transactions,
-       'debts': debts,
-       'scheduled_transactions': scheduled_transactions,
-       'income_chart_url': income_chart_url,
-       'expense_chart_url': expense_chart_url,
-       'inpie_chart_url': inpie_chart_url,
-       'expie_chart_url': expie_chart_url,
-       'MEDIA_URL': settings.MEDIA_URL,
-       'main_balance_message': main_balance_message,
-       'debt_balance_message': debt_balance_message,
-       'suggested_balance_message': suggested_balance_message,
-       'total_income' : total_income,
-       'total_expenses' : total_expenses,
-       'total_paid_debt': total_paid_debt,
-       'total_pending_debt': total_pending_debt,
-       'total_overdue_debt': total_overdue_debt,
-
-    }
-
-
-    html_content = render_to_string('pdf_template.html', context)
-    pdf = HTML(string=html_content, base_url=request.build_absolute_uri('/')).write_pdf()
+    pdf = get_report_pdf(user, **options)
     response = HttpResponse(content_type='application/pdf')
     response['Content-Disposition'] = f'attachment; filename="report_{id_user}.pdf"'
-    for temp_image in temp_images:
-       os.remove(temp_image)
-
     response.write(pdf)
     return response
 
@@ -222,64 +179,18 @@ def send_email(request, id_user):
 
     Parameters:
         - id_user: The ID of the user to whom the email should be sent.
+        - period, start_date, end_date, renderer, profile (optional): The report options; see
+          `parse_report_options`.
 
     Returns:
         - HttpResponse: Success message if the email is sent successfully, or error message if failed.
     """
+    try:
+        options = parse_report_options(request.GET)
+    except ValueError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
     user = User.objects.get(id_user=id_user)
-    transactions = Transaction.objects.filter(id_user=user)
-    debts = Debt.objects.filter(id_user=user)
-    scheduled_transactions = ScheduledTransaction.objects.filter(user=user).prefetch_related('categories')
-
-    income_data = transactions.filter(type=Transaction.TransEnum.INCOME)
-    expense_data = transactions.filter(type=Transaction.TransEnum.EXPENSE)
-    total_income = sum(t.mount for t in income_data)
-    total_expenses = sum(t.mount for t in expense_data)
-
-    total_paid_debt = sum(d.totalAmount for d in debts if d.status == Debt.StatusEnum.PAID)
-    total_pending_debt = sum(d.totalAmount for d in debts if d.status == Debt.StatusEnum.PENDING)
-    total_overdue_debt = sum(d.totalAmount for d in debts if d.status == Debt.StatusEnum.OVERDUE)
-
-    main_balance = total_income - total_expenses
-    debt_balance = total_pending_debt + total_overdue_debt
-    suggested_balance = main_balance - (total_pending_debt + total_overdue_debt)
-
-    main_balance_message = ( f"${main_balance:.2f}")
-    debt_balance_message = f"${debt_balance:.2f}"
-    suggested_balance_message = f"${suggested_balance:.2f}"
-
-    income_temp_file = os.path.join(settings.MEDIA_ROOT, f"temp_income_chart_{id_user}.png")
-    income_chart_url = request.build_absolute_uri(settings.MEDIA_URL + os.path.basename(income_temp_file))
-    expense_temp_file = os.path.join(settings.MEDIA_ROOT, f"temp_expense_chart_{id_user}.png")
-    expense_chart_url = request.build_absolute_uri(settings.MEDIA_URL + os.path.basename(expense_temp_file))
-    expie_temp_file = os.path.join(settings.MEDIA_ROOT, f"temp_expie_chart_{id_user}.png")
-    expie_chart_url = request.build_absolute_uri(settings.MEDIA_URL + os.path.basename(expie_temp_file))
-    inpie_temp_file = os.path.join(settings.MEDIA_ROOT, f"temp_inpie_chart_{id_user}.png")
-    inpie_chart_url = request.build_absolute_uri(settings.MEDIA_URL + os.path.basename(inpie_temp_file))
-
-    context = {
-        'transactions': transactions,
-        'debts': debts,
-        'scheduled_transactions': scheduled_transactions,
-        'income_chart_url': income_chart_url,
-        'expense_chart_url': expense_chart_url,
-        'inpie_chart_url': inpie_chart_url,
-        'expie_chart_url': expie_chart_url,
-        'main_balance_message': main_balance_message,
-        'debt_balance_message': debt_balance_message,
-        'suggested_balance_message': suggested_balance_message,
-        'total_income' : total_income,
-        'total_expenses' : total_expenses,
-        'total_paid_debt': total_paid_debt,
-        'total_pending_debt': total_pending_debt,
-        'total_overdue_debt': total_overdue_debt,
-    }
-
-    html_content = render(request, 'pdf_template.html', context).content.decode('utf-8')
-
-    pdf_file = BytesIO()
-    HTML(string=html_content, base_url=request.build_absolute_uri('/')).write_pdf(target=pdf_file)
-    pdf_file.seek(0)
+    pdf = get_report_pdf(user, **options)
 
     subject = "Your Financial Report"
     message = "Hi, attached is your financial report. Thank you for using our service!"
@@ -289,7 +200,7 @@ def send_email(request, id_user):
         to=[user.email],
         from_email='budgetmatesys@gmail.com'
     )
-    email.attach(f'report_{id_user}.pdf', pdf_file.read(), 'application/pdf')
+    email.attach(f'report_{id_user}.pdf', pdf, 'application/pdf')
 
     try:
         email.send()
@@ -300,91 +211,6 @@ def send_email(request, id_user):
         pass
 
 
-def send_email_to_user(user_id):
-    """
-    Sends a financial report email to the user with the specified user ID.
-
-    This function generates a financial report in PDF format, attaches it to an email,
-    and sends the email to the user. The report includes visual charts for income and
-    expense trends, as well as category distribution.
-
-    Parameters:
-        - user_id: The ID of the user to whom the email should be sent.
-
-    Returns:
-        - None: The function does not return a value. It sends an email to the user.
-    """
-    user = User.objects.get(id_user=user_id)
-    transactions = Transaction.objects.filter(id_user=user)
-    debts = Debt.objects.filter(id_user=user)
-    scheduled_transactions = ScheduledTransaction.objects.filter(user=user).prefetch_related('categories')
-
-    income_data = transactions.filter(type=Transaction.TransEnum.INCOME)
-    expense_data = transactions.filter(type=Transaction.TransEnum.EXPENSE)
-    total_income = sum(t.mount for t in income_data)
-    total_expenses = sum(t.mount for t in expense_data)
-
-    total_paid_debt = sum(d.totalAmount for d in debts if d.status == Debt.StatusEnum.PAID)
-    total_pending_debt = sum(d.totalAmount for d in debts if d.status == Debt.StatusEnum.PENDING)
-    total_overdue_debt = sum(d.totalAmount for d in debts if d.status == Debt.StatusEnum.OVERDUE)
-
-    main_balance = total_income - total_expenses
-    debt_balance = total_pending_debt + total_overdue_debt
-    suggested_balance = main_balance - (total_pending_debt + total_overdue_debt)
-
-    main_balance_message = ( f"${main_balance:.2f}")
-    debt_balance_message = f"${debt_balance:.2f}"
-    suggested_balance_message = f"${suggested_balance:.2f}"
-
-    income_temp_file = os.path.join(settings.MEDIA_ROOT, f"temp_income_chart_{user_id}.png")
-    expense_temp_file = os.path.join(settings.MEDIA_ROOT, f"temp_expense_chart_{user_id}.png")
-    expie_temp_file = os.path.join(settings.MEDIA_ROOT, f"temp_expie_chart_{user_id}.png")
-    inpie_temp_file = os.path.join(settings.MEDIA_ROOT, f"temp_inpie_chart_{user_id}.png")
-
-    income_chart_url = f"{settings.MEDIA_URL}temp_income_chart_{user_id}.png"
-    expense_chart_url = f"{settings.MEDIA_URL}temp_expense_chart_{user_id}.png"
-    expie_chart_url = f"{settings.MEDIA_URL}temp_expie_chart_{user_id}.png"
-    inpie_chart_url = f"{settings.MEDIA_URL}temp_inpie_chart_{user_id}.png"
-
-    context = {
-        'transactions': transactions,
-        'debts': debts,
-        'scheduled_transactions': scheduled_transactions,
-        'income_chart_url': income_chart_url,
-        'expense_chart_url': expense_chart_url,
-        'inpie_chart_url': inpie_chart_url,
-        'expie_chart_url': expie_chart_url,
-        'main_balance_message': main_balance_message,
-        'debt_balance_message': debt_balance_message,
-        'suggested_balance_message': suggested_balance_message,
-        'total_income' : total_income,
-        'total_expenses' : total_expenses,
-        'total_paid_debt': total_paid_debt,
-        'total_pending_debt': total_pending_debt,
-        'total_overdue_debt': total_overdue_debt,
-    }
-
-    html_content = render_to_string('pdf_template.html', context)
-    pdf_file = BytesIO()
-    HTML(string=html_content).write_pdf(target=pdf_file)
-    pdf_file.seek(0)
-
-    subject = "Your Financial Report"
-    message = "Hi, attached is your financial report. Thank you for using our service!"
-    email = EmailMessage(
-        subject,
-        message,
-        to=[user.email],
-        from_email='budgetmatesys@gmail.com'
-    )
-    email.attach(f'report_{user.id_user}.pdf', pdf_file.read(), 'application/pdf')
-
-    try:
-        email.send()
-        print("Email sent successfully!")
-    except Exception as e:
-        print(f"Failed to send email: {e}")
-
 @api_view(['POST'])
 def update_email_schedule(request, id_user):
     """
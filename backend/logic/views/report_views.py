@@ -0,0 +1,88 @@
+from django.db import transaction
+from django.http import FileResponse
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+from logic.models import User, ReportJob
+from logic.serializer import ReportJobSerializer
+from logic.reports import find_or_create_report_job, parse_report_options
+from logic.tasks import build_report
+
+
+@api_view(['POST'])
+def create_report_job(request, id_user):
+    """
+    Requests a PDF report of a user, built in the background by a Celery worker.
+
+    If a report of the user's current data was already requested, the existing job is
+    returned instead of starting another one.
+
+    Parameters:
+        - id_user: The ID of the user the report is about.
+        - period, start_date, end_date, renderer, profile (optional): The report options; see
+          `parse_report_options`.
+
+    Returns:
+        - Response: The job (202 while it is pending or running, 200 when it is already done),
+          with a `Location` header pointing to its status URL.
+    """
+    try:
+        options = parse_report_options(request.GET)
+    except ValueError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        job, created = find_or_create_report_job(id_user, **options)
+    except User.DoesNotExist:
+        return Response({"error": "User not found."}, status=status.HTTP_404_NOT_FOUND)
+    if created:
+        transaction.on_commit(lambda: build_report.delay(str(job.pk)))
+    data = ReportJobSerializer(job, context={'request': request}).data
+    code = status.HTTP_200_OK if job.status == ReportJob.StatusEnum.DONE else status.HTTP_202_ACCEPTED
+    return Response(data, status=code, headers={
+        'Location': request.build_absolute_uri(
+            reverse('report-job-status', kwargs={'id_user': id_user, 'job_id': job.pk})),
+    })
+
+
+@api_view(['GET'])
+def report_job_status(request, id_user, job_id):
+    """
+    Returns the status of a report job and, once it is done, its download URL.
+
+    Parameters:
+        - id_user: The ID of the user the report is about.
+        - job_id: The ID of the job.
+
+    Returns:
+        - Response: The job, or an error message if it does not exist.
+    """
+    try:
+        job = ReportJob.objects.get(pk=job_id, user_id=id_user)
+    except ReportJob.DoesNotExist:
+        return Response({"error": "Report job not found."}, status=status.HTTP_404_NOT_FOUND)
+    return Response(ReportJobSerializer(job, context={'request': request}).data, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+def download_report(request, id_user, job_id):
+    """
+    Serves the PDF of a finished report job from storage.
+
+    Parameters:
+        - id_user: The ID of the user the report is about.
+        - job_id: The ID of the job.
+
+    Returns:
+        - FileResponse: The PDF as an attachment, or an error message if the job does not
+          exist or is not done yet (409).
+    """
+    try:
+        job = ReportJob.objects.get(pk=job_id, user_id=id_user)
+    except ReportJob.DoesNotExist:
+        return Response({"error": "Report job not found."}, status=status.HTTP_404_NOT_FOUND)
+    if job.status != ReportJob.StatusEnum.DONE or not job.file:
+        return Response({"error": "The report is not ready.", "status": job.status},
+                        status=status.HTTP_409_CONFLICT)
+    return FileResponse(job.file.open('rb'), as_attachment=True,
+                        filename=f'report_{id_user}.pdf', content_type='application/pdf')
@@ -3,6 +3,12 @@ from rest_framework.response import Response
 from rest_framework.decorators import api_view
 from logic.models import User, ScheduledTransaction
 from logic.serializer import ScheduledTransactionSerializer
+from logic.pagination import ScheduledTransactionPagination
+from logic.versioning import etag_by_data_version, get_data_version
+from logic.caching import get_cache, record_cache_access, forecast_cache_key
+from logic.forecast import forecast_balance, DEFAULT_FORECAST_DAYS, MAX_FORECAST_DAYS
+from django.conf import settings
+from django.utils import timezone
 
 class ScheduledTransactionListCreateView(generics.ListCreateAPIView):
     """
@@ -10,9 +16,11 @@ class ScheduledTransactionListCreateView(generics.ListCreateAPIView):
 
     This class provides the ability to list all scheduled transactions and create new ones.
     It uses the `ScheduledTransactionSerializer` to handle both the GET and POST requests.
+    The list is paginated by `(schedule_date, id_transaction)` when `cursor` or `page_size` is given.
     """
     queryset = ScheduledTransaction.objects.all()
     serializer_class = ScheduledTransactionSerializer
+    pagination_class = ScheduledTransactionPagination
 
     def create(self, request, *args, **kwargs):
         """
@@ -47,11 +55,16 @@ class ScheduledTransactionUpdateDeleteView(generics.RetrieveUpdateDestroyAPIView
     lookup_field = 'id_scheduled_transaction'
 
 @api_view(['GET'])
+@etag_by_data_version
 def get_scheduled_transactions_by_user(request, id_user):
     """
     Retrieve all scheduled transactions for a specific user.
 
     This view returns all scheduled transactions associated with the user identified by `id_user`.
+    When `cursor` or `page_size` is given, the list is paginated by `(schedule_date, id_transaction)`.
+
+    The response carries an ETag tied to the user's data version; a matching `If-None-Match`
+    is answered with 304 without querying the list.
 
     Parameters:
         - request: The HTTP request object.
@@ -66,7 +79,12 @@ def get_scheduled_transactions_by_user(request, id_user):
     except User.DoesNotExist:
         return Response({"error": "User not found."}, status=status.HTTP_404_NOT_FOUND)
 
-    scheduled_transactions = ScheduledTransaction.objects.filter(user=user)
+    scheduled_transactions = ScheduledTransaction.objects.filter(user=user).prefetch_related('categories')
+    paginator = ScheduledTransactionPagination()
+    page = paginator.paginate_queryset(scheduled_transactions, request)
+    if page is not None:
+        serializer = ScheduledTransactionSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
     serializer = ScheduledTransactionSerializer(scheduled_transactions, many=True)
 
     return Response(serializer.data, status=status.HTTP_200_OK)
@@ -117,3 +135,46 @@ def update_scheduled_transaction(request, transaction_id):
         serializer.save()
         return Response(serializer.data, status=status.HTTP_200_OK)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+@api_view(['GET'])
+def forecast_cash_flow(request, id_user):
+    """
+    Projects the daily balance of a user over the coming days from their scheduled transactions.
+
+    Every recurrence in the window is expanded at once and applied to the current balance
+    (total income minus total expenses). Results are cached per user, data version and day.
+
+    Parameters:
+        - days (optional): Length of the forecast in days, from 1 to 5 years (default 90).
+
+    Returns:
+        - Response: The daily balance curve, the days with a negative balance and the lowest
+          point, or an error message.
+    """
+    try:
+        user = User.objects.get(id_user=id_user)
+    except User.DoesNotExist:
+        return Response({"error": "User not found."}, status=status.HTTP_404_NOT_FOUND)
+    try:
+        days = int(request.GET.get('days', DEFAULT_FORECAST_DAYS))
+    except ValueError:
+        return Response({"error": "Invalid number of days."}, status=status.HTTP_400_BAD_REQUEST)
+    if not 1 <= days <= MAX_FORECAST_DAYS:
+        return Response({"error": f"days must be between 1 and {MAX_FORECAST_DAYS}."},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    start = timezone.localdate()
+    cache = get_cache('FORECAST_CACHE_ALIAS')
+    cache_key = forecast_cache_key(id_user, get_data_version(id_user), start, days)
+    data = cache.get(cache_key)
+    record_cache_access('forecast', data is not None)
+    if data is None:
+        data = forecast_balance(user, days, start)
+        cache.set(cache_key, data, settings.FORECAST_CACHE_TIMEOUT)
+        cache_status = 'MISS'
+    else:
+        cache_status = 'HIT'
+    response = Response(data, status=status.HTTP_200_OK)
+    response['X-Cache'] = cache_status
+    return response
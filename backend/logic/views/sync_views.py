@@ -0,0 +1,32 @@
+from rest_framework import status
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+from logic.models import User
+from logic.sync import collect_changes, parse_checkpoint
+
+
+@api_view(['GET'])
+def sync_changes(request, id_user):
+    """
+    Returns what changed in a user's data since the client's last sync.
+
+    The response holds the transactions, debts, scheduled transactions and categories created
+    or updated since `since`, the IDs deleted since then, and a new `checkpoint` to send on the
+    next call. Without `since`, or with a checkpoint older than the tombstone retention, every
+    row is returned and `full` is true.
+
+    Parameters:
+        - since (optional): The `checkpoint` of the previous response.
+
+    Returns:
+        - Response: The changes and the new checkpoint, or an error message.
+    """
+    try:
+        user = User.objects.get(id_user=id_user)
+    except User.DoesNotExist:
+        return Response({"error": "User not found."}, status=status.HTTP_404_NOT_FOUND)
+    try:
+        since = parse_checkpoint(request.GET.get('since'))
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(collect_changes(user, since), status=status.HTTP_200_OK)
@@ -1,8 +1,18 @@
+from celery.result import AsyncResult
+from django.conf import settings
+from django.core.files.storage import default_storage
 from rest_framework import status, generics
 from rest_framework.response import Response
 from rest_framework.decorators import api_view
-from logic.models import Transaction
-from logic.serializer import TransactionSerializer
+from logic.models import User, Transaction, Category
+from logic.serializer import TransactionSerializer, TransactionBulkItemSerializer
+from logic.pagination import TransactionPagination
+from logic.versioning import etag_by_data_version
+from logic.bulk import allowed_categories, bulk_insert_transactions
+from logic.importers import detect_format, import_statement, open_text, parse_columns
+from logic.tasks import import_transactions_file
+
+MAX_BULK_TRANSACTIONS = 10000
 
 class TransactionCreateView(generics.CreateAPIView):
     """
@@ -17,20 +27,166 @@ class TransactionCreateView(generics.CreateAPIView):
     queryset = Transaction.objects.all()
     serializer_class = TransactionSerializer
 
+@api_view(['POST'])
+def bulk_create_transactions(request):
+    """
+    Creates many transactions in a single request.
+
+    The body is a list of transactions (or an object with a `transactions` list) using the same
+    fields as `POST /api/transactions/`. All rows are validated first, then the users and
+    categories are checked with a few queries for the whole batch. A row may only use its user's
+    own categories and the universal ones. The valid rows are stored with bulk INSERTs for both the
+    transactions and their categories. Invalid rows are skipped and reported by their index.
+
+    Parameters:
+        - request: The HTTP request object containing the list of transactions.
+
+    Returns:
+        - Response: The number and IDs of the created transactions and the per-row errors.
+    """
+    rows = request.data.get('transactions') if isinstance(request.data, dict) else request.data
+    if not isinstance(rows, list) or not rows:
+        return Response({"error": "Expected a non-empty list of transactions."}, status=status.HTTP_400_BAD_REQUEST)
+    if len(rows) > MAX_BULK_TRANSACTIONS:
+        return Response({"error": f"At most {MAX_BULK_TRANSACTIONS} transactions per request."},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    errors = {}
+    valid = []
+    for index, row in enumerate(rows):
+        serializer = TransactionBulkItemSerializer(data=row)
+        if serializer.is_valid():
+            valid.append((index, serializer.validated_data))
+        else:
+            errors[index] = serializer.errors
+
+    user_ids = set(User.objects.filter(
+        id_user__in={data['id_user'] for _, data in valid}).values_list('id_user', flat=True))
+    requested = {c for _, data in valid for c in data['categories']}
+    category_ids = set(Category.objects.filter(id_category__in=requested).values_list('id_category', flat=True))
+    user_categories = allowed_categories(user_ids, category_ids)
+
+    transactions = []
+    transaction_categories = []
+    created_indexes = []
+    for index, data in valid:
+        row_errors = {}
+        if data['id_user'] not in user_ids:
+            row_errors['id_user'] = [f"Invalid pk \"{data['id_user']}\" - object does not exist."]
+        missing = [c for c in data['categories'] if c not in category_ids]
+        foreign = [c for c in data['categories']
+                   if c in category_ids and c not in user_categories.get(data['id_user'], ())]
+        if missing or foreign:
+            row_errors['categories'] = (
+                [f"Invalid pk \"{c}\" - object does not exist." for c in missing]
+                + [f"Category \"{c}\" does not belong to the user." for c in foreign]
+            )
+        if row_errors:
+            errors[index] = row_errors
+            continue
+        categories = data.pop('categories')
+        data['id_user_id'] = data.pop('id_user')
+        transactions.append(Transaction(**data))
+        transaction_categories.append(categories)
+        created_indexes.append(index)
+
+    created = bulk_insert_transactions(transactions, transaction_categories) if transactions else []
+    response = {
+        "created": len(created),
+        "ids": [transaction.id_transaction for transaction in created],
+        "errors": [{"index": index, "errors": errors[index]} for index in sorted(errors)],
+    }
+    if not created:
+        return Response(response, status=status.HTTP_400_BAD_REQUEST)
+    return Response(response, status=status.HTTP_201_CREATED)
+
+@api_view(['POST'])
+def import_transactions(request, id_user):
+    """
+    Imports a CSV, OFX or QIF bank statement into the user's transactions.
+
+    The uploaded `file` is read row by row and stored in fixed-size bulk INSERT chunks. Category
+    names are created or associated with the user once per distinct name. Files larger than
+    `TRANSACTION_IMPORT_ASYNC_BYTES` are handed to a Celery task and can be followed with
+    `import_transactions_status`.
+
+    Parameters:
+        - file: The statement file (multipart upload).
+        - format (optional): `csv`, `ofx` or `qif`; detected from the file extension by default.
+        - columns (optional): JSON object mapping `date`, `mount`, `description`, `type` and
+          `categories` to CSV headers.
+
+    Returns:
+        - Response: The import summary (200), the task ID of a background import (202), or an error.
+    """
+    try:
+        user = User.objects.get(id_user=id_user)
+    except User.DoesNotExist:
+        return Response({"error": "User not found."}, status=status.HTTP_404_NOT_FOUND)
+    upload = request.FILES.get('file')
+    if upload is None:
+        return Response({"error": "No file was uploaded."}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        fmt = detect_format(upload.name, request.data.get('format'))
+        columns = parse_columns(request.data.get('columns'))
+    except (ValueError, TypeError) as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    if upload.size > settings.TRANSACTION_IMPORT_ASYNC_BYTES:
+        path = default_storage.save(f'imports/{id_user}/{upload.name}', upload)
+        task = import_transactions_file.delay(user.id_user, path, fmt, columns)
+        return Response({"task_id": task.id, "status": "PENDING"}, status=status.HTTP_202_ACCEPTED)
+
+    summary = import_statement(user, open_text(upload.file), fmt, columns)
+    return Response(summary, status=status.HTTP_200_OK)
+
 @api_view(['GET'])
+def import_transactions_status(request, task_id):
+    """
+    Returns the state of a background statement import.
+
+    Parameters:
+        - task_id: The ID returned by `import_transactions`.
+
+    Returns:
+        - Response: The task state and either its progress counters or the final summary.
+    """
+    result = AsyncResult(task_id)
+    data = {"task_id": task_id, "status": result.state}
+    if result.state == 'PROGRESS':
+        data["progress"] = result.info
+    elif result.state == 'SUCCESS':
+        data["result"] = result.result
+    elif result.state == 'FAILURE':
+        data["error"] = str(result.result)
+    return Response(data, status=status.HTTP_200_OK)
+
+@api_view(['GET'])
+@etag_by_data_version
 def get_transactions_by_user(request, id_user):
     """
     This view returns all transactions associated with the user identified by `id_user`.
+    When `cursor` or `page_size` is given, the list is paginated by `(date, id_transaction)`.
+
+    The response carries an ETag tied to the user's data version; a matching `If-None-Match`
+    is answered with 304 without querying the list.
 
     Parameters:
         - request: The HTTP request object.
         - id_user: The ID of the user whose transactions are being fetched.
+        - cursor (optional): Opaque cursor taken from a previous `next`/`previous` link.
+        - page_size (optional): Number of transactions per page.
 
     Returns:
         - Response: A response containing a list of transactions for the specified user,
           or an error message if no transactions are found.
     """
-    transactions = Transaction.objects.filter(id_user=id_user)
+    transactions = Transaction.objects.filter(id_user=id_user).prefetch_related('categories')
+    paginator = TransactionPagination()
+    page = paginator.paginate_queryset(transactions, request)
+    if page is not None:
+        serializer = TransactionSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
     serializer = TransactionSerializer(transactions, many=True)
     return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -4,6 +4,7 @@ from rest_framework.response import Response
 from rest_framework.decorators import api_view
 from logic.models import User, Category
 from logic.serializer import UserSerializer
+from logic.pagination import UserPagination
 from django.db import transaction
 from django.core.mail import send_mail
 from django.conf import settings
@@ -33,10 +34,11 @@ class UserView(generics.ListCreateAPIView):
 
     Methods:
         POST: Create a new user and send a verification email.
-        GET: List all users.
+        GET: List all users, paginated by `id_user` when `cursor` or `page_size` is given.
     """
     queryset = User.objects.all()
     serializer_class = UserSerializer
+    pagination_class = UserPagination
 
     def perform_create(self, serializer):
         """